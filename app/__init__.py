@@ -0,0 +1,38 @@
+# app/__init__.py
+
+import importlib.util
+import os
+import sys
+
+# Uygulama, app/browser_use altındaki (değiştirilmiş) browser_use kopyasıyla çalışır.
+# Paket kendi içinde "browser_use.*" mutlak importları kullandığı için onu bu adla,
+# dosya yolundan açıkça yükleriz; böylece app/ dizinini sys.path'e koymak gerekmez ve
+# ortamda kurulu başka bir browser-use paketi hiçbir zaman seçilmez.
+_VENDORED_BROWSER_USE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_use")
+
+
+def _load_vendored_browser_use() -> None:
+    loaded = sys.modules.get("browser_use")
+    if loaded is not None:
+        if os.path.dirname(os.path.abspath(loaded.__file__ or "")) != _VENDORED_BROWSER_USE:
+            raise ImportError(
+                f"browser_use zaten {loaded.__file__} konumundan yüklenmiş; "
+                f"uygulama {_VENDORED_BROWSER_USE} kopyasını gerektirir."
+            )
+        return
+
+    spec = importlib.util.spec_from_file_location(
+        "browser_use",
+        os.path.join(_VENDORED_BROWSER_USE, "__init__.py"),
+        submodule_search_locations=[_VENDORED_BROWSER_USE],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["browser_use"] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules["browser_use"]
+        raise
+
+
+_load_vendored_browser_use()
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import logging
 import os
 import platform
-from typing import TYPE_CHECKING, Optional
+import shutil
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
 from browser_use.agent.views import (
 	AgentHistoryList,
@@ -16,6 +27,50 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Encoded with a local ffmpeg instead of Pillow
+VIDEO_CODECS = {
+	'.mp4': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'],
+	'.webm': ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p'],
+}
+
+# Shipped next to the package, independent of the working directory
+LOGO_PATH = Path(__file__).resolve().parent.parent / 'static' / 'browser-use.png'
+
+# Frames submitted to the pool per worker ahead of the encoder, which bounds the memory
+# held by rendered frames that are waiting for their turn
+FRAMES_IN_FLIGHT_PER_WORKER = 2
+
+# Shared by all GIFs of this process; created on first use, see _get_pool
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class _FrameOptions:
+	show_goals: bool
+	show_logo: bool
+	font_size: int
+	title_font_size: int
+	goal_font_size: int
+	margin: int
+	line_spacing: float
+
+
+@dataclass(frozen=True)
+class _FrameJob:
+	"""One output frame. Plain data, so it can be sent to a worker process."""
+
+	options: _FrameOptions
+	# 'gif' for a single-frame GIF, 'rgb' for raw RGB pixels piped to ffmpeg
+	output_format: str
+	screenshot_b64: Optional[str] = None
+	screenshot_path: Optional[str] = None
+	# Task frame when set, step frame otherwise
+	task: Optional[str] = None
+	step_number: int = 0
+	goal_text: Optional[str] = None
+
 
 def create_history_gif(
 	task: str,
@@ -31,26 +86,270 @@ def create_history_gif(
 	goal_font_size: int = 44,
 	margin: int = 40,
 	line_spacing: float = 1.5,
+	workers: Optional[int] = None,
 ) -> None:
-	"""Create a GIF from the agent's history with overlaid task and goal text."""
+	"""
+	Create a GIF from the agent's history with overlaid task and goal text.
+
+	Frames are decoded, annotated and encoded in a process pool shared by all calls
+	(created on first use with `workers` processes; 0 or 1 renders in this process). At
+	most a few frames per worker are in flight, and they reach the writer in order as
+	encoded bytes. An output_path ending in .mp4 or .webm is encoded with a local ffmpeg
+	instead.
+	"""
 	if not history.history:
 		logger.warning('No history to create GIF from')
 		return
 
-	from PIL import Image, ImageFont
-
-	images = []
-
 	# if history is empty or first screenshot is None, we can't create a gif
-	if not history.history or not history.history[0].state.screenshot:
+	if not history.history[0].state.has_screenshot:
 		logger.warning('No history or first screenshot to create GIF from')
 		return
 
+	options = _FrameOptions(
+		show_goals=show_goals,
+		show_logo=show_logo,
+		font_size=font_size,
+		title_font_size=title_font_size,
+		goal_font_size=goal_font_size,
+		margin=margin,
+		line_spacing=line_spacing,
+	)
+
+	extension = os.path.splitext(output_path)[1].lower()
+	output_format = 'rgb' if extension in VIDEO_CODECS else 'gif'
+
+	jobs = []
+	first_state = history.history[0].state
+	if show_task and task:
+		jobs.append(
+			_FrameJob(options, output_format, first_state.screenshot, first_state.screenshot_path, task=task),
+		)
+	for i, item in enumerate(history.history, 1):
+		if not item.state.has_screenshot:
+			continue
+		jobs.append(
+			_FrameJob(
+				options,
+				output_format,
+				item.state.screenshot,
+				item.state.screenshot_path,
+				step_number=i,
+				goal_text=item.model_output.current_state.next_goal if item.model_output else None,
+			)
+		)
+
+	pool = _get_pool(workers if workers is not None else os.cpu_count() or 1)
+	if pool:
+		frames = _render_in_pool(pool, jobs, _pool_workers * FRAMES_IN_FLIGHT_PER_WORKER)
+	else:
+		frames = map(_render_frame, jobs)
+
+	if output_format == 'rgb':
+		_encode_video(frames, output_path, duration, VIDEO_CODECS[extension])
+	else:
+		_encode_gif(frames, output_path, duration)
+
+
+def _get_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+	"""
+	The shared render pool, or None to render in this process.
+
+	Workers are started with forkserver (spawn where it is unavailable): forking a process
+	that runs an event loop and Playwright threads is unsafe. Fonts and the logo stay
+	cached in the workers between GIFs.
+	"""
+	global _pool, _pool_workers
+	if workers <= 1:
+		return None
+	with _pool_lock:
+		if _pool is None:
+			method = 'forkserver' if 'forkserver' in get_all_start_methods() else 'spawn'
+			try:
+				_pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context(method))
+			except (OSError, NotImplementedError) as e:
+				logger.debug(f'Rendering GIF frames in-process, no process pool available: {e}')
+				return None
+			_pool_workers = workers
+		return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+	"""Drop a broken pool, so the next GIF starts a new one."""
+	global _pool
+	with _pool_lock:
+		if _pool is pool:
+			_pool = None
+	pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_in_pool(
+	pool: ProcessPoolExecutor, jobs: list[_FrameJob], max_in_flight: int
+) -> Iterator[tuple[tuple[int, int], bytes]]:
+	"""Rendered frames in job order, with at most `max_in_flight` submitted but not yet consumed."""
+	pending: deque[Future] = deque()
+	try:
+		for job in jobs:
+			pending.append(pool.submit(_render_frame, job))
+			if len(pending) >= max_in_flight:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+	except BrokenProcessPool:
+		_discard_pool(pool)
+		raise
+	finally:
+		for future in pending:
+			future.cancel()
+
+
+async def create_history_gif_async(task: str, history: AgentHistoryList, **kwargs) -> None:
+	"""create_history_gif in a worker thread, so the event loop keeps running while it renders."""
+	await asyncio.to_thread(create_history_gif, task, history, **kwargs)
+
+
+def _encode_gif(frames: Iterable[tuple[tuple[int, int], bytes]], output_path: str, duration: int) -> None:
+	from PIL import Image
+
+	# Each frame arrives as a single-frame GIF, already quantized by the worker
+	images = (Image.open(io.BytesIO(data)) for _, data in frames)
+	first_frame = next(images, None)
+	if first_frame is None:
+		logger.warning('No images found in history to create GIF')
+		return
+
+	# Pillow pulls the remaining frames from the iterator while writing
+	first_frame.save(
+		output_path,
+		save_all=True,
+		append_images=images,
+		duration=duration,
+		loop=0,
+		optimize=False,
+	)
+	logger.info(f'Created GIF at {output_path}')
+
+
+def _encode_video(
+	frames: Iterable[tuple[tuple[int, int], bytes]], output_path: str, duration: int, codec_args: list[str]
+) -> None:
+	ffmpeg = shutil.which('ffmpeg')
+	if ffmpeg is None:
+		raise RuntimeError(f'ffmpeg is required to create {output_path}')
+
+	frames = iter(frames)
+	first_frame = next(frames, None)
+	if first_frame is None:
+		logger.warning('No images found in history to create video')
+		return
+
+	size = first_frame[0]
+	command = [
+		ffmpeg,
+		'-y',
+		'-loglevel',
+		'error',
+		'-f',
+		'rawvideo',
+		'-pix_fmt',
+		'rgb24',
+		'-s',
+		f'{size[0]}x{size[1]}',
+		'-framerate',
+		f'1000/{duration}',
+		'-i',
+		'-',
+		# Codecs with 4:2:0 chroma need even dimensions
+		'-vf',
+		'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+		*codec_args,
+		output_path,
+	]
+	process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+	assert process.stdin is not None
+	try:
+		for pixels in _same_size(first_frame, frames, size):
+			process.stdin.write(pixels)
+	finally:
+		process.stdin.close()
+		stderr = process.stderr.read() if process.stderr else b''
+		return_code = process.wait()
+	if return_code != 0:
+		raise RuntimeError(f'ffmpeg failed to create {output_path}: {stderr.decode(errors="replace").strip()}')
+	logger.info(f'Created video at {output_path}')
+
+
+def _same_size(
+	first_frame: tuple[tuple[int, int], bytes], frames: Iterator[tuple[tuple[int, int], bytes]], size: tuple[int, int]
+) -> Iterator[bytes]:
+	"""Raw RGB pixels of every frame at the size of the first one."""
+	from PIL import Image
+
+	yield first_frame[1]
+	for frame_size, pixels in frames:
+		if frame_size == size:
+			yield pixels
+		else:
+			yield Image.frombytes('RGB', frame_size, pixels).resize(size, Image.Resampling.LANCZOS).tobytes()
+
+
+def _render_frame(job: _FrameJob) -> tuple[tuple[int, int], bytes]:
+	"""Decode, annotate and encode one frame; runs in a worker process. Returns its size and bytes."""
+	image = _annotate_frame(job).convert('RGB')
+	if job.output_format == 'rgb':
+		return image.size, image.tobytes()
+
+	output = io.BytesIO()
+	image.save(output, format='GIF')
+	return image.size, output.getvalue()
+
+
+def _annotate_frame(job: _FrameJob) -> 'Image.Image':
+	from PIL import Image
+
+	options = job.options
+	regular_font, title_font, _ = _load_fonts(options.font_size, options.title_font_size, options.goal_font_size)
+	logo = _load_logo() if options.show_logo else None
+
+	if job.screenshot_b64 is not None:
+		img_data = base64.b64decode(job.screenshot_b64)
+	else:
+		with open(job.screenshot_path, 'rb') as f:
+			img_data = f.read()
+
+	if job.task is not None:
+		return _create_task_frame(
+			job.task,
+			img_data,
+			title_font,  # type: ignore
+			regular_font,  # type: ignore
+			logo,
+			options.line_spacing,
+		)
+
+	image = Image.open(io.BytesIO(img_data))
+	if options.show_goals and job.goal_text is not None:
+		image = _add_overlay_to_image(
+			image=image,
+			step_number=job.step_number,
+			goal_text=job.goal_text,
+			regular_font=regular_font,  # type: ignore
+			title_font=title_font,  # type: ignore
+			margin=options.margin,
+			logo=logo,
+		)
+	return image
+
+
+@lru_cache(maxsize=8)
+def _load_fonts(font_size: int, title_font_size: int, goal_font_size: int) -> tuple:
+	"""Regular, title and goal fonts; loaded once per process and size."""
+	from PIL import ImageFont
+
 	# Try to load nicer fonts
 	try:
 		# Try different font options in order of preference
 		font_options = ['Helvetica', 'Arial', 'DejaVuSans', 'Verdana']
-		font_loaded = False
 
 		for font_name in font_options:
 			try:
@@ -60,85 +359,38 @@ def create_history_gif(
 				regular_font = ImageFont.truetype(font_name, font_size)
 				title_font = ImageFont.truetype(font_name, title_font_size)
 				goal_font = ImageFont.truetype(font_name, goal_font_size)
-				font_loaded = True
-				break
+				return regular_font, title_font, goal_font
 			except OSError:
 				continue
 
-		if not font_loaded:
-			raise OSError('No preferred fonts found')
+		raise OSError('No preferred fonts found')
 
 	except OSError:
 		regular_font = ImageFont.load_default()
 		title_font = ImageFont.load_default()
 
-		goal_font = regular_font
-
-	# Load logo if requested
-	logo = None
-	if show_logo:
-		try:
-			logo = Image.open('./static/browser-use.png')
-			# Resize logo to be small (e.g., 40px height)
-			logo_height = 150
-			aspect_ratio = logo.width / logo.height
-			logo_width = int(logo_height * aspect_ratio)
-			logo = logo.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
-		except Exception as e:
-			logger.warning(f'Could not load logo: {e}')
-
-	# Create task frame if requested
-	if show_task and task:
-		task_frame = _create_task_frame(
-			task,
-			history.history[0].state.screenshot,
-			title_font,  # type: ignore
-			regular_font,  # type: ignore
-			logo,
-			line_spacing,
-		)
-		images.append(task_frame)
-
-	# Process each history item
-	for i, item in enumerate(history.history, 1):
-		if not item.state.screenshot:
-			continue
+		return regular_font, title_font, regular_font
 
-		# Convert base64 screenshot to PIL Image
-		img_data = base64.b64decode(item.state.screenshot)
-		image = Image.open(io.BytesIO(img_data))
 
-		if show_goals and item.model_output:
-			image = _add_overlay_to_image(
-				image=image,
-				step_number=i,
-				goal_text=item.model_output.current_state.next_goal,
-				regular_font=regular_font,  # type: ignore
-				title_font=title_font,  # type: ignore
-				margin=margin,
-				logo=logo,
-			)
+@lru_cache(maxsize=1)
+def _load_logo() -> Optional['Image.Image']:
+	from PIL import Image
 
-		images.append(image)
-
-	if images:
-		# Save the GIF
-		images[0].save(
-			output_path,
-			save_all=True,
-			append_images=images[1:],
-			duration=duration,
-			loop=0,
-			optimize=False,
-		)
-		logger.info(f'Created GIF at {output_path}')
-	else:
-		logger.warning('No images found in history to create GIF')
+	try:
+		logo = Image.open(LOGO_PATH)
+		# Resize logo to be small (e.g., 40px height)
+		logo_height = 150
+		aspect_ratio = logo.width / logo.height
+		logo_width = int(logo_height * aspect_ratio)
+		return logo.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
+	except Exception as e:
+		logger.warning(f'Could not load logo: {e}')
+		return None
 
 
 def _create_task_frame(
 	task: str,
-	first_screenshot: str,
+	first_screenshot: bytes,
 	title_font: 'ImageFont.FreeTypeFont',
 	regular_font: 'ImageFont.FreeTypeFont',
 	logo: Optional[Image.Image] = None,
@@ -147,8 +399,7 @@ def _create_task_frame(
 	"""Create initial frame showing the task."""
 	from PIL import Image, ImageDraw, ImageFont
 
-	img_data = base64.b64decode(first_screenshot)
-	template = Image.open(io.BytesIO(img_data))
+	template = Image.open(io.BytesIO(first_screenshot))
 	image = Image.new('RGB', template.size, (0, 0, 0))
 	draw = ImageDraw.Draw(image)
 
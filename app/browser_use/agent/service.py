@@ -19,10 +19,11 @@ from langchain_core.messages import (
 # from lmnr.sdk.decorators import observe
 from pydantic import BaseModel, ValidationError
 
-from browser_use.agent.gif import create_history_gif
+from browser_use.agent.gif import create_history_gif_async
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
 from browser_use.agent.message_manager.utils import convert_input_messages, extract_json_from_model_output, save_conversation
 from browser_use.agent.prompts import AgentMessagePrompt, PlannerPrompt, SystemPrompt
+from browser_use.agent.storage import HistoryReader, HistoryWriter
 from browser_use.agent.views import (
 	ActionResult,
 	AgentError,
@@ -44,6 +45,7 @@ from browser_use.dom.history_tree_processor.service import (
 	DOMHistoryElement,
 	HistoryTreeProcessor,
 )
+from browser_use.storage import ScreenshotStore
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
 	AgentEndTelemetryEvent,
@@ -73,6 +75,13 @@ def log_response(response: AgentOutput) -> None:
 		logger.info(f'🛠️  Action {i + 1}/{len(response.action)}: {action.model_dump_json(exclude_unset=True)}')
 
 
+def _log_gif_rendering_result(task: asyncio.Task) -> None:
+	if task.cancelled():
+		return
+	if task.exception():
+		logger.error(f'Failed to create history GIF: {task.exception()}')
+
+
 Context = TypeVar('Context')
 
 
@@ -106,6 +115,8 @@ class Agent(Generic[Context]):
 		validate_output: bool = False,
 		message_context: Optional[str] = None,
 		generate_gif: bool | str = False,
+		screenshot_store_dir: Optional[str] = None,
+		history_path: Optional[str] = None,
 		available_file_paths: Optional[list[str]] = None,
 		include_attributes: list[str] = [
 			'title',
@@ -151,6 +162,8 @@ class Agent(Generic[Context]):
 			validate_output=validate_output,
 			message_context=message_context,
 			generate_gif=generate_gif,
+			screenshot_store_dir=screenshot_store_dir,
+			history_path=history_path,
 			available_file_paths=available_file_paths,
 			include_attributes=include_attributes,
 			max_actions_per_step=max_actions_per_step,
@@ -162,6 +175,11 @@ class Agent(Generic[Context]):
 
 		# Initialize state
 		self.state = injected_agent_state or AgentState()
+		self.screenshot_store = ScreenshotStore(screenshot_store_dir) if screenshot_store_dir else None
+		self._history_writer: HistoryWriter | None = None
+		self._history_file_started = False
+		# Background GIF rendering started at the end of run(); await it to wait for the file
+		self.gif_task: asyncio.Task | None = None
 
 		# Action setup
 		self._setup_action_models()
@@ -332,7 +350,7 @@ class Agent(Generic[Context]):
 		tokens = 0
 
 		try:
-			state = await self.browser_context.get_state()
+			state = await self.browser_context.get_state(include_screenshot=self._needs_screenshots)
 
 			await self._raise_if_stopped_or_paused()
 
@@ -422,7 +440,7 @@ class Agent(Generic[Context]):
 					step_end_time=step_end_time,
 					input_tokens=tokens,
 				)
-				self._make_history_item(model_output, state, result, metadata)
+				await self._make_history_item(model_output, state, result, metadata)
 
 	@time_execution_async('--handle_step_error (agent)')
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
@@ -459,32 +477,55 @@ class Agent(Generic[Context]):
 
 		return [ActionResult(error=error_msg, include_in_memory=True)]
 
-	def _make_history_item(
+	async def _make_history_item(
 		self,
 		model_output: AgentOutput | None,
 		state: BrowserState,
 		result: list[ActionResult],
 		metadata: Optional[StepMetadata] = None,
 	) -> None:
-		"""Create and store history item"""
+		"""Create and store history item; disk writes run in a worker thread"""
 
 		if model_output:
 			interacted_elements = AgentHistory.get_interacted_element(model_output, state.selector_map)
 		else:
 			interacted_elements = [None]
 
+		screenshot, screenshot_path = state.screenshot, None
+		if screenshot and self.screenshot_store:
+			screenshot_path = await asyncio.to_thread(self.screenshot_store.put, screenshot, state.screenshot_mime_type)
+			screenshot = None
+
 		state_history = BrowserStateHistory(
 			url=state.url,
 			title=state.title,
 			tabs=state.tabs,
 			interacted_element=interacted_elements,
-			screenshot=state.screenshot,
+			screenshot=screenshot,
+			screenshot_mime_type=state.screenshot_mime_type,
+			screenshot_path=screenshot_path,
 		)
 
 		history_item = AgentHistory(model_output=model_output, result=result, state=state_history, metadata=metadata)
 
 		self.state.history.history.append(history_item)
 
+		if self.settings.history_path:
+			pending = [history_item]
+			if self._history_writer is None:
+				# The first write of this agent replaces the file, so a rerun of a task never
+				# continues an older run's steps; later run() calls of the same agent append
+				mode = 'a' if self._history_file_started else 'w'
+				self._history_writer = await asyncio.to_thread(
+					HistoryWriter, self.settings.history_path, screenshot_store=self.screenshot_store, mode=mode
+				)
+				if not self._history_file_started:
+					# Includes steps of an injected state, which the replaced file may have held
+					pending = list(self.state.history.history)
+					self._history_file_started = True
+			for item in pending:
+				await asyncio.to_thread(self._history_writer.append, item)
+
 	THINK_TAGS = re.compile(r'<think>.*?</think>', re.DOTALL)
 
 	def _remove_think_tags(self, text: str) -> str:
@@ -628,6 +669,10 @@ class Agent(Generic[Context]):
 				)
 			)
 
+			if self._history_writer:
+				self._history_writer.close()
+				self._history_writer = None
+
 			if not self.injected_browser_context:
 				await self.browser_context.close()
 
@@ -639,7 +684,14 @@ class Agent(Generic[Context]):
 				if isinstance(self.settings.generate_gif, str):
 					output_path = self.settings.generate_gif
 
-				create_history_gif(task=self.task, history=self.state.history, output_path=output_path)
+				self._start_gif_rendering(output_path)
+
+	def _start_gif_rendering(self, output_path: str) -> None:
+		"""Render the GIF in the background; run() returns without waiting for it (see gif_task)."""
+		# Snapshot of the steps so far, the history may keep growing while the frames are rendered
+		history = AgentHistoryList(history=list(self.state.history.history))
+		self.gif_task = asyncio.create_task(create_history_gif_async(task=self.task, history=history, output_path=output_path))
+		self.gif_task.add_done_callback(_log_gif_rendering_result)
 
 	# @observe(name='controller.multi_act')
 	@time_execution_async('--multi-act (agent)')
@@ -658,7 +710,7 @@ class Agent(Generic[Context]):
 
 		for i, action in enumerate(actions):
 			if action.get_index() is not None and i != 0:
-				new_state = await self.browser_context.get_state()
+				new_state = await self.browser_context.get_state(include_screenshot=False)
 				new_path_hashes = set(e.hash.branch_path_hash for e in new_state.selector_map.values())
 				if check_for_new_elements and not new_path_hashes.issubset(cached_path_hashes):
 					# next action requires index but there are new elements on the page
@@ -684,7 +736,7 @@ class Agent(Generic[Context]):
 			if results[-1].is_done or results[-1].error or i == len(actions) - 1:
 				break
 
-			await asyncio.sleep(self.browser_context.config.wait_between_actions)
+			await asyncio.sleep((await self.browser_context.get_wait_budget()).between_actions)
 			# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
 
 		return results
@@ -703,7 +755,7 @@ class Agent(Generic[Context]):
 		)
 
 		if self.browser_context.session:
-			state = await self.browser_context.get_state()
+			state = await self.browser_context.get_state(include_screenshot=self.settings.use_vision)
 			content = AgentMessagePrompt(
 				state=state,
 				result=self.state.last_result,
@@ -747,7 +799,7 @@ class Agent(Generic[Context]):
 
 	async def rerun_history(
 		self,
-		history: AgentHistoryList,
+		history: AgentHistoryList | HistoryReader,
 		max_retries: int = 3,
 		skip_failures: bool = True,
 		delay_between_actions: float = 2.0,
@@ -756,7 +808,7 @@ class Agent(Generic[Context]):
 		Rerun a saved history of actions with error handling and retry logic.
 
 		Args:
-				history: The history to replay
+				history: The history to replay; a HistoryReader is read one step at a time
 				max_retries: Maximum number of retries per action
 				skip_failures: Whether to skip failed actions or stop execution
 				delay_between_actions: Delay between actions in seconds
@@ -771,9 +823,10 @@ class Agent(Generic[Context]):
 
 		results = []
 
-		for i, history_item in enumerate(history.history):
+		steps = history.history if isinstance(history, AgentHistoryList) else history
+		for i, history_item in enumerate(steps):
 			goal = history_item.model_output.current_state.next_goal if history_item.model_output else ''
-			logger.info(f'Replaying step {i + 1}/{len(history.history)}: goal: {goal}')
+			logger.info(f'Replaying step {i + 1}/{len(steps)}: goal: {goal}')
 
 			if (
 				not history_item.model_output
@@ -807,7 +860,7 @@ class Agent(Generic[Context]):
 
 	async def _execute_history_step(self, history_item: AgentHistory, delay: float) -> list[ActionResult]:
 		"""Execute a single step from history with element validation"""
-		state = await self.browser_context.get_state()
+		state = await self.browser_context.get_state(include_screenshot=False)
 		if not state or not history_item.model_output:
 			raise ValueError('Invalid state or model output')
 		updated_actions = []
@@ -862,14 +915,17 @@ class Agent(Generic[Context]):
 		"""
 		if not history_file:
 			history_file = 'AgentHistory.json'
-		history = AgentHistoryList.load_from_file(history_file, self.AgentOutput)
+		if Path(history_file).suffix == '.jsonl':
+			history = HistoryReader(history_file, self.AgentOutput)
+		else:
+			history = AgentHistoryList.load_from_file(history_file, self.AgentOutput)
 		return await self.rerun_history(history, **kwargs)
 
 	def save_history(self, file_path: Optional[str | Path] = None) -> None:
 		"""Save the history to a file"""
 		if not file_path:
 			file_path = 'AgentHistory.json'
-		self.state.history.save_to_file(file_path)
+		self.state.history.save_to_file(file_path, screenshot_store=self.screenshot_store)
 
 	def pause(self) -> None:
 		"""Pause the agent before the next step"""
@@ -957,3 +1013,8 @@ class Agent(Generic[Context]):
 	@property
 	def message_manager(self) -> MessageManager:
 		return self._message_manager
+
+	@property
+	def _needs_screenshots(self) -> bool:
+		"""Screenshots are only captured when the LLM sees them or a GIF is generated from them."""
+		return self.settings.use_vision or bool(self.settings.generate_gif)
@@ -0,0 +1,127 @@
+"""
+On-disk storage for agent history data.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Type
+
+from browser_use.storage import ScreenshotStore
+
+if TYPE_CHECKING:
+	from browser_use.agent.views import AgentHistory, AgentHistoryList, AgentOutput
+
+logger = logging.getLogger(__name__)
+
+def externalize_screenshot(state: dict[str, Any], screenshot_store: Optional[ScreenshotStore]) -> None:
+	"""Move the inline screenshot of a dumped BrowserStateHistory into the store, keeping a reference."""
+	if screenshot_store and state.get('screenshot'):
+		state['screenshot_path'] = screenshot_store.put(state['screenshot'], state.get('screenshot_mime_type', 'image/png'))
+		state['screenshot'] = None
+
+
+class HistoryWriter:
+	"""
+	Append-only JSONL history: one AgentHistory per line, flushed as soon as it is written.
+
+	A crash loses at most the step that was being written; HistoryReader ignores a
+	trailing partial line.
+	"""
+
+	def __init__(self, path: str | Path, screenshot_store: Optional[ScreenshotStore] = None, mode: str = 'a'):
+		self.path = Path(path)
+		self.screenshot_store = screenshot_store
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		if mode == 'a':
+			self._drop_partial_line()
+		self._file = open(self.path, mode, encoding='utf-8')
+
+	def _drop_partial_line(self) -> None:
+		"""Cut off a step left half-written by a crash, so the next line starts cleanly."""
+		if not self.path.exists():
+			return
+		with open(self.path, 'rb+') as f:
+			size = f.seek(0, os.SEEK_END)
+			position = size
+			while position > 0:
+				chunk_start = max(position - 65536, 0)
+				f.seek(chunk_start)
+				newline = f.read(position - chunk_start).rfind(b'\n')
+				if newline != -1:
+					position = chunk_start + newline + 1
+					break
+				position = chunk_start
+			if position != size:
+				logger.warning(f'Dropping an incomplete last step from {self.path}')
+				f.truncate(position)
+
+	def append(self, history_item: 'AgentHistory') -> None:
+		data = history_item.model_dump()
+		externalize_screenshot(data['state'], self.screenshot_store)
+		self._file.write(json.dumps(data) + '\n')
+		self._file.flush()
+
+	def close(self) -> None:
+		if not self._file.closed:
+			self._file.close()
+
+	def __enter__(self) -> 'HistoryWriter':
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		self.close()
+
+
+class HistoryReader:
+	"""
+	Lazy reader for JSONL histories written by HistoryWriter.
+
+	Opening the file only builds an index of line offsets; steps are parsed and validated
+	when they are accessed, by position or while iterating.
+	"""
+
+	def __init__(self, path: str | Path, output_model: Type['AgentOutput']):
+		self.path = Path(path)
+		self.output_model = output_model
+		self._offsets = self._build_index()
+
+	def _build_index(self) -> list[int]:
+		offsets = []
+		with open(self.path, 'rb') as f:
+			offset = 0
+			for line in f:
+				# A line without its newline is a step that was being written when the run stopped
+				if line.endswith(b'\n') and line.strip():
+					offsets.append(offset)
+				offset += len(line)
+		return offsets
+
+	def __len__(self) -> int:
+		return len(self._offsets)
+
+	def read_raw(self, index: int) -> dict[str, Any]:
+		"""The JSON of one step, without validation."""
+		with open(self.path, 'rb') as f:
+			f.seek(self._offsets[index])
+			return json.loads(f.readline())
+
+	def __getitem__(self, index: int) -> 'AgentHistory':
+		# Imported here: agent.views imports this module
+		from browser_use.agent.views import AgentHistory
+
+		return AgentHistory.load_from_dict(self.read_raw(index), self.output_model)
+
+	def __iter__(self) -> Iterator['AgentHistory']:
+		from browser_use.agent.views import AgentHistory
+
+		with open(self.path, 'rb') as f:
+			for offset in self._offsets:
+				f.seek(offset)
+				yield AgentHistory.load_from_dict(json.loads(f.readline()), self.output_model)
+
+	def to_history_list(self) -> 'AgentHistoryList':
+		from browser_use.agent.views import AgentHistoryList
+
+		return AgentHistoryList(history=list(self))
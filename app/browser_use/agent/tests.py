@@ -1,5 +1,9 @@
+import base64
+import json
+
 import pytest
 
+from browser_use.agent.storage import HistoryReader, HistoryWriter
 from browser_use.agent.views import (
 	ActionResult,
 	AgentBrain,
@@ -10,7 +14,9 @@ from browser_use.agent.views import (
 from browser_use.browser.views import BrowserState, BrowserStateHistory, TabInfo
 from browser_use.controller.registry.service import Registry
 from browser_use.controller.views import ClickElementAction, DoneAction, ExtractPageContentAction
+from browser_use.dom.history_tree_processor.view import DOMHistoryElement
 from browser_use.dom.views import DOMElementNode
+from browser_use.storage import ScreenshotStore
 
 
 @pytest.fixture
@@ -63,7 +69,7 @@ def sample_history(action_registry):
 
 	extract_action = action_registry(extract_page_content={'value': 'text'})
 
-	done_action = action_registry(done={'text': 'Task completed'})
+	done_action = action_registry(done={'text': 'Task completed', 'success': True})
 
 	histories = [
 		AgentHistory(
@@ -81,7 +87,11 @@ def sample_history(action_registry):
 				title='Page 1',
 				tabs=[TabInfo(url='https://example.com', title='Page 1', page_id=1)],
 				screenshot='screenshot1.png',
-				interacted_element=[{'xpath': '//button[1]'}],
+				interacted_element=[
+					DOMHistoryElement(
+						tag_name='button', xpath='//button[1]', highlight_index=None, entire_parent_branch_path=[], attributes={}
+					)
+				],
 			),
 		),
 		AgentHistory(
@@ -105,7 +115,11 @@ def sample_history(action_registry):
 				title='Page 2',
 				tabs=[TabInfo(url='https://example.com/page2', title='Page 2', page_id=2)],
 				screenshot='screenshot2.png',
-				interacted_element=[{'xpath': '//div[1]'}],
+				interacted_element=[
+					DOMHistoryElement(
+						tag_name='div', xpath='//div[1]', highlight_index=None, entire_parent_branch_path=[], attributes={}
+					)
+				],
 			),
 		),
 		AgentHistory(
@@ -123,7 +137,11 @@ def sample_history(action_registry):
 				title='Page 2',
 				tabs=[TabInfo(url='https://example.com/page2', title='Page 2', page_id=2)],
 				screenshot='screenshot3.png',
-				interacted_element=[{'xpath': '//div[1]'}],
+				interacted_element=[
+					DOMHistoryElement(
+						tag_name='div', xpath='//div[1]', highlight_index=None, entire_parent_branch_path=[], attributes={}
+					)
+				],
 			),
 		),
 	]
@@ -133,13 +151,12 @@ def sample_history(action_registry):
 def test_last_model_output(sample_history: AgentHistoryList):
 	last_output = sample_history.last_action()
 	print(last_output)
-	assert last_output == {'done': {'text': 'Task completed'}}
+	assert last_output == {'done': {'text': 'Task completed', 'success': True}}
 
 
 def test_get_errors(sample_history: AgentHistoryList):
 	errors = sample_history.errors()
-	assert len(errors) == 1
-	assert errors[0] == 'Failed to extract completely'
+	assert errors == [None, 'Failed to extract completely', None]
 
 
 def test_final_result(sample_history: AgentHistoryList):
@@ -169,7 +186,7 @@ def test_all_model_outputs(sample_history: AgentHistoryList):
 	# get first key value pair
 	assert dict([next(iter(outputs[0].items()))]) == {'click_element': {'index': 1}}
 	assert dict([next(iter(outputs[1].items()))]) == {'extract_page_content': {'value': 'text'}}
-	assert dict([next(iter(outputs[2].items()))]) == {'done': {'text': 'Task completed'}}
+	assert dict([next(iter(outputs[2].items()))]) == {'done': {'text': 'Task completed', 'success': True}}
 
 
 def test_all_model_outputs_filtered(sample_history: AgentHistoryList):
@@ -186,6 +203,71 @@ def test_empty_history():
 	assert len(empty_history.urls()) == 0
 
 
+def test_screenshot_store_deduplicates(tmp_path):
+	store = ScreenshotStore(tmp_path)
+	frame = base64.b64encode(b'frame bytes').decode()
+	path = store.put(frame, 'image/jpeg')
+	assert path.endswith('.jpg')
+	assert store.put(frame, 'image/jpeg') == path
+	assert len(list(tmp_path.rglob('*.jpg'))) == 1
+	assert ScreenshotStore.load(path) == frame
+
+
+def test_history_with_stored_screenshots(tmp_path, sample_history: AgentHistoryList):
+	store = ScreenshotStore(tmp_path / 'blobs')
+	frame = base64.b64encode(b'frame bytes').decode()
+	for h in sample_history.history:
+		h.state.screenshot = frame
+
+	history_file = tmp_path / 'history.json'
+	sample_history.save_to_file(history_file, screenshot_store=store)
+	data = json.loads(history_file.read_text())
+	assert all(h['state']['screenshot'] is None for h in data['history'])
+	assert len({h['state']['screenshot_path'] for h in data['history']}) == 1
+
+	state = BrowserStateHistory(
+		url='https://example.com',
+		title='Page 1',
+		tabs=[],
+		interacted_element=[None],
+		screenshot_path=data['history'][0]['state']['screenshot_path'],
+	)
+	assert state.has_screenshot
+	assert state.get_screenshot() == frame
+	assert state.get_screenshot_bytes() == b'frame bytes'
+
+
+def test_jsonl_history_round_trip(tmp_path, action_registry, sample_history: AgentHistoryList):
+	output_model = AgentOutput.type_with_custom_actions(action_registry)
+	history_file = tmp_path / 'history.jsonl'
+	with HistoryWriter(history_file) as writer:
+		for h in sample_history.history:
+			writer.append(h)
+
+	reader = HistoryReader(history_file, output_model)
+	assert len(reader) == 3
+	assert reader[2].state.url == 'https://example.com/page2'
+	assert [h.state.title for h in reader] == ['Page 1', 'Page 2', 'Page 2']
+	assert reader.to_history_list().final_result() == 'Task completed'
+	assert AgentHistoryList.load_from_file(history_file, output_model).model_actions() == sample_history.model_actions()
+
+
+def test_jsonl_history_drops_partial_step(tmp_path, action_registry, sample_history: AgentHistoryList):
+	output_model = AgentOutput.type_with_custom_actions(action_registry)
+	history_file = tmp_path / 'history.jsonl'
+	with HistoryWriter(history_file) as writer:
+		writer.append(sample_history.history[0])
+	# Simulate a crash in the middle of writing the second step
+	with open(history_file, 'a', encoding='utf-8') as f:
+		f.write('{"model_output": {"current_')
+	assert len(HistoryReader(history_file, output_model)) == 1
+
+	# Appending after the crash continues on a clean line
+	with HistoryWriter(history_file) as writer:
+		writer.append(sample_history.history[1])
+	assert [h.state.title for h in HistoryReader(history_file, output_model)] == ['Page 1', 'Page 2']
+
+
 # Add a test to verify action creation
 def test_action_creation(action_registry):
 	click_action = action_registry(click_element={'index': 1})
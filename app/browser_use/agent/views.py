@@ -12,6 +12,7 @@ from openai import RateLimitError
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
 
 from browser_use.agent.message_manager.views import MessageManagerState
+from browser_use.agent.storage import HistoryReader, HistoryWriter, externalize_screenshot
 from browser_use.browser.views import BrowserStateHistory
 from browser_use.controller.registry.views import ActionModel
 from browser_use.dom.history_tree_processor.service import (
@@ -20,6 +21,7 @@ from browser_use.dom.history_tree_processor.service import (
 	HistoryTreeProcessor,
 )
 from browser_use.dom.views import SelectorMap
+from browser_use.storage import ScreenshotStore
 
 ToolCallingMethod = Literal['function_calling', 'json_mode', 'raw', 'auto']
 
@@ -37,6 +39,10 @@ class AgentSettings(BaseModel):
 	validate_output: bool = False
 	message_context: Optional[str] = None
 	generate_gif: bool | str = False
+	# Keep step screenshots as content-addressed files in this directory instead of in memory
+	screenshot_store_dir: Optional[str] = None
+	# Write every step to this JSONL file as soon as it is made; the agent's first step replaces an existing file
+	history_path: Optional[str] = None
 	available_file_paths: Optional[list[str]] = None
 	override_system_message: Optional[str] = None
 	extend_system_message: Optional[str] = None
@@ -173,6 +179,18 @@ class AgentHistory(BaseModel):
 				elements.append(None)
 		return elements
 
+	@classmethod
+	def load_from_dict(cls, data: Dict[str, Any], output_model: Type[AgentOutput]) -> 'AgentHistory':
+		"""Validate one dumped history item, enriching model_output with the custom actions of output_model"""
+		if data['model_output']:
+			if isinstance(data['model_output'], dict):
+				data['model_output'] = output_model.model_validate(data['model_output'])
+			else:
+				data['model_output'] = None
+		if 'interacted_element' not in data['state']:
+			data['state']['interacted_element'] = None
+		return cls.model_validate(data)
+
 	def model_dump(self, **kwargs) -> Dict[str, Any]:
 		"""Custom serialization handling circular references"""
 
@@ -230,11 +248,23 @@ class AgentHistoryList(BaseModel):
 		"""Representation of the AgentHistoryList object"""
 		return self.__str__()
 
-	def save_to_file(self, filepath: str | Path) -> None:
-		"""Save history to JSON file with proper serialization"""
+	def save_to_file(self, filepath: str | Path, screenshot_store: Optional[ScreenshotStore] = None) -> None:
+		"""
+		Save history to JSON file with proper serialization.
+		With a screenshot_store, inline screenshots are written there and saved as references.
+		A .jsonl path is written one step per line (see HistoryWriter).
+		"""
 		try:
+			if Path(filepath).suffix == '.jsonl':
+				with HistoryWriter(filepath, screenshot_store=screenshot_store, mode='w') as writer:
+					for h in self.history:
+						writer.append(h)
+				return
+
 			Path(filepath).parent.mkdir(parents=True, exist_ok=True)
 			data = self.model_dump()
+			for h in data['history']:
+				externalize_screenshot(h['state'], screenshot_store)
 			with open(filepath, 'w', encoding='utf-8') as f:
 				json.dump(data, f, indent=2)
 		except Exception as e:
@@ -248,20 +278,14 @@ class AgentHistoryList(BaseModel):
 
 	@classmethod
 	def load_from_file(cls, filepath: str | Path, output_model: Type[AgentOutput]) -> 'AgentHistoryList':
-		"""Load history from JSON file"""
+		"""Load history from JSON file, or from a JSONL file written by HistoryWriter"""
+		if Path(filepath).suffix == '.jsonl':
+			return HistoryReader(filepath, output_model).to_history_list()
+
 		with open(filepath, 'r', encoding='utf-8') as f:
 			data = json.load(f)
-		# loop through history and validate output_model actions to enrich with custom actions
-		for h in data['history']:
-			if h['model_output']:
-				if isinstance(h['model_output'], dict):
-					h['model_output'] = output_model.model_validate(h['model_output'])
-				else:
-					h['model_output'] = None
-			if 'interacted_element' not in h['state']:
-				h['state']['interacted_element'] = None
-		history = cls.model_validate(data)
-		return history
+		# validate output_model actions to enrich with custom actions
+		return cls(history=[AgentHistory.load_from_dict(h, output_model) for h in data['history']])
 
 	def last_action(self) -> None | dict:
 		"""Last action in history"""
@@ -310,7 +334,7 @@ class AgentHistoryList(BaseModel):
 
 	def screenshots(self) -> list[str | None]:
 		"""Get all screenshots from history"""
-		return [h.state.screenshot if h.state.screenshot is not None else None for h in self.history]
+		return [h.state.get_screenshot() for h in self.history]
 
 	def action_names(self) -> list[str]:
 		"""Get all action names from history"""
@@ -3,7 +3,6 @@ Playwright browser on steroids.
 """
 
 import asyncio
-import base64
 import gc
 import json
 import logging
@@ -11,7 +10,9 @@ import os
 import re
 import time
 import uuid
+import weakref
 from dataclasses import dataclass, field
+from importlib import resources
 from typing import TYPE_CHECKING, Optional, TypedDict
 
 from playwright._impl._errors import TimeoutError
@@ -25,13 +26,17 @@ from playwright.async_api import (
 	Page,
 )
 
+from browser_use.browser.interception import InterceptionStats, RequestInterceptor
+from browser_use.browser.network import NetworkIdleTracker
+from browser_use.browser.screenshot import ScreenshotEncoder
+from browser_use.browser.timing import AdaptiveTiming, WaitBudget, get_adaptive_timing
 from browser_use.browser.views import (
 	BrowserError,
 	BrowserState,
 	TabInfo,
 	URLNotAllowedError,
 )
-from browser_use.dom.service import DomService
+from browser_use.dom.service import DomService, build_dom_tree_install_script
 from browser_use.dom.views import DOMElementNode, SelectorMap
 from browser_use.utils import time_execution_async, time_execution_sync
 
@@ -40,6 +45,50 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Set by buildDomTree.js on every highlighted element of the last snapshot; visible to the page's own scripts
+HIGHLIGHT_INDEX_ATTRIBUTE = 'data-browser-use-index'
+
+# Valid class names in CSS
+VALID_CLASS_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Attributes that are stable and useful for selection
+SAFE_SELECTOR_ATTRIBUTES = frozenset(
+	{
+		# Data attributes (if they're stable in your application)
+		'id',
+		# Standard HTML attributes
+		'name',
+		'type',
+		'placeholder',
+		# Accessibility attributes
+		'aria-label',
+		'aria-labelledby',
+		'aria-describedby',
+		'role',
+		# Common form attributes
+		'for',
+		'autocomplete',
+		'required',
+		'readonly',
+		# Media attributes
+		'alt',
+		'title',
+		'src',
+		# Custom stable attributes (add any application-specific ones)
+		'href',
+		'target',
+	}
+)
+DYNAMIC_SELECTOR_ATTRIBUTES = frozenset(
+	{
+		'data-id',
+		'data-qa',
+		'data-cy',
+		'data-testid',
+	}
+)
+
 
 class BrowserContextWindowSize(TypedDict):
 	width: int
@@ -107,6 +156,33 @@ class BrowserContextConfig:
 
 	    include_dynamic_attributes: bool = True
 	        Include dynamic attributes in the CSS selector. If you want to reuse the css_selectors, it might be better to set this to False.
+
+	    screenshot_format: 'png'
+	        Format of the screenshots in the browser state: 'png', 'jpeg' or 'webp'. PNG and JPEG are encoded by the browser; WebP needs Pillow (falls back to JPEG without it).
+
+	    screenshot_quality: None
+	        Quality (0-100) for 'jpeg' and 'webp' screenshots. None uses the encoder default.
+
+	    screenshot_max_dimension: None
+	        Downscale screenshots so that their longer side is at most this many pixels. Needs Pillow.
+
+	    skip_unchanged_screenshots: False
+	        Reuse the previous screenshot without capturing a new one when the page fingerprint (see skip_unchanged_state, with the same exceptions) and the highlight overlay are unchanged since it was taken, and without re-encoding when a captured frame is byte-identical to the previous one. Installs the page observer.
+
+	    interception_profile: None
+	        Block requests the agent does not need, via a CDP Fetch session on each page that only pauses matching requests (a Playwright route would disable the HTTP cache). One of 'ads' (ad, tracker and analytics domains), 'media' (also audio, video and fonts) or 'text' (also images). Blocked requests and estimated bytes saved are counted in BrowserContext.interception_stats.
+
+	    adaptive_timing: False
+	        Learn per origin how long pages take to become quiet after an action (no tracked requests and no DOM changes; installs the page observer) and derive minimum_wait_page_load_time, maximum_wait_page_load_time and wait_between_actions from high percentiles of those samples. The configured values act as upper bounds and are used until an origin has enough samples.
+
+	    timing_profile_path: None
+	        JSON file to persist the learned timing profile across runs (only with adaptive_timing), saved periodically and when the context closes. Contexts using the same path share one profile.
+
+	    skip_unchanged_state: False
+	        Reuse the last state (DOM tree and screenshot) in get_state when the current document, URL, scroll position, viewport, focused element and open tabs are unchanged and no DOM mutation, input or focus change happened since it was taken. Never applies after a click, input, key or select action, nor on pages with frames, shadow roots, canvases or custom elements, whose changes the observer cannot see. Installs a mutation observer in every page.
+
+	    incremental_dom: False
+	        Send only added, removed or changed DOM nodes after the first snapshot of a page and patch the previous element tree instead of rebuilding it. A mutation observer is installed in every page; if nothing changed since the last snapshot the DOM walk is skipped entirely. Highlight indices stay stable per element for the lifetime of a document, so they are no longer contiguous. Trade-off: each page keeps a JSON copy of every node of its last snapshot to diff against (about the size of one full snapshot; elements themselves are held weakly), and a walk that does run still serializes every node, so it pays off on large pages that change little between steps and costs slightly more than a plain snapshot on pages that change a lot.
 	"""
 
 	cookies_file: str | None = None
@@ -132,6 +208,15 @@ class BrowserContextConfig:
 	viewport_expansion: int = 500
 	allowed_domains: list[str] | None = None
 	include_dynamic_attributes: bool = True
+	screenshot_format: str = 'png'
+	screenshot_quality: int | None = None
+	screenshot_max_dimension: int | None = None
+	skip_unchanged_screenshots: bool = False
+	interception_profile: str | None = None
+	adaptive_timing: bool = False
+	timing_profile_path: str | None = None
+	skip_unchanged_state: bool = False
+	incremental_dom: bool = False
 
 	_force_keep_context_alive: bool = False
 
@@ -140,6 +225,8 @@ class BrowserContextConfig:
 class BrowserSession:
 	context: PlaywrightBrowserContext
 	cached_state: BrowserState | None
+	# Page fingerprint taken together with cached_state; see BrowserContext._get_state_fingerprint
+	state_fingerprint: tuple | None = None
 
 
 @dataclass
@@ -169,6 +256,25 @@ class BrowserContext:
 		# Initialize these as None - they'll be set up when needed
 		self.session: BrowserSession | None = None
 
+		# One DomService per page; in incremental mode it also holds the tree the next diff is applied to
+		self._dom_services: weakref.WeakKeyDictionary[Page, DomService] = weakref.WeakKeyDictionary()
+		self._interceptor = RequestInterceptor.from_name(config.interception_profile) if config.interception_profile else None
+		self._screenshot_encoder = ScreenshotEncoder(
+			format=config.screenshot_format,
+			quality=config.screenshot_quality,
+			max_dimension=config.screenshot_max_dimension,
+			skip_unchanged=config.skip_unchanged_screenshots,
+		)
+		self._timing: AdaptiveTiming | None = get_adaptive_timing(config.timing_profile_path) if config.adaptive_timing else None
+
+		# Element lookups of the current snapshot, cleared whenever a new one is taken:
+		# highlight index -> (element, page, handle, in iframe) and id(element) -> (element, selector)
+		self._locate_cache: dict[int, tuple[DOMElementNode, Page, ElementHandle, bool]] = {}
+		self._selector_cache: dict[int, tuple[DOMElementNode, str]] = {}
+
+		# One request tracker per page, so network idle waits do not re-subscribe every step
+		self._network_trackers: weakref.WeakKeyDictionary[Page, NetworkIdleTracker] = weakref.WeakKeyDictionary()
+
 	async def __aenter__(self):
 		"""Async context manager entry"""
 		await self._initialize_session()
@@ -198,6 +304,16 @@ class BrowserContext:
 
 			await self.save_cookies()
 
+			if self._timing:
+				await self._timing.save()
+
+			if self._interceptor:
+				stats = self._interceptor.stats
+				logger.debug(
+					f'Interception profile {self._interceptor.profile.name!r} blocked {stats.requests_saved} requests '
+					f'(~{stats.bytes_saved_estimate / 1024:.0f} KB): {dict(stats.blocked_requests)}'
+				)
+
 			if self.config.trace_path:
 				try:
 					await self.session.context.tracing.stop(path=os.path.join(self.config.trace_path, f'{self.context_id}.zip'))
@@ -278,6 +394,9 @@ class BrowserContext:
 						self.state.target_id = target['targetId']
 						break
 
+		# Track requests of the initial navigation too
+		self._get_network_tracker(active_page)
+
 		# Bring page to front
 		await active_page.bring_to_front()
 		await active_page.wait_for_load_state('load')
@@ -375,176 +494,92 @@ class BrowserContext:
             """
 		)
 
-		return context
-
-	async def _wait_for_stable_network(self):
-		page = await self.get_current_page()
-
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
-
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
+		if self._interceptor:
+			await self._interceptor.attach(context)
 
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request started: {request.url} ({request.resource_type})')
+		if (
+			self.config.incremental_dom
+			or self.config.skip_unchanged_state
+			or self.config.skip_unchanged_screenshots
+			or self.config.adaptive_timing
+		):
+			await context.add_init_script(resources.read_text('browser_use.dom', 'domObserver.js'))
 
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
+		await context.add_init_script(build_dom_tree_install_script())
 
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
+		return context
 
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
+	async def _wait_for_stable_network(self, budget: WaitBudget | None = None):
+		page = await self.get_current_page()
+		tracker = self._get_network_tracker(page)
+		budget = budget or self._wait_budget(page.url)
 
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
+		start_time = asyncio.get_running_loop().time()
+		idle = await tracker.wait_for_idle(idle_time=budget.network_idle, timeout=budget.maximum_wait)
 
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request resolved: {request.url} ({content_type})')
+		if self._timing:
+			# Time to quiescence; a timeout counts as the full budget so slow sites win it back
+			if idle:
+				network_settle = max(tracker.last_activity - start_time, 0.0)
+				settle_time = max(network_settle, await self._dom_settle_time(page, start_time))
+			else:
+				settle_time = budget.maximum_wait
+			await self._timing.record(page.url, settle_time)
+
+		if not idle:
+			pending_urls = tracker.pending_urls
+			logger.debug(
+				f'Network timeout after {budget.maximum_wait}s with {len(pending_urls)} '
+				f'pending requests: {pending_urls}'
+			)
+			return
 
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
+		logger.debug(f'Network stabilized for {budget.network_idle} seconds')
 
+	async def _dom_settle_time(self, page: Page, start_time: float) -> float:
+		"""Seconds from start_time (event loop time) to the last DOM change the observer saw; 0 if unknown."""
 		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
-				now = asyncio.get_event_loop().time()
-				if len(pending_requests) == 0 and (now - last_activity) >= self.config.wait_for_network_idle_page_load_time:
-					break
-				if now - start_time > self.config.maximum_wait_page_load_time:
-					logger.debug(
-						f'Network timeout after {self.config.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
-					)
-					break
+			since_change = await page.evaluate(
+				"""() => {
+					const observer = window.__browserUseDomObserver;
+					return observer && observer.lastChange !== undefined ? performance.now() - observer.lastChange : null;
+				}"""
+			)
+		except Exception as e:
+			logger.debug(f'Failed to read DOM settle time: {e}')
+			return 0.0
+		if since_change is None:
+			return 0.0
+		return max(asyncio.get_running_loop().time() - start_time - since_change / 1000, 0.0)
+
+	def _wait_budget(self, url: str) -> WaitBudget:
+		if self._timing:
+			return self._timing.budget(url, self.config)
+		return WaitBudget(
+			minimum_wait=self.config.minimum_wait_page_load_time,
+			network_idle=self.config.wait_for_network_idle_page_load_time,
+			maximum_wait=self.config.maximum_wait_page_load_time,
+			between_actions=self.config.wait_between_actions,
+		)
 
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
+	@property
+	def interception_stats(self) -> InterceptionStats | None:
+		return self._interceptor.stats if self._interceptor else None
 
-		logger.debug(f'Network stabilized for {self.config.wait_for_network_idle_page_load_time} seconds')
+	async def get_wait_budget(self) -> WaitBudget:
+		"""Page-load and between-action waits for the current page (learned if adaptive_timing)."""
+		page = await self.get_current_page()
+		return self._wait_budget(page.url)
+
+	def _get_network_tracker(self, page: Page) -> NetworkIdleTracker:
+		"""The page's request tracker, attached on first use and kept until the page closes."""
+		tracker = self._network_trackers.get(page)
+		if tracker is None:
+			tracker = NetworkIdleTracker(page)
+			self._network_trackers[page] = tracker
+			# The tracker holds the page, so its weak key alone would never be released
+			page.once('close', lambda closed_page: self._network_trackers.pop(closed_page, None))
+		return tracker
 
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
@@ -554,10 +589,11 @@ class BrowserContext:
 		"""
 		# Start timing
 		start_time = time.time()
+		budget = await self.get_wait_budget()
 
 		# Wait for page load
 		try:
-			await self._wait_for_stable_network()
+			await self._wait_for_stable_network(budget)
 
 			# Check if the loaded URL is allowed
 			page = await self.get_current_page()
@@ -570,7 +606,7 @@ class BrowserContext:
 
 		# Calculate remaining time to meet minimum WAIT_TIME
 		elapsed = time.time() - start_time
-		remaining = max((timeout_overwrite or self.config.minimum_wait_page_load_time) - elapsed, 0)
+		remaining = max((timeout_overwrite or budget.minimum_wait) - elapsed, 0)
 
 		logger.debug(f'--Page loaded in {elapsed:.2f} seconds, waiting for additional {remaining:.2f} seconds')
 
@@ -670,11 +706,29 @@ class BrowserContext:
 		return await page.evaluate(script)
 
 	@time_execution_sync('--get_state')  # This decorator might need to be updated to handle async
-	async def get_state(self) -> BrowserState:
-		"""Get the current state of the browser"""
+	async def get_state(self, include_screenshot: bool = True) -> BrowserState:
+		"""
+		Get the current state of the browser.
+
+		Callers that do not look at the image (no vision, no GIF) pass include_screenshot=False
+		to skip capturing and encoding it.
+		"""
 		await self._wait_for_page_and_frames_load()
 		session = await self.get_session()
-		session.cached_state = await self._update_state()
+
+		fingerprint = await self._get_state_fingerprint(session) if self.config.skip_unchanged_state else None
+		cached_state = session.cached_state
+		if (
+			fingerprint is not None
+			and cached_state is not None
+			and fingerprint == session.state_fingerprint
+			and (cached_state.screenshot is not None or not include_screenshot)
+		):
+			logger.debug('Page unchanged since last state, reusing it')
+			return cached_state
+
+		session.cached_state = await self._update_state(include_screenshot=include_screenshot)
+		session.state_fingerprint = fingerprint
 
 		# Save cookies if a file is specified
 		if self.config.cookies_file:
@@ -682,47 +736,78 @@ class BrowserContext:
 
 		return session.cached_state
 
-	async def _update_state(self, focus_element: int = -1) -> BrowserState:
-		"""Update and return state."""
-		session = await self.get_session()
+	def invalidate_state(self) -> None:
+		"""Make the next get_state take a new snapshot even if the page fingerprint is unchanged."""
+		if self.session:
+			self.session.state_fingerprint = None
 
-		# Check if current page is still valid, if not switch to another available page
+	async def _get_state_fingerprint(self, session: BrowserSession) -> tuple | None:
+		"""
+		Cheap summary of everything the state depends on: the document (a token set by the
+		observer init script), its change counter, URL, scroll position, viewport, focused
+		element and the open tabs. None if it cannot be determined: the observer is not
+		installed, or the last DOM walk met content the observer cannot watch (the `opaque`
+		flag set by buildDomTree.js).
+		"""
 		try:
 			page = await self.get_current_page()
-			# Test if page is still accessible
-			await page.evaluate('1')
+			probe = await page.evaluate(
+				"""() => {
+					const observer = window.__browserUseDomObserver;
+					if (!observer || observer.opaque !== false) return null;
+					const active = document.activeElement;
+					const focused = active ? [active.tagName, active.id, active.getAttribute('data-browser-use-index')] : null;
+					return [observer.token, observer.version, location.href, window.scrollX, window.scrollY, window.innerWidth, window.innerHeight, JSON.stringify(focused)];
+				}"""
+			)
 		except Exception as e:
-			logger.debug(f'Current page is no longer accessible: {str(e)}')
-			# Get all available pages
-			pages = session.context.pages
-			if pages:
-				self.state.target_id = None
-				page = await self._get_current_page(session)
-				logger.debug(f'Switched to page: {await page.title()}')
-			else:
-				raise BrowserError('Browser closed: no valid pages available')
+			logger.debug(f'Failed to fingerprint page: {e}')
+			return None
 
-		try:
-			await self.remove_highlights()
-			dom_service = DomService(page)
-			content = await dom_service.get_clickable_elements(
-				focus_element=focus_element,
-				viewport_expansion=self.config.viewport_expansion,
-				highlight_elements=self.config.highlight_elements,
-			)
+		if probe is None:
+			return None
+		return (*probe, tuple(p.url for p in session.context.pages))
+
+	async def _update_state(self, focus_element: int = -1, include_screenshot: bool = True) -> BrowserState:
+		"""Update and return state."""
+		session = await self.get_session()
+
+		# Indices, stamps and handles of the previous snapshot are about to be replaced
+		self._locate_cache.clear()
+		self._selector_cache.clear()
 
-			screenshot_b64 = await self.take_screenshot()
-			pixels_above, pixels_below = await self.get_scroll_info(page)
+		# The DOM evaluation below doubles as the liveness check; only probe the page
+		# separately when it is known to be gone or that evaluation failed
+		page = await self.get_current_page()
+		if page.is_closed():
+			page = await self._switch_to_live_page(session)
+
+		try:
+			try:
+				content = await self._get_clickable_elements(page, focus_element)
+			except Exception:
+				live_page = await self._switch_to_live_page(session, page)
+				if live_page is page:
+					raise
+				page = live_page
+				content = await self._get_clickable_elements(page, focus_element)
+
+			if include_screenshot:
+				screenshot_b64, tabs = await asyncio.gather(self.take_screenshot(), self.get_tabs_info())
+			else:
+				screenshot_b64, tabs = None, await self.get_tabs_info()
+			page_info = content.page_info
 
 			self.current_state = BrowserState(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
 				url=page.url,
-				title=await page.title(),
-				tabs=await self.get_tabs_info(),
+				title=page_info.title,
+				tabs=tabs,
 				screenshot=screenshot_b64,
-				pixels_above=pixels_above,
-				pixels_below=pixels_below,
+				screenshot_mime_type=self._screenshot_encoder.mime_type,
+				pixels_above=page_info.pixels_above,
+				pixels_below=page_info.pixels_below,
 			)
 
 			return self.current_state
@@ -733,27 +818,85 @@ class BrowserContext:
 				return self.current_state
 			raise
 
+	async def _get_clickable_elements(self, page: Page, focus_element: int):
+		dom_service = self._get_dom_service(page)
+		return await dom_service.get_clickable_elements(
+			focus_element=focus_element,
+			viewport_expansion=self.config.viewport_expansion,
+			highlight_elements=self.config.highlight_elements,
+			remove_highlights=True,
+		)
+
+	async def _switch_to_live_page(self, session: BrowserSession, page: Page | None = None) -> Page:
+		"""
+		Returns `page` if it still responds, otherwise switches to another available page.
+		"""
+		if page is not None:
+			try:
+				# Test if page is still accessible
+				await page.evaluate('1')
+				return page
+			except Exception as e:
+				logger.debug(f'Current page is no longer accessible: {str(e)}')
+
+		# Get all available pages
+		pages = session.context.pages
+		if not pages:
+			raise BrowserError('Browser closed: no valid pages available')
+
+		self.state.target_id = None
+		page = await self._get_current_page(session)
+		logger.debug(f'Switched to page: {await page.title()}')
+		return page
+
 	# region - Browser Actions
 	@time_execution_async('--take_screenshot')
 	async def take_screenshot(self, full_page: bool = False) -> str:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, in the configured
+		format (see BrowserContext.screenshot_mime_type).
 		"""
 		page = await self.get_current_page()
 
 		await page.bring_to_front()
 		await page.wait_for_load_state()
 
+		key = await self._screenshot_key(page, full_page) if self.config.skip_unchanged_screenshots else None
+		reused = self._screenshot_encoder.reused(key)
+		if reused is not None:
+			logger.debug('Page unchanged since last screenshot, reusing it')
+			return reused
+
 		screenshot = await page.screenshot(
 			full_page=full_page,
 			animations='disabled',
+			**self._screenshot_encoder.capture_options(),
 		)
 
-		screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
+		# Hashing, resizing and base64 are CPU bound; keep them off the event loop
+		return await asyncio.to_thread(self._screenshot_encoder.encode, screenshot, key)
 
-		# await self.remove_highlights()
+	async def _screenshot_key(self, page: Page, full_page: bool) -> tuple | None:
+		"""
+		What a screenshot of the page depends on: the state fingerprint plus our highlight
+		overlay, whose changes the observer deliberately ignores. None if unknown.
+		"""
+		session = await self.get_session()
+		fingerprint = await self._get_state_fingerprint(session)
+		if fingerprint is None:
+			return None
+		try:
+			overlay = await page.evaluate(
+				"() => document.getElementById('playwright-highlight-container')?.textContent ?? null"
+			)
+		except Exception as e:
+			logger.debug(f'Failed to read highlight overlay: {e}')
+			return None
+		return (fingerprint, overlay, full_page)
 
-		return screenshot_b64
+	@property
+	def screenshot_mime_type(self) -> str:
+		return self._screenshot_encoder.mime_type
 
 	@time_execution_async('--remove_highlights')
 	async def remove_highlights(self):
@@ -857,9 +1000,6 @@ class BrowserContext:
 
 			# Handle class attributes
 			if 'class' in element.attributes and element.attributes['class'] and include_dynamic_attributes:
-				# Define a regex pattern for valid class names in CSS
-				valid_class_name_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
-
 				# Iterate through the class attribute values
 				classes = element.attributes['class'].split()
 				for class_name in classes:
@@ -868,59 +1008,18 @@ class BrowserContext:
 						continue
 
 					# Check if the class name is valid
-					if valid_class_name_pattern.match(class_name):
+					if VALID_CLASS_NAME_PATTERN.match(class_name):
 						# Append the valid class name to the CSS selector
 						css_selector += f'.{class_name}'
 					else:
 						# Skip invalid class names
 						continue
 
-			# Expanded set of safe attributes that are stable and useful for selection
-			SAFE_ATTRIBUTES = {
-				# Data attributes (if they're stable in your application)
-				'id',
-				# Standard HTML attributes
-				'name',
-				'type',
-				'placeholder',
-				# Accessibility attributes
-				'aria-label',
-				'aria-labelledby',
-				'aria-describedby',
-				'role',
-				# Common form attributes
-				'for',
-				'autocomplete',
-				'required',
-				'readonly',
-				# Media attributes
-				'alt',
-				'title',
-				'src',
-				# Custom stable attributes (add any application-specific ones)
-				'href',
-				'target',
-			}
-
-			if include_dynamic_attributes:
-				dynamic_attributes = {
-					'data-id',
-					'data-qa',
-					'data-cy',
-					'data-testid',
-				}
-				SAFE_ATTRIBUTES.update(dynamic_attributes)
-
 			# Handle other attributes
 			for attribute, value in element.attributes.items():
-				if attribute == 'class':
-					continue
-
-				# Skip invalid attribute names
-				if not attribute.strip():
-					continue
-
-				if attribute not in SAFE_ATTRIBUTES:
+				if attribute not in SAFE_SELECTOR_ATTRIBUTES and not (
+					include_dynamic_attributes and attribute in DYNAMIC_SELECTOR_ATTRIBUTES
+				):
 					continue
 
 				# Escape special characters in attribute names
@@ -932,7 +1031,7 @@ class BrowserContext:
 				elif any(char in value for char in '"\'<>`\n\r\t'):
 					# Use contains for values with special characters
 					# Regex-substitute *any* whitespace with a single space, then strip.
-					collapsed_value = re.sub(r'\s+', ' ', value).strip()
+					collapsed_value = WHITESPACE_PATTERN.sub(' ', value).strip()
 					# Escape embedded double-quotes.
 					safe_value = collapsed_value.replace('"', '\\"')
 					css_selector += f'[{safe_attribute}*="{safe_value}"]'
@@ -948,7 +1047,27 @@ class BrowserContext:
 
 	@time_execution_async('--get_locate_element')
 	async def get_locate_element(self, element: DOMElementNode) -> Optional[ElementHandle]:
-		current_frame = await self.get_current_page()
+		"""
+		Resolves an element of the current snapshot to a handle. Highlighted elements are
+		selected by the index buildDomTree.js stamped on them if exactly one element carries
+		it, falling back to a CSS selector built from the element; handles and selectors are
+		cached until the next snapshot.
+		"""
+		page = await self.get_current_page()
+		index = element.highlight_index
+
+		cached = self._locate_cache.get(index) if index is not None else None
+		if cached is not None and cached[0] is element and cached[1] is page:
+			element_handle = cached[2]
+			try:
+				if not cached[3]:
+					await element_handle.scroll_into_view_if_needed()
+				return element_handle
+			except Exception as e:
+				logger.debug(f'Cached element handle is no longer usable: {str(e)}')
+				del self._locate_cache[index]
+
+		current_frame: Page | FrameLocator = page
 
 		# Start with the target element and collect all parents
 		parents: list[DOMElementNode] = []
@@ -964,37 +1083,66 @@ class BrowserContext:
 		# Process all iframe parents in sequence
 		iframes = [item for item in parents if item.tag_name == 'iframe']
 		for parent in iframes:
-			css_selector = self._enhanced_css_selector_for_element(
-				parent,
-				include_dynamic_attributes=self.config.include_dynamic_attributes,
-			)
-			current_frame = current_frame.frame_locator(css_selector)
+			current_frame = current_frame.frame_locator(self._css_selector_for(parent))
 
-		css_selector = self._enhanced_css_selector_for_element(
-			element, include_dynamic_attributes=self.config.include_dynamic_attributes
-		)
+		css_selectors = [self._css_selector_for(element)]
+		if index is not None:
+			css_selectors.insert(0, f'[{HIGHLIGHT_INDEX_ATTRIBUTE}="{index}"]')
 
 		try:
-			if isinstance(current_frame, FrameLocator):
-				element_handle = await current_frame.locator(css_selector).element_handle()
-				return element_handle
-			else:
-				# Try to scroll into view if hidden
-				element_handle = await current_frame.query_selector(css_selector)
+			element_handle = None
+			in_frame = isinstance(current_frame, FrameLocator)
+			for css_selector in css_selectors:
+				# A node the page cloned carries the same stamp, so the index is only trusted if unique
+				stamped = css_selector is not css_selectors[-1]
+				if in_frame:
+					locator = current_frame.locator(css_selector)
+					# element_handle() waits for a match; only ask once exactly one exists
+					if stamped and await locator.count() != 1:
+						continue
+					element_handle = await locator.element_handle()
+				elif stamped:
+					matches = await current_frame.query_selector_all(css_selector)
+					if len(matches) == 1:
+						element_handle = matches[0]
+					else:
+						for match in matches:
+							await match.dispose()
+				else:
+					element_handle = await current_frame.query_selector(css_selector)
 				if element_handle:
-					await element_handle.scroll_into_view_if_needed()
-					return element_handle
+					break
+
+			if not element_handle:
 				return None
+			if not in_frame:
+				# Try to scroll into view if hidden
+				await element_handle.scroll_into_view_if_needed()
+			if index is not None:
+				self._locate_cache[index] = (element, page, element_handle, in_frame)
+			return element_handle
 		except Exception as e:
 			logger.error(f'Failed to locate element: {str(e)}')
 			return None
 
+	def _css_selector_for(self, element: DOMElementNode) -> str:
+		"""_enhanced_css_selector_for_element, memoized per snapshot."""
+		cached = self._selector_cache.get(id(element))
+		if cached is not None and cached[0] is element:
+			return cached[1]
+		css_selector = self._enhanced_css_selector_for_element(
+			element, include_dynamic_attributes=self.config.include_dynamic_attributes
+		)
+		self._selector_cache[id(element)] = (element, css_selector)
+		return css_selector
+
 	@time_execution_async('--input_text_element_node')
 	async def _input_text_element_node(self, element_node: DOMElementNode, text: str):
 		"""
 		Input text into an element with proper error handling and state management.
 		Handles different types of input fields and ensures proper element state before input.
 		"""
+		self.invalidate_state()
 		try:
 			# Highlight before typing
 			# if element_node.highlight_index is not None:
@@ -1031,6 +1179,7 @@ class BrowserContext:
 		"""
 		Optimized method to click an element using xpath.
 		"""
+		self.invalidate_state()
 		page = await self.get_current_page()
 
 		try:
@@ -1092,12 +1241,9 @@ class BrowserContext:
 		"""Get information about all tabs"""
 		session = await self.get_session()
 
-		tabs_info = []
-		for page_id, page in enumerate(session.context.pages):
-			tab_info = TabInfo(page_id=page_id, url=page.url, title=await page.title())
-			tabs_info.append(tab_info)
-
-		return tabs_info
+		pages = session.context.pages
+		titles = await asyncio.gather(*(page.title() for page in pages))
+		return [TabInfo(page_id=page_id, url=page.url, title=title) for page_id, (page, title) in enumerate(zip(pages, titles))]
 
 	@time_execution_async('--switch_to_tab')
 	async def switch_to_tab(self, page_id: int) -> None:
@@ -1226,13 +1372,21 @@ class BrowserContext:
 
 	async def get_scroll_info(self, page: Page) -> tuple[int, int]:
 		"""Get scroll position information for the current page."""
-		scroll_y = await page.evaluate('window.scrollY')
-		viewport_height = await page.evaluate('window.innerHeight')
-		total_height = await page.evaluate('document.documentElement.scrollHeight')
+		scroll_y, viewport_height, total_height = await page.evaluate(
+			'[window.scrollY, window.innerHeight, document.documentElement.scrollHeight]'
+		)
 		pixels_above = scroll_y
 		pixels_below = total_height - (scroll_y + viewport_height)
 		return pixels_above, pixels_below
 
+	def _get_dom_service(self, page: Page) -> DomService:
+		dom_service = self._dom_services.get(page)
+		if dom_service is None:
+			dom_service = DomService(page, incremental=self.config.incremental_dom)
+			self._dom_services[page] = dom_service
+			page.once('close', lambda closed_page: self._dom_services.pop(closed_page, None))
+		return dom_service
+
 	async def reset_context(self):
 		"""Reset the browser session
 		Call this when you don't want to kill the context but just kill the state
@@ -1245,7 +1399,15 @@ class BrowserContext:
 			await page.close()
 
 		session.cached_state = None
+		session.state_fingerprint = None
 		self.state.target_id = None
+		self._dom_services.clear()
+		self._network_trackers.clear()
+		self._locate_cache.clear()
+		self._selector_cache.clear()
+		self._screenshot_encoder.reset()
+		if self._interceptor:
+			self._interceptor.stats = InterceptionStats()
 
 	async def _get_unique_filename(self, directory, filename):
 		"""Generate a unique filename by appending (1), (2), etc., if a file already exists."""
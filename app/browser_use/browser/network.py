@@ -0,0 +1,246 @@
+"""
+Event-driven network idle detection for a single page.
+"""
+
+import asyncio
+import logging
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from playwright.async_api import Page, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Resource types that matter for page load
+RELEVANT_RESOURCE_TYPES = frozenset(
+	{
+		'document',
+		'stylesheet',
+		'image',
+		'font',
+		'script',
+		'iframe',
+	}
+)
+
+RELEVANT_CONTENT_TYPES = (
+	'text/html',
+	'text/css',
+	'application/javascript',
+	'image/',
+	'font/',
+	'application/json',
+)
+
+# Responses that never really "finish" loading
+STREAMING_CONTENT_TYPES = (
+	'streaming',
+	'video',
+	'audio',
+	'webm',
+	'mp4',
+	'event-stream',
+	'websocket',
+	'protobuf',
+)
+
+# Additional patterns to filter out
+IGNORED_URL_PATTERNS = (
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+)
+
+
+def _compile_matcher(patterns: tuple[str, ...]) -> re.Pattern:
+	"""One alternation regex instead of a substring scan per pattern."""
+	return re.compile('|'.join(re.escape(pattern) for pattern in sorted(patterns, key=len, reverse=True)))
+
+
+IGNORED_URL_MATCHER = _compile_matcher(IGNORED_URL_PATTERNS)
+RELEVANT_CONTENT_TYPE_MATCHER = _compile_matcher(RELEVANT_CONTENT_TYPES)
+STREAMING_CONTENT_TYPE_MATCHER = _compile_matcher(STREAMING_CONTENT_TYPES)
+
+MAX_RELEVANT_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB
+
+
+def is_relevant_request(request: 'Request') -> bool:
+	"""Whether a request should keep the page from being considered idle."""
+	# Filter by resource type (also drops websocket, media, eventsource, manifest and other)
+	if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+		return False
+
+	# Filter out by URL patterns, data URLs and blob URLs
+	url = request.url.lower()
+	if url.startswith(('data:', 'blob:')) or IGNORED_URL_MATCHER.search(url):
+		return False
+
+	# Filter out requests with certain headers
+	headers = request.headers
+	if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in ('video', 'audio'):
+		return False
+
+	return True
+
+
+def is_relevant_response(response: 'Response') -> bool:
+	"""Whether a finished response counts as page-load activity."""
+	content_type = response.headers.get('content-type', '').lower()
+	if STREAMING_CONTENT_TYPE_MATCHER.search(content_type):
+		return False
+	if not RELEVANT_CONTENT_TYPE_MATCHER.search(content_type):
+		return False
+
+	# Skip if response is too large (likely not essential for page load)
+	content_length = response.headers.get('content-length')
+	if content_length and content_length.isdigit() and int(content_length) > MAX_RELEVANT_CONTENT_LENGTH:
+		return False
+	return True
+
+
+class NetworkIdleTracker:
+	"""
+	Keeps track of the in-flight page-load requests of one page.
+
+	Attached once per page and kept for its lifetime, so requests started between two
+	steps are seen too. wait_for_idle() sleeps until a request event or the end of the
+	quiet period, whichever comes first, instead of polling. A request still pending
+	after a whole wait budget (long poll, stalled connection) is forgotten, so it holds
+	up at most one wait instead of every later one.
+	"""
+
+	def __init__(self, page: 'Page'):
+		self.page = page
+		# request -> event loop time it started
+		self._pending: dict['Request', float] = {}
+		self._last_activity = asyncio.get_running_loop().time()
+		self._changed = asyncio.Event()
+
+		page.on('request', self._on_request)
+		page.on('response', self._on_response)
+		page.on('requestfailed', self._on_request_failed)
+		page.on('close', self._on_close)
+
+	@property
+	def last_activity(self) -> float:
+		"""Event loop time of the last tracked request start or completion."""
+		return self._last_activity
+
+	@property
+	def pending_urls(self) -> list[str]:
+		return [request.url for request in self._pending]
+
+	def detach(self) -> None:
+		for event, handler in (
+			('request', self._on_request),
+			('response', self._on_response),
+			('requestfailed', self._on_request_failed),
+			('close', self._on_close),
+		):
+			try:
+				self.page.remove_listener(event, handler)
+			except Exception:
+				pass
+		self._pending.clear()
+		self._changed.set()
+
+	def _forget_started_before(self, cutoff: float) -> None:
+		stale = [request for request, started in self._pending.items() if started < cutoff]
+		for request in stale:
+			del self._pending[request]
+		if stale:
+			logger.debug(f'Ignoring {len(stale)} long-pending requests: {[request.url for request in stale]}')
+
+	def _touch(self) -> None:
+		self._last_activity = asyncio.get_running_loop().time()
+		self._changed.set()
+
+	def _on_request(self, request: 'Request') -> None:
+		if is_relevant_request(request):
+			self._pending[request] = asyncio.get_running_loop().time()
+			self._touch()
+
+	def _on_response(self, response: 'Response') -> None:
+		request = response.request
+		if request not in self._pending:
+			return
+
+		del self._pending[request]
+		if is_relevant_response(response):
+			self._touch()
+		else:
+			self._changed.set()
+
+	def _on_request_failed(self, request: 'Request') -> None:
+		# Failed requests never get a response; without this they would block until the timeout
+		if request in self._pending:
+			del self._pending[request]
+			self._changed.set()
+
+	def _on_close(self, page: 'Page') -> None:
+		self.detach()
+
+	async def wait_for_idle(self, idle_time: float, timeout: float) -> bool:
+		"""
+		Wait until no relevant request has been pending for `idle_time` seconds, counted
+		from the later of the last request activity and the start of this call.
+		Requests that were already pending for `timeout` seconds when it is called are
+		ignored. Returns False if `timeout` expired first.
+		"""
+		loop = asyncio.get_running_loop()
+		start_time = loop.time()
+		deadline = start_time + timeout
+		self._forget_started_before(start_time - timeout)
+
+		while True:
+			now = loop.time()
+			if not self._pending:
+				quiet_since = max(self._last_activity, start_time)
+				if now - quiet_since >= idle_time:
+					return True
+				sleep_for = min(quiet_since + idle_time, deadline) - now
+			else:
+				sleep_for = deadline - now
+
+			if sleep_for <= 0:
+				return False
+
+			self._changed.clear()
+			try:
+				await asyncio.wait_for(self._changed.wait(), timeout=sleep_for)
+			except asyncio.TimeoutError:
+				pass
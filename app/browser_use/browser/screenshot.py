@@ -0,0 +1,120 @@
+"""
+Screenshot encoding: output format and quality, downscaling and reuse of unchanged frames.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_MIME_TYPES = {
+	'png': 'image/png',
+	'jpeg': 'image/jpeg',
+	'webp': 'image/webp',
+}
+
+
+def _load_pil() -> Any:
+	try:
+		from PIL import Image
+	except ImportError:
+		return None
+	return Image
+
+
+class ScreenshotEncoder:
+	"""
+	Turns raw Playwright screenshots into base64 strings in the configured format.
+
+	PNG and JPEG are encoded by the browser. WebP and downscaling to `max_dimension` need
+	Pillow; without it the encoder falls back to JPEG at the original size. With
+	`skip_unchanged`, the previous base64 string is returned as is when the caller's page
+	key matches the one of the previous frame (reused(), checked before capturing) or when
+	the captured bytes are identical to the previous frame's (encode()). encode() is CPU
+	bound and meant to be run in a worker thread.
+	"""
+
+	def __init__(
+		self,
+		format: str = 'png',
+		quality: Optional[int] = None,
+		max_dimension: Optional[int] = None,
+		skip_unchanged: bool = False,
+	):
+		if format not in SCREENSHOT_MIME_TYPES:
+			raise ValueError(f'Unknown screenshot format {format!r}, expected one of {sorted(SCREENSHOT_MIME_TYPES)}')
+
+		self._image = _load_pil()
+		if self._image is None and (format == 'webp' or max_dimension):
+			logger.warning('Pillow is not installed: screenshots are taken as JPEG at their original size')
+			format = 'jpeg' if format == 'webp' else format
+			max_dimension = None
+
+		self.format = format
+		self.quality = quality
+		self.max_dimension = max_dimension
+		self.skip_unchanged = skip_unchanged
+
+		self._last_digest: Optional[bytes] = None
+		self._last_key: Any = None
+		self._last_b64: Optional[str] = None
+
+	@property
+	def mime_type(self) -> str:
+		return SCREENSHOT_MIME_TYPES[self.format]
+
+	@property
+	def _reencodes(self) -> bool:
+		return self.format == 'webp' or bool(self.max_dimension)
+
+	def capture_options(self) -> dict[str, Any]:
+		"""Keyword arguments for page.screenshot()."""
+		# Frames that are re-encoded anyway are captured lossless
+		if self.format == 'png' or self._reencodes:
+			return {'type': 'png'}
+		options: dict[str, Any] = {'type': 'jpeg'}
+		if self.quality is not None:
+			options['quality'] = self.quality
+		return options
+
+	def reused(self, key: Any) -> Optional[str]:
+		"""The previous frame if `key` (a summary of the page taken before capturing) is unchanged."""
+		if self.skip_unchanged and key is not None and key == self._last_key:
+			return self._last_b64
+		return None
+
+	def encode(self, raw: bytes, key: Any = None) -> str:
+		"""Base64 of a captured frame; `key` is remembered for reused()."""
+		digest = hashlib.blake2b(raw).digest() if self.skip_unchanged else None
+		if digest is not None and digest == self._last_digest and self._last_b64 is not None:
+			self._last_key = key
+			return self._last_b64
+
+		data = raw
+		if self._image is not None and self._reencodes:
+			image = self._image.open(io.BytesIO(raw))
+			if self.max_dimension and max(image.size) > self.max_dimension:
+				image.thumbnail((self.max_dimension, self.max_dimension), self._image.Resampling.LANCZOS)
+
+			output = io.BytesIO()
+			if self.format == 'png':
+				image.save(output, format='PNG', optimize=False)
+			else:
+				save_options = {'quality': self.quality} if self.quality is not None else {}
+				image.convert('RGB').save(output, format=self.format.upper(), **save_options)
+			data = output.getvalue()
+
+		screenshot_b64 = base64.b64encode(data).decode('utf-8')
+		self._last_digest = digest
+		self._last_key = key
+		self._last_b64 = screenshot_b64
+		return screenshot_b64
+
+	def reset(self) -> None:
+		"""Forget the previous frame, so nothing is reused across sessions."""
+		self._last_digest = None
+		self._last_key = None
+		self._last_b64 = None
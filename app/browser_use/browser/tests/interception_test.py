@@ -0,0 +1,76 @@
+import pytest
+
+from browser_use.browser.interception import RequestInterceptor
+
+
+def test_ads_profile_blocks_tracker_domains_and_subdomains():
+	interceptor = RequestInterceptor.from_name('ads')
+
+	assert interceptor.should_block('https://www.google-analytics.com/g/collect', 'xhr')
+	assert interceptor.should_block('https://securepubads.g.doubleclick.net/tag/js/gpt.js', 'script')
+	assert not interceptor.should_block('https://example.com/doubleclick.net.js', 'script')
+	assert not interceptor.should_block('https://notdoubleclick.net/app.js', 'script')
+	assert not interceptor.should_block('https://example.com/logo.png', 'image')
+
+
+def test_text_profile_blocks_heavy_resource_types():
+	interceptor = RequestInterceptor.from_name('text')
+
+	assert interceptor.should_block('https://example.com/logo.png', 'image')
+	assert interceptor.should_block('https://example.com/font.woff2', 'font')
+	assert not interceptor.should_block('https://example.com/site.css', 'stylesheet')
+	assert not interceptor.should_block('https://example.com/', 'document')
+
+
+def test_bytes_saved_estimate_uses_allowed_responses():
+	stats = RequestInterceptor.from_name('media').stats
+	stats.record_response('font', 30_000)
+	stats.record_response('font', 50_000)
+	stats.record_blocked('font')
+	stats.record_blocked('media')
+
+	assert stats.requests_saved == 2
+	assert stats.bytes_saved_estimate == 40_000
+
+
+def test_unknown_profile():
+	with pytest.raises(ValueError):
+		RequestInterceptor.from_name('everything')
+
+
+def test_fetch_patterns_only_pause_listed_domains_and_blocked_types():
+	ads = RequestInterceptor.from_name('ads')
+	assert {'urlPattern': '*://*.doubleclick.net/*', 'requestStage': 'Request'} in ads._fetch_patterns
+	assert not any('resourceType' in pattern for pattern in ads._fetch_patterns)
+	assert all(pattern.get('urlPattern') != '*' for pattern in ads._fetch_patterns)
+
+	text = RequestInterceptor.from_name('text')
+	assert {pattern['resourceType'] for pattern in text._fetch_patterns if 'resourceType' in pattern} == {'Font', 'Image', 'Media'}
+
+
+class _RecordingSession:
+	def __init__(self):
+		self.sent = []
+
+	async def send(self, method, params=None):
+		self.sent.append((method, params))
+
+
+@pytest.mark.asyncio
+async def test_paused_requests_are_failed_or_continued():
+	interceptor = RequestInterceptor.from_name('ads')
+	session = _RecordingSession()
+
+	await interceptor._on_request_paused(
+		session, {'requestId': '1', 'resourceType': 'Script', 'request': {'url': 'https://ad.doubleclick.net/gpt.js'}}
+	)
+	# Matched by the wildcard pattern, but the host is not a listed domain
+	await interceptor._on_request_paused(
+		session, {'requestId': '2', 'resourceType': 'XHR', 'request': {'url': 'https://example.com/?u=https://ad.doubleclick.net/x'}}
+	)
+
+	assert session.sent == [
+		('Fetch.failRequest', {'requestId': '1', 'errorReason': 'BlockedByClient'}),
+		('Fetch.continueRequest', {'requestId': '2'}),
+	]
+	assert interceptor.stats.blocked_requests == {'script': 1}
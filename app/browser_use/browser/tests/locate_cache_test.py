@@ -0,0 +1,103 @@
+import asyncio
+
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.dom.views import DOMElementNode
+
+
+class FakeHandle:
+	def __init__(self):
+		self.disposed = False
+
+	async def scroll_into_view_if_needed(self):
+		pass
+
+	async def dispose(self):
+		self.disposed = True
+
+
+class FakePage:
+	def __init__(self, stamped: int = 1):
+		# Number of elements carrying the stamped index (more than one if the page cloned it)
+		self.stamped = stamped
+		self.queries = []
+		self.handle = FakeHandle()
+
+	async def query_selector(self, selector):
+		self.queries.append(selector)
+		return self.handle
+
+	async def query_selector_all(self, selector):
+		assert selector.startswith('[data-browser-use-index=')
+		self.queries.append(selector)
+		self.matches = [self.handle] if self.stamped == 1 else [FakeHandle() for _ in range(self.stamped)]
+		return self.matches
+
+
+def _context(page):
+	context = BrowserContext(browser=None, config=BrowserContextConfig())
+
+	async def get_current_page():
+		return page
+
+	context.get_current_page = get_current_page
+	return context
+
+
+def _button(index=3):
+	body = DOMElementNode(is_visible=True, parent=None, tag_name='body', xpath='body', attributes={}, children=[])
+	button = DOMElementNode(
+		is_visible=True,
+		parent=body,
+		tag_name='button',
+		xpath='body/button[2]',
+		attributes={'class': 'primary', 'type': 'submit'},
+		children=[],
+		highlight_index=index,
+	)
+	body.children.append(button)
+	return button
+
+
+def test_stamped_index_is_used_and_cached():
+	page = FakePage()
+	context = _context(page)
+	button = _button()
+
+	async def locate_twice():
+		first = await context.get_locate_element(button)
+		second = await context.get_locate_element(button)
+		return first, second
+
+	first, second = asyncio.run(locate_twice())
+	assert first is second is page.handle
+	assert page.queries == ['[data-browser-use-index="3"]']
+
+
+def test_falls_back_to_css_selector_without_stamp():
+	page = FakePage(stamped=0)
+	context = _context(page)
+	asyncio.run(context.get_locate_element(_button()))
+	assert page.queries == [
+		'[data-browser-use-index="3"]',
+		'body > button:nth-of-type(2).primary[type="submit"]',
+	]
+
+
+def test_duplicate_stamp_falls_back_to_css_selector():
+	page = FakePage(stamped=2)
+	context = _context(page)
+	assert asyncio.run(context.get_locate_element(_button())) is page.handle
+	assert all(match.disposed for match in page.matches)
+	assert page.queries == [
+		'[data-browser-use-index="3"]',
+		'body > button:nth-of-type(2).primary[type="submit"]',
+	]
+
+
+def test_cache_is_per_element():
+	page = FakePage()
+	context = _context(page)
+	asyncio.run(context.get_locate_element(_button()))
+	# Same index in a newer snapshot is a different element and is resolved again
+	asyncio.run(context.get_locate_element(_button()))
+	assert len(page.queries) == 2
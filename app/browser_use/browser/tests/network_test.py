@@ -0,0 +1,105 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from browser_use.browser.network import NetworkIdleTracker, is_relevant_request
+
+
+class FakePage:
+	def __init__(self):
+		self.listeners = {}
+
+	def on(self, event, handler):
+		self.listeners.setdefault(event, []).append(handler)
+
+	def remove_listener(self, event, handler):
+		self.listeners[event].remove(handler)
+
+	def emit(self, event, payload):
+		for handler in list(self.listeners.get(event, [])):
+			handler(payload)
+
+
+class FakeRequest:
+	def __init__(self, url, resource_type):
+		self.url = url
+		self.resource_type = resource_type
+		self.headers = {}
+
+
+def _request(url='https://example.com/app.js', resource_type='script'):
+	return FakeRequest(url, resource_type)
+
+
+def _response(request, content_type='application/javascript'):
+	return SimpleNamespace(request=request, headers={'content-type': content_type})
+
+
+def test_ignored_requests():
+	assert is_relevant_request(_request())
+	assert not is_relevant_request(_request('https://www.google-analytics.com/collect'))
+	assert not is_relevant_request(_request('data:image/png;base64,AAAA', 'image'))
+	assert not is_relevant_request(_request(resource_type='websocket'))
+
+
+def test_wait_for_idle_waits_for_pending_request():
+	async def scenario():
+		page = FakePage()
+		tracker = NetworkIdleTracker(page)
+		request = _request()
+		page.emit('request', request)
+
+		async def respond():
+			await asyncio.sleep(0.2)
+			page.emit('response', _response(request))
+
+		start = time.perf_counter()
+		responder = asyncio.create_task(respond())
+		assert await tracker.wait_for_idle(idle_time=0.1, timeout=2)
+		await responder
+		return time.perf_counter() - start
+
+	elapsed = asyncio.run(scenario())
+	# Response after 0.2s plus the 0.1s quiet period; the upper bound leaves room for slow CI machines
+	assert 0.28 <= elapsed < 1.0
+
+
+def test_failed_request_does_not_block_until_timeout():
+	async def scenario():
+		page = FakePage()
+		tracker = NetworkIdleTracker(page)
+		request = _request()
+		page.emit('request', request)
+		asyncio.get_running_loop().call_later(0.05, page.emit, 'requestfailed', request)
+		return await tracker.wait_for_idle(idle_time=0.05, timeout=1)
+
+	assert asyncio.run(scenario())
+
+
+def test_timeout_with_pending_request():
+	async def scenario():
+		page = FakePage()
+		tracker = NetworkIdleTracker(page)
+		page.emit('request', _request())
+		idle = await tracker.wait_for_idle(idle_time=0.05, timeout=0.1)
+		return idle, tracker.pending_urls
+
+	idle, pending_urls = asyncio.run(scenario())
+	assert not idle
+	assert pending_urls == ['https://example.com/app.js']
+
+
+def test_long_pending_request_is_forgotten():
+	async def scenario():
+		page = FakePage()
+		tracker = NetworkIdleTracker(page)
+		request = _request('https://example.com/poll')
+		page.emit('request', request)
+		# Started long before this wait, e.g. a stalled request from an earlier step
+		tracker._pending[request] -= 10
+		idle = await tracker.wait_for_idle(idle_time=0.05, timeout=1)
+		return idle, tracker.pending_urls
+
+	idle, pending_urls = asyncio.run(scenario())
+	assert idle
+	assert pending_urls == []
@@ -0,0 +1,72 @@
+import base64
+import io
+
+import pytest
+
+from browser_use.browser.screenshot import ScreenshotEncoder
+
+
+def test_browser_encoded_formats():
+	assert ScreenshotEncoder().capture_options() == {'type': 'png'}
+	encoder = ScreenshotEncoder(format='jpeg', quality=70)
+	assert encoder.capture_options() == {'type': 'jpeg', 'quality': 70}
+	assert encoder.mime_type == 'image/jpeg'
+	assert base64.b64decode(encoder.encode(b'frame')) == b'frame'
+
+	with pytest.raises(ValueError):
+		ScreenshotEncoder(format='gif')
+
+
+def test_unchanged_frame_reuses_previous_string(monkeypatch):
+	monkeypatch.setattr('browser_use.browser.screenshot._load_pil', lambda: None)
+	encoder = ScreenshotEncoder(format='jpeg', skip_unchanged=True)
+	first = encoder.encode(b'frame')
+	assert encoder.encode(b'frame') is first
+	assert encoder.encode(b'other') is not first
+
+	# A reset encoder (pooled context handed to a new task) never returns an earlier frame
+	last = encoder.encode(b'other')
+	encoder.reset()
+	assert encoder.encode(b'other') is not last
+
+
+def _png(color, size=(400, 300)):
+	Image = pytest.importorskip('PIL.Image')
+	from PIL import ImageDraw
+
+	image = Image.new('RGB', size, 'white')
+	ImageDraw.Draw(image).rectangle((50, 50, 250, 200), fill=color)
+	output = io.BytesIO()
+	image.save(output, format='PNG')
+	return output.getvalue()
+
+
+def test_downscale_and_webp():
+	Image = pytest.importorskip('PIL.Image')
+	raw = _png('red')
+	encoder = ScreenshotEncoder(format='webp', quality=60, max_dimension=200)
+	assert encoder.capture_options() == {'type': 'png'}
+
+	image = Image.open(io.BytesIO(base64.b64decode(encoder.encode(raw))))
+	assert image.format == 'WEBP'
+	assert max(image.size) == 200
+
+
+def test_identical_frame_is_not_reencoded():
+	encoder = ScreenshotEncoder(format='jpeg', quality=60, max_dimension=200, skip_unchanged=True)
+	first = encoder.encode(_png('red'))
+	assert encoder.encode(_png('red')) is first
+	# A small change in a large frame is still a new frame
+	assert encoder.encode(_png('#ff0001')) is not first
+
+
+def test_capture_is_skipped_only_for_the_same_key():
+	encoder = ScreenshotEncoder(skip_unchanged=True)
+	assert encoder.reused(('page', 1)) is None
+
+	first = encoder.encode(b'frame', key=('page', 1))
+	assert encoder.reused(('page', 1)) is first
+	assert encoder.reused(('page', 2)) is None
+	assert encoder.reused(None) is None
+
+	assert ScreenshotEncoder().reused(None) is None
@@ -0,0 +1,61 @@
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from browser_use.browser.timing import AdaptiveTiming
+
+CONFIG = SimpleNamespace(
+	minimum_wait_page_load_time=0.25,
+	wait_for_network_idle_page_load_time=0.5,
+	maximum_wait_page_load_time=5,
+	wait_between_actions=0.5,
+)
+
+
+@pytest.mark.asyncio
+async def test_defaults_until_enough_samples():
+	timing = AdaptiveTiming(min_samples=5)
+	for _ in range(4):
+		await timing.record('https://fast.example/page', 0.05)
+
+	budget = timing.budget('https://fast.example/other', CONFIG)
+	assert budget.maximum_wait == 5
+	assert budget.between_actions == 0.5
+
+
+@pytest.mark.asyncio
+async def test_fast_origin_gets_smaller_budget_than_slow_origin():
+	timing = AdaptiveTiming(min_samples=5)
+	for i in range(10):
+		await timing.record('https://fast.example/', 0.05 + i * 0.01)
+		await timing.record('https://slow.example/', 3.0)
+
+	fast = timing.budget('https://fast.example/search?q=1', CONFIG)
+	slow = timing.budget('https://slow.example/', CONFIG)
+
+	assert fast.maximum_wait < slow.maximum_wait <= CONFIG.maximum_wait_page_load_time
+	assert fast.minimum_wait < CONFIG.minimum_wait_page_load_time
+	assert fast.between_actions < CONFIG.wait_between_actions
+	assert fast.network_idle == CONFIG.wait_for_network_idle_page_load_time
+
+
+@pytest.mark.asyncio
+async def test_profile_persists(tmp_path):
+	path = str(tmp_path / 'timing.json')
+	timing = AdaptiveTiming(profile_path=path, min_samples=1)
+	await timing.record('https://example.com/a', 0.2)
+	await timing.save()
+
+	reloaded = AdaptiveTiming(profile_path=path, min_samples=1)
+	assert reloaded.budget('https://example.com/b', CONFIG) == timing.budget('https://example.com/b', CONFIG)
+	assert reloaded.budget('https://example.com/b', CONFIG).maximum_wait < CONFIG.maximum_wait_page_load_time
+
+
+@pytest.mark.asyncio
+async def test_profile_is_saved_periodically_while_recording(tmp_path):
+	path = tmp_path / 'timing.json'
+	timing = AdaptiveTiming(profile_path=str(path), save_interval=0)
+	await timing.record('https://example.com/a', 0.2)
+
+	assert AdaptiveTiming(profile_path=str(path))._samples == {'https://example.com': deque([0.2])}
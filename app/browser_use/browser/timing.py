@@ -0,0 +1,164 @@
+"""
+Adaptive per-origin page-load wait budgets.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+	from browser_use.browser.context import BrowserContextConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WaitBudget:
+	minimum_wait: float
+	network_idle: float
+	maximum_wait: float
+	between_actions: float
+
+
+def _origin(url: str) -> Optional[str]:
+	parsed = urlparse(url)
+	if not parsed.scheme.startswith('http') or not parsed.netloc:
+		return None
+	return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+	"""Linear-interpolated percentile of an already sorted, non-empty list."""
+	position = (len(sorted_samples) - 1) * q
+	lower = int(position)
+	upper = min(lower + 1, len(sorted_samples) - 1)
+	return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+class AdaptiveTiming:
+	"""
+	Learns, per origin, how long pages take to become quiet after an action and derives the
+	page-load waits from those samples instead of using one fixed budget for every site.
+
+	A sample is the time from the start of a wait until the page settled: the later of the
+	last tracked network activity and the last DOM change seen by the page observer (the
+	wait timeout if the network never became idle). With fewer than `min_samples` samples
+	for an origin the configured values are used unchanged; learned budgets never exceed them.
+	The profile is kept in memory and, if `profile_path` is set, persisted as JSON at most
+	every `save_interval` seconds while recording and on save(); the file is written in a
+	worker thread so the event loop is never blocked on disk IO.
+	"""
+
+	def __init__(
+		self,
+		profile_path: Optional[str] = None,
+		max_samples: int = 50,
+		min_samples: int = 5,
+		percentile: float = 0.9,
+		save_interval: float = 30.0,
+	):
+		self.profile_path = profile_path
+		self.max_samples = max_samples
+		self.min_samples = min_samples
+		self.percentile = percentile
+		self.save_interval = save_interval
+		self._samples: dict[str, deque[float]] = {}
+		self._dirty = False
+		self._last_save = time.monotonic()
+		self._save_lock = asyncio.Lock()
+		self._load()
+
+	async def record(self, url: str, settle_time: float) -> None:
+		origin = _origin(url)
+		if origin is None:
+			return
+		samples = self._samples.setdefault(origin, deque(maxlen=self.max_samples))
+		samples.append(round(max(settle_time, 0.0), 3))
+		self._dirty = True
+		# A crashed or killed run keeps what it learned up to the last periodic save
+		if time.monotonic() - self._last_save >= self.save_interval:
+			await self.save()
+
+	def budget(self, url: str, config: 'BrowserContextConfig') -> WaitBudget:
+		default = WaitBudget(
+			minimum_wait=config.minimum_wait_page_load_time,
+			network_idle=config.wait_for_network_idle_page_load_time,
+			maximum_wait=config.maximum_wait_page_load_time,
+			between_actions=config.wait_between_actions,
+		)
+
+		origin = _origin(url)
+		samples = self._samples.get(origin) if origin else None
+		if not samples or len(samples) < self.min_samples:
+			return default
+
+		ordered = sorted(samples)
+		typical = _percentile(ordered, 0.5)
+		high = _percentile(ordered, self.percentile)
+
+		return WaitBudget(
+			minimum_wait=min(default.minimum_wait, typical),
+			# The quiet period defines "idle"; it is not shortened
+			network_idle=default.network_idle,
+			# Headroom over the slow tail, but never more than configured
+			maximum_wait=min(default.maximum_wait, max(2 * high, 1.0) + default.network_idle),
+			between_actions=min(default.between_actions, max(typical, 0.1)),
+		)
+
+	def _load(self) -> None:
+		if not self.profile_path or not os.path.exists(self.profile_path):
+			return
+		try:
+			with open(self.profile_path, 'r') as f:
+				profile = json.load(f)
+			for origin, samples in profile.get('origins', {}).items():
+				self._samples[origin] = deque((float(s) for s in samples), maxlen=self.max_samples)
+			logger.debug(f'Loaded timing profile for {len(self._samples)} origins from {self.profile_path}')
+		except (OSError, ValueError, AttributeError) as e:
+			logger.warning(f'Ignoring unreadable timing profile {self.profile_path}: {e}')
+
+	async def save(self) -> None:
+		"""Write the profile atomically; no-op without a path or new samples."""
+		# Serialized so an older snapshot never replaces a newer one
+		async with self._save_lock:
+			if not self.profile_path or not self._dirty:
+				return
+			self._last_save = time.monotonic()
+			# Snapshot on the loop; samples recorded during the write mark the profile dirty again
+			profile = {'origins': {origin: list(samples) for origin, samples in self._samples.items()}}
+			self._dirty = False
+			try:
+				await asyncio.to_thread(self._write, profile)
+			except OSError as e:
+				self._dirty = True
+				logger.warning(f'Failed to save timing profile to {self.profile_path}: {e}')
+
+	def _write(self, profile: dict) -> None:
+		directory = os.path.dirname(os.path.abspath(self.profile_path))
+		os.makedirs(directory, exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+		try:
+			with os.fdopen(fd, 'w') as f:
+				json.dump(profile, f)
+			os.replace(tmp_path, self.profile_path)
+		except OSError:
+			os.unlink(tmp_path)
+			raise
+
+
+# Contexts with the same profile path share what they learn
+_profiles: dict[Optional[str], AdaptiveTiming] = {}
+
+
+def get_adaptive_timing(profile_path: Optional[str] = None) -> AdaptiveTiming:
+	timing = _profiles.get(profile_path)
+	if timing is None:
+		timing = _profiles[profile_path] = AdaptiveTiming(profile_path)
+	return timing
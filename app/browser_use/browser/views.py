@@ -1,8 +1,10 @@
+import base64
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
+from browser_use.storage import ScreenshotStore
 from browser_use.dom.history_tree_processor.service import DOMHistoryElement
 from browser_use.dom.views import DOMState
 
@@ -22,6 +24,7 @@ class BrowserState(DOMState):
 	title: str
 	tabs: list[TabInfo]
 	screenshot: Optional[str] = None
+	screenshot_mime_type: str = 'image/png'
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
@@ -34,11 +37,33 @@ class BrowserStateHistory:
 	tabs: list[TabInfo]
 	interacted_element: list[DOMHistoryElement | None] | list[None]
 	screenshot: Optional[str] = None
+	screenshot_mime_type: str = 'image/png'
+	# Blob in a ScreenshotStore, used instead of the inline base64 screenshot
+	screenshot_path: Optional[str] = None
+
+	def get_screenshot(self) -> Optional[str]:
+		"""Base64 screenshot, read from the screenshot store if it is not kept inline"""
+		if self.screenshot is not None or self.screenshot_path is None:
+			return self.screenshot
+		return ScreenshotStore.load(self.screenshot_path)
+
+	def get_screenshot_bytes(self) -> Optional[bytes]:
+		if self.screenshot is not None:
+			return base64.b64decode(self.screenshot)
+		if self.screenshot_path is not None:
+			return ScreenshotStore.load_bytes(self.screenshot_path)
+		return None
+
+	@property
+	def has_screenshot(self) -> bool:
+		return self.screenshot is not None or self.screenshot_path is not None
 
 	def to_dict(self) -> dict[str, Any]:
 		data = {}
 		data['tabs'] = [tab.model_dump() for tab in self.tabs]
 		data['screenshot'] = self.screenshot
+		data['screenshot_path'] = self.screenshot_path
+		data['screenshot_mime_type'] = self.screenshot_mime_type
 		data['interacted_element'] = [el.to_dict() if el else None for el in self.interacted_element]
 		data['url'] = self.url
 		data['title'] = self.title
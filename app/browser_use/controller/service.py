@@ -243,6 +243,7 @@ class Controller(Generic[Context]):
 			param_model=SendKeysAction,
 		)
 		async def send_keys(params: SendKeysAction, browser: BrowserContext):
+			browser.invalidate_state()
 			page = await browser.get_current_page()
 
 			try:
@@ -376,6 +377,7 @@ class Controller(Generic[Context]):
 			browser: BrowserContext,
 		) -> ActionResult:
 			"""Select dropdown option by the text of the option you want to select"""
+			browser.invalidate_state()
 			page = await browser.get_current_page()
 			selector_map = await browser.get_selector_map()
 			dom_element = selector_map[index]
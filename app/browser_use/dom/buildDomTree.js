@@ -4,11 +4,86 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    incremental: false,
+    knownEpoch: null,
+    knownSeq: -1,
+    compact: false,
+    removeHighlights: false,
+    pageInfo: false,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
+  const {
+    doHighlightElements,
+    focusHighlightIndex,
+    viewportExpansion,
+    debugMode,
+    incremental = false,
+    knownEpoch = null,
+    knownSeq = -1,
+    compact = false,
+    removeHighlights = false,
+    pageInfo = false,
+  } = args;
   let highlightIndex = 0; // Reset highlight index
 
+  /**
+   * Incremental snapshot state, kept on the window between calls.
+   *
+   * Node ids and highlight indices are bound to the DOM node itself (WeakMap), so an
+   * unchanged node serializes identically across snapshots and only the nodes whose
+   * data changed have to be sent back. `epoch` identifies this document, `seq` the
+   * last snapshot the caller received; if either does not match, a full map is sent.
+   *
+   * Memory: `serialized` holds the JSON of every node of the last walk (about the size of
+   * one full snapshot); it is rebuilt from each walk, so nodes that left the DOM drop out.
+   * Elements are only referenced weakly (WeakMap keys, WeakRefs in `highlighted`), so
+   * removed elements can still be garbage collected.
+   */
+  const INCREMENTAL = incremental ? (window.__browserUseIncremental ||= {
+    epoch: `${Date.now()}-${Math.random().toString(36).slice(2)}`,
+    seq: 0,
+    nodeIds: new WeakMap(),
+    nextNodeId: 0,
+    highlightIndices: new WeakMap(),
+    nextHighlightIndex: 0,
+    serialized: new Map(),
+    rootId: null,
+    highlighted: [],
+    domVersion: -1,
+    viewportExpansion: null,
+    opaque: true,
+  }) : null;
+
+  // Same cleanup as BrowserContext.remove_highlights, saving the caller a round trip
+  if (removeHighlights) {
+    document.getElementById("playwright-highlight-container")?.remove();
+    document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]').forEach((el) => {
+      el.removeAttribute("browser-user-highlight-id");
+    });
+  }
+
+  /**
+   * Adds what the caller would otherwise fetch with separate round trips (title, scroll
+   * metrics, readiness) to the result.
+   */
+  function withPageInfo(result) {
+    if (pageInfo) {
+      result.pageInfo = {
+        url: location.href,
+        title: document.title,
+        readyState: document.readyState,
+        scrollY: window.scrollY,
+        viewportHeight: window.innerHeight,
+        scrollHeight: document.documentElement.scrollHeight,
+      };
+    }
+    return result;
+  }
+
+  // Set by domObserver.js (init script); bumped on every relevant mutation, scroll or resize
+  const DOM_OBSERVER = window.__browserUseDomObserver || null;
+  const startVersion = DOM_OBSERVER ? DOM_OBSERVER.version : -1;
+
   // Add timing stack to handle recursion
   const TIMING_STACK = {
     nodeProcessing: [],
@@ -185,8 +260,173 @@
 
   const ID = { current: 0 };
 
+  // Highlighted elements of this snapshot; replayed when nothing changed since the last one
+  const HIGHLIGHTED = [];
+
+  // Iframe or shadow DOM content was walked; the observer cannot see mutations there
+  let sawOpaqueContent = false;
+  // Content whose changes the observer cannot see even though our map stays the same:
+  // cross-origin frames, pixels drawn into canvas/video, closed shadow roots of custom elements
+  let sawUnwatchedContent = false;
+
+  /**
+   * Returns the id for a node: sequential per call, or stable per node in incremental mode.
+   */
+  function getNodeId(node) {
+    if (!INCREMENTAL) return `${ID.current++}`;
+
+    let id = INCREMENTAL.nodeIds.get(node);
+    if (id === undefined) {
+      id = `${INCREMENTAL.nextNodeId++}`;
+      INCREMENTAL.nodeIds.set(node, id);
+    }
+    return id;
+  }
+
+  /**
+   * Returns the highlight index for an interactive element. In incremental mode an
+   * element keeps its index for the lifetime of the document, so inserting a new
+   * element does not renumber (and therefore resend) every element after it.
+   */
+  function getHighlightIndex(element) {
+    if (!INCREMENTAL) return highlightIndex++;
+
+    let index = INCREMENTAL.highlightIndices.get(element);
+    if (index === undefined) {
+      index = INCREMENTAL.nextHighlightIndex++;
+      INCREMENTAL.highlightIndices.set(element, index);
+    }
+    return index;
+  }
+
   const HIGHLIGHT_CONTAINER_ID = "playwright-highlight-container";
 
+  // Stamped on every highlighted element so BrowserContext can select it by index directly
+  const INDEX_ATTRIBUTE = "data-browser-use-index";
+
+  /**
+   * Writes the highlight index of this walk to each highlighted element and clears it
+   * from elements that were highlighted by the previous walk but no longer are.
+   *
+   * This is visible to the page: the attribute shows up in its DOM, in attribute
+   * selectors and in attribute MutationObservers (ours ignores it), and it stays on the
+   * elements between snapshots. The list of stamped elements holds them weakly, so
+   * elements the page removes can still be garbage collected.
+   */
+  function stampHighlightIndices() {
+    const current = new Set();
+    for (const { element, index } of HIGHLIGHTED) {
+      current.add(element);
+      const value = String(index);
+      if (element.getAttribute(INDEX_ATTRIBUTE) !== value) element.setAttribute(INDEX_ATTRIBUTE, value);
+    }
+    for (const ref of window.__browserUseStamped || []) {
+      const element = ref.deref();
+      if (element && !current.has(element)) element.removeAttribute(INDEX_ATTRIBUTE);
+    }
+    window.__browserUseStamped = [...current].map((element) => new WeakRef(element));
+  }
+
+  // Column order and flag bits of the compact format; DomService decodes with the same layout
+  const COMPACT_COLUMNS = ["kind", "name", "flags", "highlight", "parent", "xpathParent", "xpathSegment"];
+  const FLAG_VISIBLE = 1;
+  const FLAG_INTERACTIVE = 2;
+  const FLAG_TOP_ELEMENT = 4;
+  const FLAG_IN_VIEWPORT = 8;
+  const FLAG_SHADOW_ROOT = 16;
+
+  /**
+   * Encodes DOM_HASH_MAP as string table + Int32 columns instead of one object per node.
+   *
+   * Node i is the node with id i (post-order, so children come before their parent and
+   * siblings are in document order). Per node: kind (0 element, 1 text), name (tag or text,
+   * as string index), flags, highlight index (-1 if none), parent id (-1 for the root), and
+   * the xpath as a segment appended to the xpath of `xpathParent` (-1: segment is the full
+   * xpath). Attributes are (name, value) string index pairs, node i owning the pairs
+   * between attrOffsets[i] and attrOffsets[i + 1]. All columns are sent as one base64 blob.
+   */
+  function encodeCompact() {
+    const n = ID.current;
+    const strings = [];
+    const stringIndex = new Map();
+    const intern = (value) => {
+      let index = stringIndex.get(value);
+      if (index === undefined) {
+        index = strings.length;
+        strings.push(value);
+        stringIndex.set(value, index);
+      }
+      return index;
+    };
+
+    let attrCount = 0;
+    for (let i = 0; i < n; i++) {
+      const attributes = DOM_HASH_MAP[i].attributes;
+      if (attributes) attrCount += Object.keys(attributes).length;
+    }
+
+    const columns = new Int32Array(COMPACT_COLUMNS.length * n + n + 1 + 2 * attrCount);
+    const [kind, name, flags, highlight, parent, xpathParent, xpathSegment] =
+      COMPACT_COLUMNS.map((_, c) => columns.subarray(c * n, (c + 1) * n));
+    const attrOffsets = columns.subarray(COMPACT_COLUMNS.length * n, COMPACT_COLUMNS.length * n + n + 1);
+    const attrs = columns.subarray(COMPACT_COLUMNS.length * n + n + 1);
+
+    parent.fill(-1);
+    for (let i = 0; i < n; i++) {
+      const children = DOM_HASH_MAP[i].children;
+      if (children) {
+        for (const childId of children) parent[childId] = i;
+      }
+    }
+
+    let attrPos = 0;
+    for (let i = 0; i < n; i++) {
+      const nodeData = DOM_HASH_MAP[i];
+      attrOffsets[i] = attrPos;
+      highlight[i] = -1;
+      xpathParent[i] = -1;
+
+      if (nodeData.type === "TEXT_NODE") {
+        kind[i] = 1;
+        name[i] = intern(nodeData.text);
+        flags[i] = nodeData.isVisible ? FLAG_VISIBLE : 0;
+        continue;
+      }
+
+      name[i] = intern(nodeData.tagName);
+      flags[i] =
+        (nodeData.isVisible ? FLAG_VISIBLE : 0) |
+        (nodeData.isInteractive ? FLAG_INTERACTIVE : 0) |
+        (nodeData.isTopElement ? FLAG_TOP_ELEMENT : 0) |
+        (nodeData.isInViewport ? FLAG_IN_VIEWPORT : 0) |
+        (nodeData.shadowRoot ? FLAG_SHADOW_ROOT : 0);
+      if (nodeData.highlightIndex !== undefined) highlight[i] = nodeData.highlightIndex;
+
+      // Most xpaths are the parent's xpath plus one segment
+      const parentXPath = parent[i] >= 0 ? DOM_HASH_MAP[parent[i]].xpath : null;
+      if (parentXPath && nodeData.xpath.startsWith(parentXPath + "/")) {
+        xpathParent[i] = parent[i];
+        xpathSegment[i] = intern(nodeData.xpath.slice(parentXPath.length + 1));
+      } else {
+        xpathSegment[i] = intern(nodeData.xpath);
+      }
+
+      for (const [key, value] of Object.entries(nodeData.attributes)) {
+        attrs[attrPos++] = intern(key);
+        attrs[attrPos++] = intern(value);
+      }
+    }
+    attrOffsets[n] = attrPos;
+
+    const bytes = new Uint8Array(columns.buffer);
+    let binary = "";
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+      binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+
+    return { count: n, strings, columns: btoa(binary) };
+  }
+
   /**
    * Highlights an element in the DOM and returns the index of the next element.
    */
@@ -815,7 +1055,7 @@
         if (domElement) nodeData.children.push(domElement);
       }
 
-      const id = `${ID.current++}`;
+      const id = getNodeId(node);
       DOM_HASH_MAP[id] = nodeData;
       if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
       return id;
@@ -842,7 +1082,7 @@
         return null;
       }
 
-      const id = `${ID.current++}`;
+      const id = getNodeId(node);
       DOM_HASH_MAP[id] = {
         type: "TEXT_NODE",
         text: textContent,
@@ -884,6 +1124,7 @@
     if (isInteractiveCandidate(node) || node.tagName.toLowerCase() === 'iframe' || node.tagName.toLowerCase() === 'body') {
       const attributeNames = node.getAttributeNames?.() || [];
       for (const name of attributeNames) {
+        if (name === INDEX_ATTRIBUTE) continue;
         nodeData.attributes[name] = node.getAttribute(name);
       }
     }
@@ -899,7 +1140,8 @@
           nodeData.isInteractive = isInteractiveElement(node);
           if (nodeData.isInteractive) {
             nodeData.isInViewport = true;
-            nodeData.highlightIndex = highlightIndex++;
+            nodeData.highlightIndex = getHighlightIndex(node);
+            HIGHLIGHTED.push({ element: node, index: nodeData.highlightIndex, parentIframe });
 
             if (doHighlightElements) {
               if (focusHighlightIndex >= 0) {
@@ -919,11 +1161,16 @@
     if (node.tagName) {
       const tagName = node.tagName.toLowerCase();
 
+      if (tagName === "iframe" || tagName === "frame" || tagName === "canvas" || tagName === "video" || tagName.includes("-")) {
+        sawUnwatchedContent = true;
+      }
+
       // Handle iframes
       if (tagName === "iframe") {
         try {
           const iframeDoc = node.contentDocument || node.contentWindow?.document;
           if (iframeDoc) {
+            sawOpaqueContent = true;
             for (const child of iframeDoc.childNodes) {
               const domElement = buildDomTree(child, node);
               if (domElement) nodeData.children.push(domElement);
@@ -950,6 +1197,7 @@
       // Handle shadow DOM
       else if (node.shadowRoot) {
         nodeData.shadowRoot = true;
+        sawOpaqueContent = true;
         for (const child of node.shadowRoot.childNodes) {
           const domElement = buildDomTree(child, parentIframe);
           if (domElement) nodeData.children.push(domElement);
@@ -970,7 +1218,7 @@
       return null;
     }
 
-    const id = `${ID.current++}`;
+    const id = getNodeId(node);
     DOM_HASH_MAP[id] = nodeData;
     if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
     return id;
@@ -986,7 +1234,49 @@
   isTextNodeVisible = measureTime(isTextNodeVisible);
   getEffectiveScroll = measureTime(getEffectiveScroll);
 
+  /**
+   * Incremental fast path: the caller is in sync with our last snapshot and the observer
+   * saw no mutation, scroll or resize since then, so the walk would produce the same map.
+   * Only the highlights (removed by the caller before each snapshot) are redrawn.
+   */
+  if (
+    INCREMENTAL &&
+    DOM_OBSERVER &&
+    !INCREMENTAL.opaque &&
+    INCREMENTAL.rootId !== null &&
+    knownEpoch === INCREMENTAL.epoch &&
+    knownSeq === INCREMENTAL.seq &&
+    startVersion === INCREMENTAL.domVersion &&
+    viewportExpansion === INCREMENTAL.viewportExpansion
+  ) {
+    if (doHighlightElements) {
+      for (const { elementRef, index, parentIframeRef } of INCREMENTAL.highlighted) {
+        const element = elementRef.deref();
+        if (!element?.isConnected) continue;
+        if (focusHighlightIndex >= 0 && focusHighlightIndex !== index) continue;
+        highlightElement(element, index, parentIframeRef?.deref() ?? null);
+      }
+    }
+    INCREMENTAL.seq++;
+    return withPageInfo({
+      incremental: true,
+      full: false,
+      epoch: INCREMENTAL.epoch,
+      seq: INCREMENTAL.seq,
+      rootId: INCREMENTAL.rootId,
+      map: {},
+      removed: [],
+    });
+  }
+
   const rootId = buildDomTree(document.body);
+  stampHighlightIndices();
+
+  // Read by BrowserContext._get_state_fingerprint: a page whose changes the observer may
+  // miss is never considered unchanged
+  if (DOM_OBSERVER) {
+    DOM_OBSERVER.opaque = sawOpaqueContent || sawUnwatchedContent;
+  }
 
   // Clear the cache before starting
   DOM_CACHE.clearCache();
@@ -1041,7 +1331,56 @@
     }
   }
 
-  return debugMode ?
+  if (INCREMENTAL) {
+    // Diff against the previous snapshot: send changed nodes and the ids that disappeared.
+    // Only nodes of this walk are kept, so ids of removed nodes are reported once and dropped
+    const full = knownEpoch !== INCREMENTAL.epoch || knownSeq !== INCREMENTAL.seq;
+    const serialized = new Map();
+    const changed = {};
+    for (const [id, nodeData] of Object.entries(DOM_HASH_MAP)) {
+      const json = JSON.stringify(nodeData);
+      serialized.set(id, json);
+      if (full || INCREMENTAL.serialized.get(id) !== json) changed[id] = nodeData;
+    }
+    const removed = [];
+    if (!full) {
+      for (const id of INCREMENTAL.serialized.keys()) {
+        if (!serialized.has(id)) removed.push(id);
+      }
+    }
+
+    INCREMENTAL.serialized = serialized;
+    INCREMENTAL.rootId = rootId;
+    INCREMENTAL.highlighted = HIGHLIGHTED.map(({ element, index, parentIframe }) => ({
+      elementRef: new WeakRef(element),
+      index,
+      parentIframeRef: parentIframe ? new WeakRef(parentIframe) : null,
+    }));
+    INCREMENTAL.domVersion = startVersion;
+    INCREMENTAL.viewportExpansion = viewportExpansion;
+    INCREMENTAL.opaque = sawOpaqueContent;
+    INCREMENTAL.seq++;
+
+    const result = {
+      incremental: true,
+      full,
+      epoch: INCREMENTAL.epoch,
+      seq: INCREMENTAL.seq,
+      rootId,
+      map: changed,
+      removed,
+    };
+    if (debugMode) result.perfMetrics = PERF_METRICS;
+    return withPageInfo(result);
+  }
+
+  if (compact) {
+    const result = { rootId, compact: encodeCompact() };
+    if (debugMode) result.perfMetrics = PERF_METRICS;
+    return withPageInfo(result);
+  }
+
+  return withPageInfo(debugMode ?
     { rootId, map: DOM_HASH_MAP, perfMetrics: PERF_METRICS } :
-    { rootId, map: DOM_HASH_MAP };
+    { rootId, map: DOM_HASH_MAP });
 };
@@ -0,0 +1,79 @@
+(() => {
+  /**
+   * Installed as an init script for incremental DOM snapshots and unchanged-state detection.
+   *
+   * Keeps a single counter, `window.__browserUseDomObserver.version`, that is bumped on
+   * every DOM mutation and on anything that can move elements without mutating the DOM
+   * (scroll, resize, late loads, transitions), form input and focus changes, which update
+   * properties rather than attributes. buildDomTree.js compares it with the version of its
+   * last walk to decide whether the page can have changed at all, and sets `opaque` when
+   * that walk met content the observer cannot watch. `lastChange` (performance.now() of
+   * the last change) lets adaptive timing learn when the DOM settled. Changes made by our
+   * own highlight overlay are ignored.
+   */
+  if (window.__browserUseDomObserver) return;
+
+  const HIGHLIGHT_CONTAINER_ID = "playwright-highlight-container";
+  const IGNORED_ATTRIBUTES = new Set(["browser-user-highlight-id", "data-browser-use-index"]);
+
+  // token identifies this document; version counts changes within it
+  const state = { token: `${Date.now()}-${Math.random().toString(36).slice(2)}`, version: 0, opaque: true };
+
+  function isOwnNode(node) {
+    if (!node) return false;
+    const element = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+    if (!element) return false;
+    return element.id === HIGHLIGHT_CONTAINER_ID || !!element.closest?.(`#${HIGHLIGHT_CONTAINER_ID}`);
+  }
+
+  function isRelevant(record) {
+    if (isOwnNode(record.target)) return false;
+
+    if (record.type === "childList") {
+      const nodes = [...record.addedNodes, ...record.removedNodes];
+      return nodes.length === 0 || !nodes.every(isOwnNode);
+    }
+
+    if (record.type === "attributes" && IGNORED_ATTRIBUTES.has(record.attributeName)) {
+      return false;
+    }
+
+    return true;
+  }
+
+  function bump() {
+    state.version++;
+    state.lastChange = performance.now();
+  }
+
+  const observer = new MutationObserver((records) => {
+    if (records.some(isRelevant)) bump();
+  });
+
+  observer.observe(document, {
+    subtree: true,
+    childList: true,
+    attributes: true,
+    characterData: true,
+  });
+
+  // Layout changes that do not show up as mutations
+  const passive = { capture: true, passive: true };
+  window.addEventListener("scroll", bump, passive);
+  window.addEventListener("resize", bump, passive);
+  // Element load events never reach window, so listen on the document
+  document.addEventListener("load", bump, passive);
+  window.addEventListener("transitionend", bump, passive);
+  window.addEventListener("animationend", bump, passive);
+  // Typed values, checked boxes, selected options and focus do not mutate the DOM
+  window.addEventListener("input", bump, passive);
+  window.addEventListener("change", bump, passive);
+  window.addEventListener("focusin", bump, passive);
+  window.addEventListener("focusout", bump, passive);
+  document.fonts?.addEventListener?.("loadingdone", bump);
+
+  Object.defineProperty(window, "__browserUseDomObserver", {
+    value: state,
+    enumerable: false,
+  });
+})();
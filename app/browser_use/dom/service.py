@@ -1,7 +1,11 @@
-import gc
+import base64
 import json
 import logging
-from dataclasses import dataclass
+import secrets
+import sys
+from array import array
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from importlib import resources
 from typing import TYPE_CHECKING, Optional
 
@@ -13,12 +17,57 @@ from browser_use.dom.views import (
 	DOMElementNode,
 	DOMState,
 	DOMTextNode,
+	PageInfo,
 	SelectorMap,
 )
 from browser_use.utils import time_execution_async
 
 logger = logging.getLogger(__name__)
 
+# Layout of the compact format produced by buildDomTree.js (see encodeCompact there)
+COMPACT_COLUMNS = 7
+KIND_TEXT = 1
+FLAG_VISIBLE = 1
+FLAG_INTERACTIVE = 2
+FLAG_TOP_ELEMENT = 4
+FLAG_IN_VIEWPORT = 8
+FLAG_SHADOW_ROOT = 16
+
+# Random per process: a function the page defined under the same name does not carry it
+_INSTALL_TOKEN = secrets.token_hex(16)
+
+# Calls the installed buildDomTree.js; null if this document does not have it (or has a page-defined impostor)
+CALL_BUILD_DOM_TREE = f"""(args) => {{
+	const descriptor = Object.getOwnPropertyDescriptor(window, '__browserUseBuildDomTree');
+	const buildDomTree = descriptor && !descriptor.writable && !descriptor.configurable && descriptor.value;
+	return typeof buildDomTree === 'function' && buildDomTree.installToken === '{_INSTALL_TOKEN}' ? buildDomTree(args) : null;
+}}"""
+
+
+@lru_cache(maxsize=None)
+def build_dom_tree_script() -> str:
+	return resources.read_text('browser_use.dom', 'buildDomTree.js').strip()
+
+
+@lru_cache(maxsize=None)
+def build_dom_tree_install_script() -> str:
+	"""
+	Defines buildDomTree.js as a non-writable, non-configurable window.__browserUseBuildDomTree.
+	Added as an init script to new contexts and evaluated on demand in documents that do not
+	have it, so each document parses the script once and every snapshot only sends its
+	arguments. Evaluates to whether the document now holds the installed function: false if
+	the page defined the name first, in which case snapshots evaluate the full script.
+	"""
+	return f"""(() => {{
+	if (window !== window.top) return false;
+	if (!Object.getOwnPropertyDescriptor(window, '__browserUseBuildDomTree')) {{
+		const buildDomTree = {build_dom_tree_script()};
+		Object.defineProperty(buildDomTree, 'installToken', {{ value: '{_INSTALL_TOKEN}' }});
+		Object.defineProperty(window, '__browserUseBuildDomTree', {{ value: buildDomTree, writable: false, configurable: false }});
+	}}
+	return window.__browserUseBuildDomTree?.installToken === '{_INSTALL_TOKEN}';
+}})()"""
+
 
 @dataclass
 class ViewportInfo:
@@ -27,11 +76,17 @@ class ViewportInfo:
 
 
 class DomService:
-	def __init__(self, page: 'Page'):
+	def __init__(self, page: 'Page', incremental: bool = False):
 		self.page = page
 		self.xpath_cache = {}
+		self.incremental = incremental
 
-		self.js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
+		# Incremental mode: tree of the last snapshot, patched in place with each diff
+		self._epoch: Optional[str] = None
+		self._seq = -1
+		self._node_map: dict[str, DOMBaseNode] = {}
+		self._children_ids: dict[str, list[str]] = {}
+		self._selector_map: SelectorMap = {}
 
 	# region - Clickable elements
 	@time_execution_async('--get_clickable_elements')
@@ -40,9 +95,16 @@ class DomService:
 		highlight_elements: bool = True,
 		focus_element: int = -1,
 		viewport_expansion: int = 0,
+		remove_highlights: bool = False,
 	) -> DOMState:
-		element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
-		return DOMState(element_tree=element_tree, selector_map=selector_map)
+		"""
+		remove_highlights: clear the previous highlights in the same evaluation instead of a
+		separate BrowserContext.remove_highlights() round trip.
+		"""
+		element_tree, selector_map, page_info = await self._build_dom_tree(
+			highlight_elements, focus_element, viewport_expansion, remove_highlights
+		)
+		return DOMState(element_tree=element_tree, selector_map=selector_map, page_info=page_info)
 
 	@time_execution_async('--build_dom_tree')
 	async def _build_dom_tree(
@@ -50,10 +112,8 @@ class DomService:
 		highlight_elements: bool,
 		focus_element: int,
 		viewport_expansion: int,
-	) -> tuple[DOMElementNode, SelectorMap]:
-		if await self.page.evaluate('1+1') != 2:
-			raise ValueError('The page cannot evaluate javascript code properly')
-
+		remove_highlights: bool = False,
+	) -> tuple[DOMElementNode, SelectorMap, PageInfo]:
 		# NOTE: We execute JS code in the browser to extract important DOM information.
 		#       The returned hash map contains information about the DOM tree and the
 		#       relationship between the DOM elements.
@@ -63,19 +123,52 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'removeHighlights': remove_highlights,
+			'pageInfo': True,
 		}
+		if self.incremental:
+			args.update(incremental=True, knownEpoch=self._epoch, knownSeq=self._seq)
+		else:
+			args['compact'] = True
 
 		try:
-			eval_page = await self.page.evaluate(self.js_code, args)
+			eval_page = await self.page.evaluate(CALL_BUILD_DOM_TREE, args)
+			if eval_page is None:
+				# Documents loaded before the init script was added (or in a foreign context)
+				if await self.page.evaluate(build_dom_tree_install_script()):
+					eval_page = await self.page.evaluate(CALL_BUILD_DOM_TREE, args)
+				else:
+					# The page holds the name; do not call whatever it defined there
+					eval_page = await self.page.evaluate(build_dom_tree_script(), args)
 		except Exception as e:
 			logger.error('Error evaluating JavaScript: %s', e)
 			raise
 
+		# Replaces the former `1+1` probe: a page that cannot run the script returns garbage here
+		if not isinstance(eval_page, dict) or 'rootId' not in eval_page:
+			raise ValueError('The page cannot evaluate javascript code properly')
+
 		# Only log performance metrics in debug mode
 		if debug_mode and 'perfMetrics' in eval_page:
 			logger.debug('DOM Tree Building Performance Metrics:\n%s', json.dumps(eval_page['perfMetrics'], indent=2))
 
-		return await self._construct_dom_tree(eval_page)
+		if eval_page.get('incremental'):
+			element_tree, selector_map = await self._apply_dom_diff(eval_page)
+		elif 'compact' in eval_page:
+			element_tree, selector_map = await self._construct_compact_dom_tree(eval_page)
+		else:
+			element_tree, selector_map = await self._construct_dom_tree(eval_page)
+
+		info = eval_page['pageInfo']
+		page_info = PageInfo(
+			url=info['url'],
+			title=info['title'],
+			ready_state=info['readyState'],
+			scroll_y=info['scrollY'],
+			viewport_height=info['viewportHeight'],
+			scroll_height=info['scrollHeight'],
+		)
+		return element_tree, selector_map, page_info
 
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
@@ -112,17 +205,177 @@ class DomService:
 
 		html_to_dict = node_map[str(js_root_id)]
 
-		del node_map
-		del js_node_map
-		del js_root_id
-
-		gc.collect()
-
 		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
 			raise ValueError('Failed to parse HTML to dictionary')
 
 		return html_to_dict, selector_map
 
+	@time_execution_async('--construct_compact_dom_tree')
+	async def _construct_compact_dom_tree(
+		self,
+		eval_page: dict,
+	) -> tuple[DOMElementNode, SelectorMap]:
+		"""
+		Build the tree from the columnar format of buildDomTree.js.
+
+		All per-node fields arrive as Int32 columns in one base64 blob, strings as a single
+		interned table. Node ids are post-order, so parents always have a higher id than
+		their children: xpaths are resolved walking the ids downwards, children are linked
+		walking them upwards (which keeps document order).
+		"""
+		compact = eval_page['compact']
+		count = compact['count']
+		strings = compact['strings']
+
+		columns = array('i')
+		columns.frombytes(base64.b64decode(compact['columns']))
+		if sys.byteorder == 'big':
+			columns.byteswap()
+
+		kind, name, flags, highlight, parent, xpath_parent, xpath_segment = (
+			columns[c * count : (c + 1) * count] for c in range(COMPACT_COLUMNS)
+		)
+		attr_start = COMPACT_COLUMNS * count
+		attr_offsets = columns[attr_start : attr_start + count + 1]
+		attrs = [strings[i] for i in columns[attr_start + count + 1 :]]
+
+		nodes: list[DOMBaseNode] = [None] * count  # type: ignore[list-item]
+		xpaths: list[str] = [''] * count
+		selector_map: SelectorMap = {}
+
+		for i in range(count - 1, -1, -1):
+			node_flags = flags[i]
+			if kind[i] == KIND_TEXT:
+				nodes[i] = DOMTextNode(
+					text=strings[name[i]],
+					is_visible=bool(node_flags & FLAG_VISIBLE),
+					parent=None,
+				)
+				continue
+
+			segment = strings[xpath_segment[i]]
+			xpath = segment if xpath_parent[i] < 0 else f'{xpaths[xpath_parent[i]]}/{segment}'
+			xpaths[i] = xpath
+
+			start, end = attr_offsets[i], attr_offsets[i + 1]
+			highlight_index = highlight[i] if highlight[i] >= 0 else None
+			node = DOMElementNode(
+				tag_name=strings[name[i]],
+				xpath=xpath,
+				attributes=dict(zip(attrs[start:end:2], attrs[start + 1 : end : 2])),
+				children=[],
+				is_visible=bool(node_flags & FLAG_VISIBLE),
+				is_interactive=bool(node_flags & FLAG_INTERACTIVE),
+				is_top_element=bool(node_flags & FLAG_TOP_ELEMENT),
+				is_in_viewport=bool(node_flags & FLAG_IN_VIEWPORT),
+				highlight_index=highlight_index,
+				shadow_root=bool(node_flags & FLAG_SHADOW_ROOT),
+				parent=None,
+			)
+			nodes[i] = node
+			if highlight_index is not None:
+				selector_map[highlight_index] = node
+
+		for i in range(count):
+			parent_id = parent[i]
+			if parent_id < 0:
+				continue
+			node = nodes[i]
+			parent_node = nodes[parent_id]
+			node.parent = parent_node
+			parent_node.children.append(node)
+
+		root_id = int(eval_page['rootId']) if eval_page['rootId'] is not None else -1
+		root = nodes[root_id] if 0 <= root_id < count else None
+		if root is None or not isinstance(root, DOMElementNode):
+			raise ValueError('Failed to parse HTML to dictionary')
+
+		return root, selector_map
+
+	@time_execution_async('--apply_dom_diff')
+	async def _apply_dom_diff(
+		self,
+		eval_page: dict,
+	) -> tuple[DOMElementNode, SelectorMap]:
+		"""
+		Patch the tree of the previous snapshot with an incremental result of buildDomTree.js.
+
+		Node ids are stable across snapshots, so unchanged nodes keep their Python objects;
+		changed nodes are updated in place (dropping their cached hash) and only the children
+		of changed elements are relinked. Cost scales with the size of the diff.
+		"""
+		if eval_page['full']:
+			self._node_map = {}
+			self._children_ids = {}
+			self._selector_map = {}
+
+		for id in eval_page['removed']:
+			node = self._node_map.pop(id, None)
+			self._children_ids.pop(id, None)
+			if node is None:
+				continue
+			if isinstance(node, DOMElementNode) and self._selector_map.get(node.highlight_index) is node:
+				del self._selector_map[node.highlight_index]
+			node.parent = None
+
+		# First pass: create or update every changed node
+		changed = eval_page['map']
+		for id, node_data in changed.items():
+			node, children_ids = self._parse_node(node_data)
+			if node is None:
+				continue
+
+			existing = self._node_map.get(id)
+			if existing is not None and type(existing) is type(node):
+				if isinstance(existing, DOMElementNode) and self._selector_map.get(existing.highlight_index) is existing:
+					del self._selector_map[existing.highlight_index]
+				self._update_node(existing, node)
+				node = existing
+			else:
+				self._node_map[id] = node
+
+			if isinstance(node, DOMElementNode):
+				self._children_ids[id] = children_ids
+				if node.highlight_index is not None:
+					self._selector_map[node.highlight_index] = node
+
+		# Second pass: relink children now that all changed nodes exist
+		for id in changed:
+			node = self._node_map.get(id)
+			if not isinstance(node, DOMElementNode):
+				continue
+			node.children = [self._node_map[child_id] for child_id in self._children_ids[id] if child_id in self._node_map]
+			for child in node.children:
+				child.parent = node
+
+		# Cached prompt text of every ancestor of a changed node is stale now
+		for id in changed:
+			node = self._node_map.get(id)
+			if isinstance(node, DOMElementNode):
+				node.invalidate_rendering()
+			elif node is not None and node.parent is not None:
+				node.parent.invalidate_rendering()
+
+		self._epoch = eval_page['epoch']
+		self._seq = eval_page['seq']
+
+		root = self._node_map.get(str(eval_page['rootId']))
+		if root is None or not isinstance(root, DOMElementNode):
+			# Out of sync with the page; the next snapshot will be a full one
+			self._epoch = None
+			raise ValueError('Failed to parse HTML to dictionary')
+
+		return root, dict(self._selector_map)
+
+	@staticmethod
+	def _update_node(target: DOMBaseNode, source: DOMBaseNode) -> None:
+		for field in fields(source):
+			if field.name not in ('parent', 'children', '_hash', '_rendered'):
+				setattr(target, field.name, getattr(source, field.name))
+		# Drop the cached hash; xpath, attributes or position may have changed
+		if isinstance(target, DOMElementNode):
+			target._hash = None
+
 	def _parse_node(
 		self,
 		node_data: dict,
@@ -0,0 +1,115 @@
+import asyncio
+
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMBaseNode, DOMElementNode, DOMTextNode
+
+
+def _element(tag, children, highlight_index=None, attributes=None):
+	node = DOMElementNode(
+		is_visible=True,
+		parent=None,
+		tag_name=tag,
+		xpath=tag,
+		attributes=attributes or {},
+		children=children,
+		highlight_index=highlight_index,
+	)
+	for child in children:
+		child.parent = node
+	return node
+
+
+def _text(text, is_visible=True):
+	return DOMTextNode(is_visible=is_visible, parent=None, text=text)
+
+
+def _reference_render(root: DOMElementNode, include_attributes: list[str]) -> str:
+	"""The previous per-node implementation, kept as the expected output."""
+	formatted_text = []
+
+	def process_node(node: DOMBaseNode) -> None:
+		if isinstance(node, DOMElementNode):
+			if node.highlight_index is not None:
+				text = node.get_all_text_till_next_clickable_element()
+				formatted_text.append(DOMElementNode._format_clickable_line(node, text, include_attributes))
+			for child in node.children:
+				process_node(child)
+		elif isinstance(node, DOMTextNode):
+			if not node.has_parent_with_highlight_index() and node.is_visible:
+				formatted_text.append(node.text)
+
+	process_node(root)
+	return '\n'.join(formatted_text)
+
+
+def _page() -> DOMElementNode:
+	return _element(
+		'body',
+		[
+			_text('Welcome'),
+			_text('hidden', is_visible=False),
+			_element(
+				'form',
+				[
+					_element('label', [_text('Name')]),
+					_element('input', [], highlight_index=0, attributes={'placeholder': 'Your name', 'type': 'text'}),
+					_element(
+						'button',
+						[
+							_text('Send'),
+							_element('span', [_text('now', is_visible=False)]),
+							_element('a', [_text('help')], highlight_index=2, attributes={'title': 'help'}),
+							_text('after'),
+						],
+						highlight_index=1,
+					),
+				],
+			),
+			_element('footer', [_text('Footer')]),
+		],
+	)
+
+
+def test_single_pass_matches_reference():
+	root = _page()
+	for include_attributes in ([], ['placeholder', 'type', 'title']):
+		assert root.clickable_elements_to_string(include_attributes) == _reference_render(root, include_attributes)
+
+	# Rendering a subtree below a highlighted element emits no free text
+	link = root.children[2].children[2].children[2]
+	assert link.clickable_elements_to_string() == _reference_render(link, [])
+
+
+def test_rendering_is_cached_until_invalidated():
+	root = _page()
+	first = root.clickable_elements_to_string()
+	assert root.clickable_elements_to_string() is first
+
+	footer_text = root.children[3].children[0]
+	footer_text.text = 'Changed'
+	footer_text.parent.invalidate_rendering()
+	assert 'Changed' in root.clickable_elements_to_string()
+
+
+def test_dom_diff_invalidates_rendering():
+	service = DomService(page=None, incremental=True)
+
+	def snapshot(text, full, seq):
+		return {
+			'incremental': True,
+			'full': full,
+			'epoch': 'e',
+			'seq': seq,
+			'rootId': '0',
+			'map': {
+				'1': {'type': 'TEXT_NODE', 'text': text, 'isVisible': True},
+				**({'0': {'tagName': 'body', 'xpath': '/body', 'attributes': {}, 'children': ['1']}} if full else {}),
+			},
+			'removed': [],
+		}
+
+	root, _ = asyncio.run(service._apply_dom_diff(snapshot('before', True, 1)))
+	assert root.clickable_elements_to_string() == 'before'
+
+	root, _ = asyncio.run(service._apply_dom_diff(snapshot('after', False, 2)))
+	assert root.clickable_elements_to_string() == 'after'
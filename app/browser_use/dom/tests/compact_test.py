@@ -0,0 +1,62 @@
+import asyncio
+import base64
+from array import array
+
+from browser_use.dom.service import DomService
+
+# Post-order map as returned by buildDomTree.js without `compact`
+JS_NODE_MAP = {
+	'0': {'type': 'TEXT_NODE', 'text': 'Sign in', 'isVisible': True},
+	'1': {
+		'tagName': 'button',
+		'xpath': 'html/body/div/button',
+		'attributes': {'class': 'primary', 'type': 'submit'},
+		'children': ['0'],
+		'isVisible': True,
+		'isInteractive': True,
+		'isTopElement': True,
+		'isInViewport': True,
+		'highlightIndex': 0,
+	},
+	'2': {'tagName': 'div', 'xpath': 'html/body/div', 'attributes': {}, 'children': ['1'], 'isVisible': True},
+	'3': {'tagName': 'a', 'xpath': 'html/body/a', 'attributes': {'href': '/help'}, 'children': [], 'shadowRoot': True},
+	'4': {'tagName': 'body', 'xpath': '/body', 'attributes': {}, 'children': ['2', '3']},
+}
+
+# Same nodes in the compact format: string table + kind, name, flags, highlight, parent,
+# xpathParent, xpathSegment columns, then attrOffsets and (name, value) attribute pairs
+STRINGS = ['Sign in', 'button', 'class', 'primary', 'type', 'submit', 'div', 'html/body/div', 'a', 'html/body/a', 'href', '/help', 'body', '/body']
+COLUMNS = [
+	*[1, 0, 0, 0, 0],
+	*[0, 1, 6, 8, 12],
+	*[1, 15, 1, 16, 0],
+	*[-1, 0, -1, -1, -1],
+	*[1, 2, 4, 4, -1],
+	*[-1, 2, -1, -1, -1],
+	*[0, 1, 7, 9, 13],
+	*[0, 0, 4, 4, 6, 6],
+	*[2, 3, 4, 5, 10, 11],
+]
+
+
+def _compact_page():
+	blob = base64.b64encode(array('i', COLUMNS).tobytes()).decode()
+	return {'rootId': '4', 'compact': {'count': 5, 'strings': STRINGS, 'columns': blob}}
+
+
+def _flatten(node, depth=0):
+	yield depth, repr(node) if hasattr(node, 'tag_name') else node.text, getattr(node, 'xpath', None), node.is_visible
+	for child in getattr(node, 'children', []):
+		yield from _flatten(child, depth + 1)
+
+
+def test_compact_format_matches_node_map():
+	service = DomService(page=None)
+
+	expected_root, expected_map = asyncio.run(service._construct_dom_tree({'rootId': '4', 'map': JS_NODE_MAP}))
+	root, selector_map = asyncio.run(service._construct_compact_dom_tree(_compact_page()))
+
+	assert list(_flatten(root)) == list(_flatten(expected_root))
+	assert selector_map.keys() == expected_map.keys()
+	assert selector_map[0].parent.parent is root
+	assert selector_map[0].hash == expected_map[0].hash
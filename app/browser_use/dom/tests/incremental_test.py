@@ -0,0 +1,98 @@
+import asyncio
+
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+
+def _element(tag, xpath, children, highlight_index=None):
+	node = {'tagName': tag, 'xpath': xpath, 'attributes': {}, 'children': children, 'isVisible': True}
+	if highlight_index is not None:
+		node.update(isInteractive=True, isTopElement=True, isInViewport=True, highlightIndex=highlight_index)
+	return node
+
+
+def _text(text):
+	return {'type': 'TEXT_NODE', 'text': text, 'isVisible': True}
+
+
+def _snapshot(map, removed=(), full=False, seq=1):
+	return {
+		'incremental': True,
+		'full': full,
+		'epoch': 'e',
+		'seq': seq,
+		'rootId': '0',
+		'map': map,
+		'removed': list(removed),
+	}
+
+
+def test_apply_dom_diff_patches_previous_tree():
+	service = DomService(page=None, incremental=True)
+
+	root, selector_map = asyncio.run(
+		service._apply_dom_diff(
+			_snapshot(
+				{
+					'1': _text('hello'),
+					'2': _element('button', 'body/button[1]', ['1'], highlight_index=0),
+					'3': _element('a', 'body/a[1]', [], highlight_index=1),
+					'0': _element('body', '/body', ['2', '3']),
+				},
+				full=True,
+			)
+		)
+	)
+	button = selector_map[0]
+	assert [child.tag_name for child in root.children] == ['button', 'a']
+	assert button.hash is not None
+	assert set(selector_map) == {0, 1}
+
+	# The link goes away, the button label changes, an input is added
+	root, selector_map = asyncio.run(
+		service._apply_dom_diff(
+			_snapshot(
+				{
+					'1': _text('hello world'),
+					'4': _element('input', 'body/input[1]', [], highlight_index=2),
+					'0': _element('body', '/body', ['2', '4']),
+				},
+				removed=['3'],
+				seq=2,
+			)
+		)
+	)
+	assert [child.tag_name for child in root.children] == ['button', 'input']
+	assert set(selector_map) == {0, 2}
+	# Unchanged nodes keep their objects, changed ones are updated in place
+	assert selector_map[0] is button
+	assert isinstance(button.children[0], DOMTextNode)
+	assert button.children[0].text == 'hello world'
+	assert button.children[0].parent is button
+	assert isinstance(selector_map[2].parent, DOMElementNode)
+	assert selector_map[2].parent is root
+
+
+def test_apply_dom_diff_drops_cached_hash_of_changed_nodes():
+	service = DomService(page=None, incremental=True)
+	asyncio.run(
+		service._apply_dom_diff(
+			_snapshot(
+				{
+					'1': _element('button', 'body/button[1]', [], highlight_index=0),
+					'0': _element('body', '/body', ['1']),
+				},
+				full=True,
+			)
+		)
+	)
+	button = service._selector_map[0]
+	old_hash = button.hash
+
+	asyncio.run(
+		service._apply_dom_diff(
+			_snapshot({'1': _element('button', 'body/button[2]', [], highlight_index=0)}, seq=2),
+		)
+	)
+	assert service._selector_map[0] is button
+	assert button.hash != old_hash
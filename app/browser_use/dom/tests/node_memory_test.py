@@ -0,0 +1,120 @@
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+NODE_COUNT = 50_000
+
+
+@dataclass
+class _PlainElementNode:
+	"""DOMElementNode layout as a regular (dict-backed) dataclass, for comparison."""
+
+	is_visible: bool
+	parent: Optional['_PlainElementNode']
+	tag_name: str
+	xpath: str
+	attributes: dict
+	children: list
+	is_interactive: bool = False
+	is_top_element: bool = False
+	is_in_viewport: bool = False
+	shadow_root: bool = False
+	highlight_index: Optional[int] = None
+	viewport_coordinates: None = None
+	page_coordinates: None = None
+	viewport_info: None = None
+
+
+def _node_map(count: int) -> dict:
+	"""Post-order map of `count` buttons with one text node each, under a single body."""
+	node_map = {}
+	button_ids = []
+	for i in range(count // 2):
+		text_id, button_id = str(2 * i), str(2 * i + 1)
+		node_map[text_id] = {'type': 'TEXT_NODE', 'text': f'button {i}', 'isVisible': True}
+		node_map[button_id] = {
+			'tagName': 'button',
+			'xpath': f'html/body/button[{i + 1}]',
+			'attributes': {'type': 'button'},
+			'children': [text_id],
+			'isVisible': True,
+			'isInteractive': True,
+			'isTopElement': True,
+			'highlightIndex': i,
+		}
+		button_ids.append(button_id)
+	node_map[str(len(node_map))] = {'tagName': 'body', 'xpath': '/body', 'attributes': {}, 'children': button_ids}
+	return node_map
+
+
+def _allocated(factory) -> int:
+	"""Bytes still allocated by the objects `factory` returns."""
+	tracemalloc.start()
+	nodes = factory()
+	size, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del nodes
+	return size
+
+
+def _build(cls, count: int = NODE_COUNT):
+	return lambda: [
+		cls(is_visible=True, parent=None, tag_name='div', xpath=f'/div[{i}]', attributes={}, children=[])
+		for i in range(count)
+	]
+
+
+def _construct(node_map: dict):
+	root_id = str(len(node_map) - 1)
+	return asyncio.run(DomService(page=None)._construct_dom_tree({'rootId': root_id, 'map': node_map}))
+
+
+def test_nodes_have_no_instance_dict():
+	element = DOMElementNode(is_visible=True, parent=None, tag_name='div', xpath='/div', attributes={}, children=[])
+	text = DOMTextNode(is_visible=True, parent=element, text='hi')
+
+	assert not hasattr(element, '__dict__')
+	assert not hasattr(text, '__dict__')
+
+
+def test_slotted_nodes_use_less_memory():
+	assert _allocated(_build(DOMElementNode)) < _allocated(_build(_PlainElementNode))
+
+
+def test_construct_large_tree():
+	root, selector_map = _construct(_node_map(NODE_COUNT))
+
+	assert root.tag_name == 'body' and root.parent is None
+	assert len(root.children) == NODE_COUNT // 2
+	assert len(selector_map) == NODE_COUNT // 2
+	for i, button in enumerate(root.children):
+		assert not hasattr(button, '__dict__')
+		assert button.parent is root
+		assert button.highlight_index == i
+		assert selector_map[i] is button
+		(text,) = button.children
+		assert isinstance(text, DOMTextNode)
+		assert text.parent is button
+		assert text.text == f'button {i}'
+
+
+def benchmark():
+	"""Memory and construction time of large trees; run this file directly, not under pytest."""
+	for name, cls in (('slotted', DOMElementNode), ('plain', _PlainElementNode)):
+		start = time.perf_counter()
+		size = _allocated(_build(cls))
+		print(f'{name}: {size / 1e6:.1f} MB in {time.perf_counter() - start:.3f}s')
+
+	node_map = _node_map(NODE_COUNT)
+	start = time.perf_counter()
+	size = _allocated(lambda: _construct(node_map))
+	print(f'Constructed {len(node_map)} nodes: {size / 1e6:.1f} MB in {time.perf_counter() - start:.3f}s')
+
+
+if __name__ == '__main__':
+	benchmark()
@@ -0,0 +1,75 @@
+import asyncio
+
+from browser_use.dom.service import CALL_BUILD_DOM_TREE, DomService, build_dom_tree_install_script, build_dom_tree_script
+
+PAGE_INFO = {
+	'url': 'https://example.com/',
+	'title': 'Example',
+	'readyState': 'complete',
+	'scrollY': 0,
+	'viewportHeight': 800,
+	'scrollHeight': 800,
+}
+
+
+class FakePage:
+	"""Keeps the installed function per 'document' like a real page would."""
+
+	def __init__(self, page_defines_name=False):
+		# A page script that defined window.__browserUseBuildDomTree itself blocks the install
+		self.page_defines_name = page_defines_name
+		self.installed = False
+		self.calls = []
+
+	async def evaluate(self, script, args=None):
+		self.calls.append(script)
+		if script == build_dom_tree_install_script():
+			self.installed = not self.page_defines_name
+			return self.installed
+		if script == CALL_BUILD_DOM_TREE and not self.installed:
+			return None
+		assert script in (CALL_BUILD_DOM_TREE, build_dom_tree_script())
+		return {
+			'rootId': '0',
+			'map': {'0': {'tagName': 'body', 'xpath': '/body', 'attributes': {}, 'children': []}},
+			'pageInfo': PAGE_INFO,
+		}
+
+	def navigate(self):
+		self.installed = False
+
+
+def test_script_is_loaded_once_per_process():
+	assert build_dom_tree_install_script() is build_dom_tree_install_script()
+
+
+def test_script_is_installed_once_per_document():
+	page = FakePage()
+	service = DomService(page)
+
+	async def snapshot():
+		return await service.get_clickable_elements()
+
+	state = asyncio.run(snapshot())
+	assert state.element_tree.tag_name == 'body'
+	assert page.calls == [CALL_BUILD_DOM_TREE, build_dom_tree_install_script(), CALL_BUILD_DOM_TREE]
+
+	# Later snapshots of the same document only send the arguments
+	page.calls.clear()
+	asyncio.run(snapshot())
+	assert page.calls == [CALL_BUILD_DOM_TREE]
+
+	# A new document installs it again
+	page.navigate()
+	page.calls.clear()
+	asyncio.run(snapshot())
+	assert len(page.calls) == 3
+
+
+def test_full_script_is_evaluated_when_the_page_holds_the_name():
+	page = FakePage(page_defines_name=True)
+	service = DomService(page)
+
+	state = asyncio.run(service.get_clickable_elements())
+	assert state.element_tree.tag_name == 'body'
+	assert page.calls == [CALL_BUILD_DOM_TREE, build_dom_tree_install_script(), build_dom_tree_script()]
@@ -1,5 +1,4 @@
-from dataclasses import dataclass
-from functools import cached_property
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Dict, List, Optional
 
 from browser_use.dom.history_tree_processor.view import CoordinateSet, HashedDomElement, ViewportInfo
@@ -10,14 +9,15 @@ if TYPE_CHECKING:
 	from .views import DOMElementNode
 
 
-@dataclass(frozen=False)
+# slots=True: no per-instance __dict__; a large page builds hundreds of thousands of these per step
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
 	is_visible: bool
 	# Use None as default and set parent later to avoid circular reference issues
 	parent: Optional['DOMElementNode']
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
 	text: str
 	type: str = 'TEXT_NODE'
@@ -43,7 +43,7 @@ class DOMTextNode(DOMBaseNode):
 		return self.parent.is_top_element
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
@@ -62,6 +62,10 @@ class DOMElementNode(DOMBaseNode):
 	viewport_coordinates: Optional[CoordinateSet] = None
 	page_coordinates: Optional[CoordinateSet] = None
 	viewport_info: Optional[ViewportInfo] = None
+	# Lazily computed by `hash`; reset to None when the node is updated in place
+	_hash: Optional[HashedDomElement] = field(default=None, init=False, repr=False, compare=False)
+	# clickable_elements_to_string output per include_attributes; valid for this snapshot
+	_rendered: Optional[Dict[tuple, str]] = field(default=None, init=False, repr=False, compare=False)
 
 	def __repr__(self) -> str:
 		tag_str = f'<{self.tag_name}'
@@ -89,13 +93,15 @@ class DOMElementNode(DOMBaseNode):
 
 		return tag_str
 
-	@cached_property
+	@property
 	def hash(self) -> HashedDomElement:
-		from browser_use.dom.history_tree_processor.service import (
-			HistoryTreeProcessor,
-		)
+		if self._hash is None:
+			from browser_use.dom.history_tree_processor.service import (
+				HistoryTreeProcessor,
+			)
 
-		return HistoryTreeProcessor._hash_dom_element(self)
+			self._hash = HistoryTreeProcessor._hash_dom_element(self)
+		return self._hash
 
 	def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
 		text_parts = []
@@ -120,50 +126,100 @@ class DOMElementNode(DOMBaseNode):
 	@time_execution_sync('--clickable_elements_to_string')
 	def clickable_elements_to_string(self, include_attributes: list[str] = []) -> str:
 		"""Convert the processed DOM content to HTML."""
-		formatted_text = []
+		cache_key = tuple(include_attributes)
+		if self._rendered is not None and cache_key in self._rendered:
+			return self._rendered[cache_key]
+
+		rendered = self._render_clickable_elements(include_attributes)
+		if self._rendered is None:
+			self._rendered = {}
+		self._rendered[cache_key] = rendered
+		return rendered
+
+	def _render_clickable_elements(self, include_attributes: list[str]) -> str:
+		"""
+		Single pass over the subtree. Each text node is handed to its nearest highlighted
+		ancestor (the text of that element's line, same as get_all_text_till_next_clickable_element)
+		or, if there is none, emitted on its own line when visible.
+		"""
+		formatted_text: list[str] = []
+
+		# Texts below a highlighted ancestor outside this subtree are never emitted
+		outside_owner: Optional[list[str]] = None
+		current = self.parent
+		while current is not None:
+			if current.highlight_index is not None:
+				outside_owner = []
+				break
+			current = current.parent
 
-		def process_node(node: DOMBaseNode, depth: int) -> None:
+		# (node, texts of the nearest highlighted ancestor) or a finished element to render
+		stack: list[tuple[DOMBaseNode, Optional[list[str]]] | tuple[int, DOMElementNode, list[str]]] = [(self, outside_owner)]
+		while stack:
+			item = stack.pop()
+
+			if len(item) == 3:
+				line_index, node, text_parts = item
+				formatted_text[line_index] = self._format_clickable_line(
+					node, '\n'.join(text_parts).strip(), include_attributes
+				)
+				continue
+
+			node, owner = item
 			if isinstance(node, DOMElementNode):
-				# Add element with highlight_index
 				if node.highlight_index is not None:
-					attributes_str = ''
-					text = node.get_all_text_till_next_clickable_element()
-					if include_attributes:
-						attributes = list(
-							set(
-								[
-									str(value)
-									for key, value in node.attributes.items()
-									if key in include_attributes and value != node.tag_name
-								]
-							)
-						)
-						if text in attributes:
-							attributes.remove(text)
-						attributes_str = ';'.join(attributes)
-					line = f'[{node.highlight_index}]<{node.tag_name} '
-					if attributes_str:
-						line += f'{attributes_str}'
-					if text:
-						if attributes_str:
-							line += f'>{text}'
-						else:
-							line += f'{text}'
-					line += '/>'
-					formatted_text.append(line)
+					# Reserve the line; it is rendered once all of its text has been collected
+					text_parts: list[str] = []
+					stack.append((len(formatted_text), node, text_parts))
+					formatted_text.append('')
+					owner = text_parts
 
 				# Process children regardless
-				for child in node.children:
-					process_node(child, depth + 1)
+				stack.extend((child, owner) for child in reversed(node.children))
 
 			elif isinstance(node, DOMTextNode):
+				if owner is not None:
+					owner.append(node.text)
 				# Add text only if it doesn't have a highlighted parent
-				if not node.has_parent_with_highlight_index() and node.is_visible:  # and node.is_parent_top_element()
+				elif node.is_visible:
 					formatted_text.append(f'{node.text}')
 
-		process_node(self, 0)
 		return '\n'.join(formatted_text)
 
+	@staticmethod
+	def _format_clickable_line(node: 'DOMElementNode', text: str, include_attributes: list[str]) -> str:
+		attributes_str = ''
+		if include_attributes:
+			attributes = list(
+				set(
+					[
+						str(value)
+						for key, value in node.attributes.items()
+						if key in include_attributes and value != node.tag_name
+					]
+				)
+			)
+			if text in attributes:
+				attributes.remove(text)
+			attributes_str = ';'.join(attributes)
+		line = f'[{node.highlight_index}]<{node.tag_name} '
+		if attributes_str:
+			line += f'{attributes_str}'
+		if text:
+			if attributes_str:
+				line += f'>{text}'
+			else:
+				line += f'{text}'
+		line += '/>'
+		return line
+
+	def invalidate_rendering(self) -> None:
+		"""Drop cached clickable_elements_to_string output of this node and its ancestors."""
+		current: Optional[DOMElementNode] = self
+		while current is not None:
+			current._rendered = None
+			current = current.parent
+
 	def get_file_upload_element(self, check_siblings: bool = True) -> Optional['DOMElementNode']:
 		# Check if current element is a file input
 		if self.tag_name == 'input' and self.attributes.get('type') == 'file':
@@ -190,7 +246,29 @@ class DOMElementNode(DOMBaseNode):
 SelectorMap = dict[int, DOMElementNode]
 
 
+@dataclass
+class PageInfo:
+	"""Page metrics returned by the same evaluation that builds the DOM tree."""
+
+	url: str
+	title: str
+	ready_state: str
+	scroll_y: int
+	viewport_height: int
+	scroll_height: int
+
+	@property
+	def pixels_above(self) -> int:
+		return self.scroll_y
+
+	@property
+	def pixels_below(self) -> int:
+		return self.scroll_height - (self.scroll_y + self.viewport_height)
+
+
 @dataclass
 class DOMState:
 	element_tree: DOMElementNode
 	selector_map: SelectorMap
+	# Keyword-only so subclasses (BrowserState) can still declare required fields
+	page_info: Optional[PageInfo] = field(default=None, kw_only=True)
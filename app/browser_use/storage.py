@@ -0,0 +1,66 @@
+"""
+On-disk storage for screenshots, shared by the browser state history and the agent.
+"""
+
+import base64
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+SCREENSHOT_EXTENSIONS = {
+	'image/png': 'png',
+	'image/jpeg': 'jpg',
+	'image/webp': 'webp',
+}
+
+
+class ScreenshotStore:
+	"""
+	Content-addressed screenshot blobs on local disk.
+
+	Each image is written once to `<root>/<aa>/<sha256>.<ext>`, where the name is the
+	SHA-256 of the decoded image bytes, so identical frames across steps and runs share
+	one file. History items keep the returned path instead of the base64 string and read
+	the bytes back only when they are needed.
+	"""
+
+	def __init__(self, root_dir: str | Path):
+		self.root_dir = Path(root_dir)
+		self._known: set[str] = set()
+
+	def put(self, screenshot_b64: str, mime_type: str = 'image/png') -> str:
+		"""Store a base64 screenshot and return the path of its blob."""
+		return self.put_bytes(base64.b64decode(screenshot_b64), mime_type)
+
+	def put_bytes(self, data: bytes, mime_type: str = 'image/png') -> str:
+		digest = hashlib.sha256(data).hexdigest()
+		path = self.root_dir / digest[:2] / f'{digest}.{SCREENSHOT_EXTENSIONS.get(mime_type, "bin")}'
+		key = str(path)
+		if key in self._known or path.exists():
+			self._known.add(key)
+			return key
+
+		path.parent.mkdir(parents=True, exist_ok=True)
+		# Write to a temporary file first so a crash never leaves a truncated blob under its final name
+		fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				f.write(data)
+			os.replace(tmp_path, path)
+		except BaseException:
+			if os.path.exists(tmp_path):
+				os.remove(tmp_path)
+			raise
+		self._known.add(key)
+		return key
+
+	@staticmethod
+	def load_bytes(path: str | Path) -> bytes:
+		with open(path, 'rb') as f:
+			return f.read()
+
+	@classmethod
+	def load(cls, path: str | Path) -> str:
+		"""Base64 string of a stored screenshot."""
+		return base64.b64encode(cls.load_bytes(path)).decode('utf-8')
@@ -1,16 +1,35 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
+import time
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 from app.schemas import UserRole
 
 # Ayarları al
 settings = get_settings()
 
-# Şifreleme algoritması (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Şifreleme algoritması (bcrypt). min/max_rounds = bcrypt_rounds olduğundan farklı
+# maliyetle üretilmiş hash'ler needs_update sayılır ve girişte yeniden hash'lenir.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt CPU'yu ~100-300 ms bloklar; event loop yerine bu sınırlı havuzda çalışır
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash",
+)
+# Havuza aynı anda verilen iş sayısı; fazlası event loop'ta (iptal edilebilir) bekler
+_password_slots = asyncio.Semaphore(settings.password_hash_workers)
 
 # JWT ayarları
 SECRET_KEY = settings.jwt_secret_key
@@ -29,6 +48,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_password_job(func, *args):
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password'ün event loop'u bloklamayan sürümü."""
+    return await _run_password_job(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password'ün event loop'u bloklamayan sürümü."""
+    return await _run_password_job(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Parolayı doğrular; hash güncel maliyette değilse yeni hash'i de döner.
+    Dönüş: (doğru_mu, yeni_hash_veya_None)
+    """
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 # ---------- JWT TOKEN ÜRETİMİ ----------
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -41,10 +87,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 # ---------- TOKEN DOĞRULAMA ----------
 
+# Doğrulanmış token → payload; tekrar gelen token'da imza yeniden hesaplanmaz.
+# Kayıt, token'ın exp zamanında düşer; süresi geçmiş token önbellekten dönmez.
+_token_cache: TTLCache[str, dict] = TTLCache(
+    maxsize=settings.auth_cache_size,
+    ttl=settings.auth_token_cache_ttl,
+)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """Token'ı çözümleyip payload'ı döner. Geçersizse None döner."""
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if exp is not None:
+        _token_cache.set(token, payload, ttl=exp - time.time())
+    return payload
@@ -1,20 +1,81 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     gemini_api_key  : str
     jwt_secret_key  : str
     jwt_algorithm   : str = "HS256"
+    # Kimlik doğrulama önbelleği: çözülmüş token'lar ve e-posta → kullanıcı eşlemesi
+    auth_cache_size: int = 4096
+    auth_token_cache_ttl: float = 3600.0
+    auth_principal_cache_ttl: float = 60.0
+    # bcrypt maliyet faktörü ve parola hash'leme thread sayısı (eşzamanlılık sınırı)
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
     agent_retries: int = 3
     agent_retry_delay: float = 2.0
     agent_max_steps: int = 25
     agent_max_actions: int = 4
+    # Adım ekran görüntüleri bellekte değil, bu dizinde içerik adresli dosyalar olarak tutulur
+    # (boş → bellekte). Dosyalar görevler arasında paylaşıldığı için silinmez; temizlik dışarıdan yapılmalı
+    agent_screenshot_dir: Optional[str] = None
+    # Her görevin adımları <dizin>/<task_id>.jsonl dosyasına anında yazılır (boş → kaydedilmez);
+    # görev silinince dosyası da silinir
+    agent_history_dir: Optional[str] = None
     gemini_model: str = "gemini-2.0-flash-exp"
     gemini_temperature: float = 0.9
     gemini_max_tokens: int = 512
     gemini_top_p: float = 0.9
     database_url    : str = "sqlite:///./db.sqlite3"
+    # Async engine bağlantı havuzu (in-memory SQLite'ta kullanılmaz)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    # SQLite PRAGMA ayarları (WAL her zaman açık)
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 20000
+    # /tasks sayfasında bir sayfada gösterilen görev sayısı (keyset sayfalama)
+    tasks_page_size: int = 50
     keep_browser_open: bool = True
+    # Görev zamanlayıcı (worker havuzu + sınırlı kuyruk)
+    scheduler_workers: int = 2
+    scheduler_queue_size: int = 20
+    scheduler_drain_timeout: float = 30.0
+    # stop_task: görevin durup browser kirasını bırakması için beklenecek süre
+    task_stop_timeout: float = 10.0
+    # Canlı log akışı: görev başına tampon satır sayısı ve tutulan görev kanalı sayısı
+    log_buffer_size: int = 1000
+    log_max_channels: int = 256
+    log_stream_heartbeat: float = 15.0
+    # task_logs tablosuna toplu yazım: her N ms'de veya M satırda bir executemany
+    log_flush_interval_ms: int = 500
+    log_flush_batch_size: int = 200
+    log_pending_max: int = 10000
+    # Tüm görevlerin ortak log geçmişi (/api/logs) için tutulan satır sayısı
+    global_log_size: int = 1000
+    # Önceden ısıtılmış BrowserContext havuzu (worker sayısıyla aynı tutulmalı)
+    browser_pool_size: int = 2
+    browser_pool_max_uses: int = 20
+    browser_pool_acquire_timeout: float = 60.0
+    # Browser süreç shard'ları (0 → CPU çekirdek sayısı)
+    browser_shards: int = 0
+    browser_shard_max_rss_mb: int = 0  # 0 → bellek sınırı kontrolü kapalı
+    browser_shard_check_interval: float = 30.0
+    browser_headless: bool = False
+    # Artımlı DOM snapshot'ları: ilk snapshot'tan sonra yalnızca değişen düğümler aktarılır
+    browser_incremental_dom: bool = False
+    # İstek engelleme profili: "ads", "media", "text" (boş → hiçbir şey engellenmez)
+    browser_interception_profile: Optional[str] = None
+    # Site başına öğrenilen sayfa yükleme bekleme süreleri
+    browser_adaptive_timing: bool = False
+    # Öğrenilen profilin kalıcı JSON dosyası (boş → yalnızca bellekte tutulur)
+    browser_timing_profile_path: Optional[str] = None
+    # Ekran görüntüsü biçimi: "png", "jpeg", "webp" (webp ve küçültme Pillow gerektirir)
+    browser_screenshot_format: str = "jpeg"
+    browser_screenshot_quality: Optional[int] = 75
+    browser_screenshot_max_dimension: Optional[int] = None
 
     class Config:
         env_file = ".env"
@@ -1,17 +1,41 @@
 # app/crud.py
 
-from sqlalchemy.orm import Session
+import base64
+
+from sqlalchemy import event, func, insert, inspect, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from app import models, schemas
+from app.core.cache import TTLCache
+from app.core.config import get_settings
 from app.models import TaskStatus as ModelTaskStatus
 
+settings = get_settings()
+
+
+# ---------- SAYFALAMA (KEYSET CURSOR) ----------
+
+def _encode_cursor(moment: datetime, row_id: int) -> str:
+    """Son satırın (zaman, id) anahtarını URL-güvenli, opak bir cursor'a çevirir."""
+    raw = f"{moment.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        moment, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(moment), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Geçersiz cursor: {cursor!r}") from e
+
 
 # ---------- KULLANICI CRUD ----------
 
-def create_user(db: Session, user: schemas.UserCreate) -> Optional[models.User]:
+async def create_user(db: AsyncSession, user: schemas.UserCreate) -> Optional[models.User]:
     db_user = models.User(
         username=user.username,
         email=user.email,
@@ -21,29 +45,76 @@ def create_user(db: Session, user: schemas.UserCreate) -> Optional[models.User]:
     )
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         return None
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+
+# E-posta → UserResponse; kimliği doğrulanmış istekler her seferinde DB'ye gitmez.
+# User güncellenince / silinince aşağıdaki mapper event'leri kaydı düşürür.
+_principal_cache: TTLCache[str, schemas.UserResponse] = TTLCache(
+    maxsize=settings.auth_cache_size,
+    ttl=settings.auth_principal_cache_ttl,
+)
+
+
+async def get_user_principal(db: AsyncSession, email: str) -> Optional[schemas.UserResponse]:
+    """
+    Token'daki e-posta için kullanıcı bilgisini önbellekten (yoksa DB'den) döner.
+    Parola hash'i içermez; parola doğrulaması için get_user_by_email kullanılmalı.
+    """
+    principal = _principal_cache.get(email)
+    if principal is not None:
+        return principal
+    user = await get_user_by_email(db, email)
+    if user is None:
+        return None
+    principal = schemas.UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        role=user.role.value,
+        created_at=user.created_at,
+    )
+    _principal_cache.set(email, principal)
+    return principal
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.username == username).first()
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper, connection, target: models.User) -> None:
+    _principal_cache.pop(target.email)
+    # E-posta değiştiyse eski anahtarı da düşür
+    for old_email in inspect(target).attrs.email.history.deleted:
+        _principal_cache.pop(old_email)
 
 
-def get_user(db: Session, user_id: int) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.id == user_id).first()
+async def update_user_password(db: AsyncSession, user: models.User, hashed_password: str) -> models.User:
+    user.hashed_password = hashed_password
+    await db.commit()
+    return user
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.User]:
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.get(models.User, user_id)
 
 
 # ---------- GÖREV CRUD ----------
 
-def create_task(db: Session, task: schemas.TaskCreate, user_id: int) -> models.Task:
+async def create_task(db: AsyncSession, task: schemas.TaskCreate, user_id: int) -> models.Task:
     """
     Yeni görevi 'pending' olarak oluşturur.
     """
@@ -54,22 +125,48 @@ def create_task(db: Session, task: schemas.TaskCreate, user_id: int) -> models.T
         user_id=user_id
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
 
-def get_tasks_by_user(db: Session, user_id: int) -> List[models.Task]:
-    return db.query(models.Task).filter(models.Task.user_id == user_id).all()
+async def get_tasks_page(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[ModelTaskStatus] = None,
+) -> Tuple[List[models.Task], Optional[str]]:
+    """
+    Kullanıcının görevlerini en yeniden eskiye, keyset sayfalama ile döner.
+    (user_id[, status], created_at, id) indeksi sayesinde her sayfa geçmişin
+    büyüklüğünden bağımsız olarak sabit maliyetlidir. Geçersiz cursor'da ValueError.
+    """
+    query = select(models.Task).where(models.Task.user_id == user_id)
+    if status is not None:
+        query = query.where(models.Task.status == status)
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.Task.created_at, models.Task.id) < tuple_(created_at, last_id)
+        )
+    query = query.order_by(models.Task.created_at.desc(), models.Task.id.desc()).limit(limit + 1)
+
+    tasks = list((await db.execute(query)).scalars().all())
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = _encode_cursor(tasks[-1].created_at, tasks[-1].id)
+    return tasks, next_cursor
 
 
-def get_task_by_id(db: Session, task_id: int) -> Optional[models.Task]:
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+async def get_task_by_id(db: AsyncSession, task_id: int) -> Optional[models.Task]:
+    return await db.get(models.Task, task_id)
 
 
 # ---------- LOG CRUD ----------
 
-def add_task_log(db: Session, task_id: int, log: schemas.TaskLogCreate) -> models.TaskLog:
+async def add_task_log(db: AsyncSession, task_id: int, log: schemas.TaskLogCreate) -> models.TaskLog:
     db_log = models.TaskLog(
         task_id=task_id,
         log_type=log.log_type,
@@ -77,63 +174,112 @@ def add_task_log(db: Session, task_id: int, log: schemas.TaskLogCreate) -> model
         timestamp=datetime.utcnow()
     )
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    await db.commit()
+    await db.refresh(db_log)
     return db_log
 
 
-def get_logs_by_task(db: Session, task_id: int) -> List[models.TaskLog]:
-    return db.query(models.TaskLog).filter(models.TaskLog.task_id == task_id).all()
+async def add_task_logs_bulk(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Log satırlarını tek bir executemany INSERT ile yazar.
+    rows: task_id, log_type, message, timestamp anahtarlı sözlükler.
+    """
+    if not rows:
+        return
+    await db.execute(insert(models.TaskLog), rows)
+    await db.commit()
+
+
+async def get_logs_by_task(db: AsyncSession, task_id: int) -> List[models.TaskLog]:
+    result = await db.execute(
+        select(models.TaskLog)
+        .where(models.TaskLog.task_id == task_id)
+        .order_by(models.TaskLog.timestamp, models.TaskLog.id)
+    )
+    return list(result.scalars().all())
+
+
+async def get_logs_page(
+    db: AsyncSession,
+    task_id: int,
+    limit: int = 200,
+    cursor: Optional[str] = None,
+) -> Tuple[List[models.TaskLog], Optional[str]]:
+    """Görev loglarını eskiden yeniye, (task_id, timestamp, id) indeksiyle sayfalar."""
+    query = select(models.TaskLog).where(models.TaskLog.task_id == task_id)
+    if cursor:
+        timestamp, last_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.TaskLog.timestamp, models.TaskLog.id) > tuple_(timestamp, last_id)
+        )
+    query = query.order_by(models.TaskLog.timestamp, models.TaskLog.id).limit(limit + 1)
+
+    logs = list((await db.execute(query)).scalars().all())
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = _encode_cursor(logs[-1].timestamp, logs[-1].id)
+    return logs, next_cursor
+
+
+async def count_logs_by_task(db: AsyncSession, task_id: int) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(models.TaskLog).where(models.TaskLog.task_id == task_id)
+    )
+    return result.scalar_one()
 
 
 # ---------- GÖREV SİLME ----------
 
-def delete_task(db: Session, task_id: int, user_id: int) -> bool:
+async def delete_task(db: AsyncSession, task_id: int, user_id: int) -> bool:
     """
     Sadece sahibi olan kullanıcı kendi görevini silebilsin.
     """
-    task = db.query(models.Task).filter(
-        models.Task.id == task_id,
-        models.Task.user_id == user_id
-    ).first()
+    result = await db.execute(
+        select(models.Task).where(
+            models.Task.id == task_id,
+            models.Task.user_id == user_id
+        )
+    )
+    task = result.scalars().first()
     if not task:
         return False
 
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return True
 
 
 # ---------- GÖREV DURUMU GÜNCELLEME ----------
 
-def update_task_status(
-    db: Session,
+async def update_task_status(
+    db: AsyncSession,
     task_id: int,
     new_status: ModelTaskStatus
 ) -> Optional[models.Task]:
     """
     Verilen task_id'li görevin status'unu new_status ile günceller.
     """
-    task = get_task_by_id(db, task_id)
+    task = await get_task_by_id(db, task_id)
     if not task:
         return None
 
     task.status = new_status
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
-def start_task(db: Session, task_id: int) -> Optional[models.Task]:
+async def start_task(db: AsyncSession, task_id: int) -> Optional[models.Task]:
     """
     Görevin status'unu 'running' olarak işaretler.
     """
-    return update_task_status(db, task_id, ModelTaskStatus.running)
+    return await update_task_status(db, task_id, ModelTaskStatus.running)
 
 
-def finish_task(db: Session, task_id: int, success: bool) -> Optional[models.Task]:
+async def finish_task(db: AsyncSession, task_id: int, success: bool) -> Optional[models.Task]:
     """
     Agent tamamlandığında görevin status'unu 'done' veya 'failed' olarak ayarlar.
     """
     final_status = ModelTaskStatus.done if success else ModelTaskStatus.failed
-    return update_task_status(db, task_id, final_status)
+    return await update_task_status(db, task_id, final_status)
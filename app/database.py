@@ -1,24 +1,84 @@
 # app/database.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from app.core.config import get_settings
 
 # Core/config.py üzerinden .env’den çekilen ayarlar
 settings = get_settings()
 
-# Engine tanımı (SQLite için check_same_thread)
+# Sync URL'lerin async sürücü karşılıkları
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def _async_url(url: str) -> str:
+    """sqlite:///… → sqlite+aiosqlite:///…, postgresql://… → postgresql+asyncpg://…"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+_url = make_url(settings.database_url)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+_is_memory = _is_sqlite and _url.database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Her yeni SQLite bağlantısında:
+    - WAL: okuyucular yazıcıyı (worker status güncellemeleri) beklemez
+    - busy_timeout: kilitte hemen 'database is locked' yerine bekler
+    - synchronous=NORMAL: WAL ile güvenli, commit başına fsync yok
+    """
+    cursor = dbapi_connection.cursor()
+    if not _is_memory:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.close()
+
+
+# Sync engine: yalnızca başlangıçta tablo oluşturma (create_all) için
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
 )
 
+# Async engine: tüm istek / worker sorguları bunun üzerinden
+_pool_options = {} if _is_memory else {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": not _is_sqlite,
+}
+async_engine = create_async_engine(_async_url(settings.database_url), **_pool_options)
+
+if _is_sqlite:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
 # Oturum (session) fabrikası
-SessionLocal = sessionmaker(
-    autocommit=False,
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False,
 )
 
 # Tüm modeller bu Base’in altından türeyecek
 Base = declarative_base()
+
+
+async def get_db():
+    """FastAPI dependency: istek başına bir AsyncSession."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Text,
     DateTime,
     ForeignKey,
+    Index,
     Enum as SAEnum
 )
 from sqlalchemy.orm import relationship
@@ -61,6 +62,13 @@ class Task(Base):
 
     logs = relationship("TaskLog", back_populates="task", cascade="all, delete")
 
+    # Keyset sayfalama: kullanıcının görevleri (created_at, id) sırasıyla,
+    # status filtresi de aynı sıralamayı indeksten okur
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Task(title={self.title!r}, status={self.status.value!r})>"
 
@@ -77,5 +85,9 @@ class TaskLog(Base):
 
     task = relationship("Task", back_populates="logs")
 
+    __table_args__ = (
+        Index("ix_task_logs_task_timestamp", "task_id", "timestamp", "id"),
+    )
+
     def __repr__(self):
         return f"<TaskLog(task_id={self.task_id!r}, type={self.log_type!r})>"
@@ -1,16 +1,19 @@
 # app/routes/api.py
 
-import threading
-import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, get_db
 from app import crud, schemas
-from app.state import running, task_log
-from app.services.agent_runner import run_agent
+from app.models import TaskStatus as ModelTaskStatus
+from app.state import task_log
+from app.services.agent_runner import run_agent, cancel_task, is_task_live
+from app.services.scheduler import scheduler, QueueFullError, SchedulerClosedError
+from app.services.log_stream import log_entries, sse_events, resume_offset
+from app.services.task_logs import get_task_logs
 from app.core.auth import decode_access_token
 from fastapi import Header
 
@@ -18,15 +21,6 @@ router = APIRouter(prefix="/api")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-# ——— DB SESSION DEPENDENCY ———
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ——— USER AUTH DEPENDENCY ———
 def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
     payload = decode_access_token(token)
@@ -38,42 +32,57 @@ def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
     return payload["sub"]
 
 
+def _rejected_exception(error: Exception) -> HTTPException:
+    """Kuyruk doluysa 429 + kuyruk uzunluğu, kapanıştaysa 503."""
+    if isinstance(error, QueueFullError):
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": str(error), "queue_length": error.queue_length},
+            headers={"Retry-After": "30"},
+        )
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+    )
+
+
 # ——— RUN TASK ———
 @router.post(
     "/run_task",
     status_code=status.HTTP_202_ACCEPTED,
     response_model=dict
 )
-def run_task_api(
+async def run_task_api(
     task_text: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_email: str = Depends(get_current_user_email),
 ):
-    if running["state"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Zaten çalışan bir görev var."
-        )
-
     # Kullanıcıyı al
-    user = crud.get_user_by_email(db, user_email)
+    user = await crud.get_user_principal(db, user_email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Kullanıcı bulunamadı."
         )
 
-    # DB'ye yeni görev kaydet
-    task = crud.create_task(db, schemas.TaskCreate(title=task_text), user.id)
+    # Kuyrukta yer yoksa 429 (kuyruk uzunluğu ile birlikte)
+    try:
+        scheduler.ensure_capacity()
+    except (QueueFullError, SchedulerClosedError) as e:
+        raise _rejected_exception(e)
 
-    # Ajanı arka planda başlat
-    running["state"] = True
-    thread = threading.Thread(
-        target=lambda: asyncio.run(run_agent(task_text))
-    )
-    thread.start()
+    # DB'ye yeni görev kaydet ve kuyruğa al
+    task = await crud.create_task(db, schemas.TaskCreate(title=task_text), user.id)
+    task_id = task.id
+    try:
+        position = scheduler.submit(task_id, lambda: run_agent(task_id, task_text))
+    except (QueueFullError, SchedulerClosedError) as e:
+        # create_task beklenirken kuyruk dolmuş veya kapanış başlamış olabilir;
+        # hiç çalışmayacak kaydı geride bırakma
+        await crud.delete_task(db, task_id, user.id)
+        raise _rejected_exception(e)
 
-    return {"message": "Görev başladı.", "task_id": task.id}
+    return {"message": "Görev kuyruğa alındı.", "task_id": task_id, "queue_position": position}
 
 
 # ——— STOP TASK ———
@@ -82,36 +91,61 @@ def run_task_api(
     status_code=status.HTTP_200_OK,
     response_model=dict
 )
-def stop_task_api(
-    token: str = Depends(oauth2_scheme)
+async def stop_task_api(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    user_email: str = Depends(get_current_user_email),
 ):
-    if not running["state"]:
+    user = await crud.get_user_principal(db, user_email)
+    task = await crud.get_task_by_id(db, task_id)
+    if not user or not task or task.user_id != user.id:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Çalışan bir görev yok."
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı."
         )
 
-    # Durumu değiştir; agent_runner sonunda da False olacak
-    running["state"] = False
-    return {"message": "Görev durduruldu."}
+    # Kuyruktaysa geri çekilir, çalışıyorsa Agent durdurulup iptal edilir
+    if not await cancel_task(db, task_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Görev kuyrukta veya çalışır durumda değil."
+        )
+    return {"message": "Görev durduruldu.", "task_id": task_id}
 
 
 # ——— LIST TASKS ———
 @router.get(
     "/tasks",
-    response_model=List[schemas.TaskResponse]
+    response_model=schemas.TaskPage
 )
-def list_tasks_api(
-    db: Session = Depends(get_db),
+async def list_tasks_api(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status_filter: Optional[schemas.TaskStatus] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_db),
     user_email: str = Depends(get_current_user_email),
 ):
-    user = crud.get_user_by_email(db, user_email)
+    """Görevleri en yeniden eskiye sayfalar; sonraki sayfa için next_cursor kullanılır."""
+    user = await crud.get_user_principal(db, user_email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Kullanıcı bulunamadı."
         )
-    return crud.get_tasks_by_user(db, user.id)
+    try:
+        tasks, next_cursor = await crud.get_tasks_page(
+            db,
+            user.id,
+            limit=limit,
+            cursor=cursor,
+            status=ModelTaskStatus(status_filter.value) if status_filter else None,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"items": tasks, "next_cursor": next_cursor}
 
 
 # ——— GET LOGS ———
@@ -129,7 +163,118 @@ def get_logs_api(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz token."
         )
-    return task_log
+    return list(task_log)
+
+
+# ——— TASK LOG STREAM ———
+async def _get_owned_task(db: AsyncSession, task_id: int, user_email: Optional[str]):
+    user = await crud.get_user_principal(db, user_email) if user_email else None
+    task = await crud.get_task_by_id(db, task_id)
+    if not user or not task or task.user_id != user.id:
+        return None
+    return task
+
+
+@router.get(
+    "/tasks/{task_id}/logs",
+    response_model=List[str]
+)
+async def get_task_logs_api(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    user_email: str = Depends(get_current_user_email),
+):
+    """Görevin tüm log geçmişi: sıcak görevler bellekten, soğuklar task_logs tablosundan."""
+    if not await _get_owned_task(db, task_id, user_email):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı."
+        )
+    return await get_task_logs(db, task_id)
+
+
+@router.get(
+    "/tasks/{task_id}/logs/history",
+    response_model=schemas.TaskLogPage
+)
+async def list_task_logs_api(
+    task_id: int,
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    user_email: str = Depends(get_current_user_email),
+):
+    """task_logs tablosundaki kalıcı logları eskiden yeniye sayfalar."""
+    if not await _get_owned_task(db, task_id, user_email):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı."
+        )
+    try:
+        logs, next_cursor = await crud.get_logs_page(db, task_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"items": logs, "next_cursor": next_cursor}
+
+
+@router.get("/tasks/{task_id}/logs/stream")
+async def stream_task_logs_api(
+    task_id: int,
+    offset: int = Query(0, ge=0),
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    user_email: str = Depends(get_current_user_email),
+):
+    """
+    Görev loglarını Server-Sent Events ile akıtır.
+    Yalnızca offset'ten (veya Last-Event-ID'den) sonraki satırlar gönderilir.
+    """
+    if not await _get_owned_task(db, task_id, user_email):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı."
+        )
+    start = resume_offset(offset, last_event_id)
+    return StreamingResponse(
+        sse_events(task_id, start, follow=is_task_live(task_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/tasks/{task_id}/logs/ws")
+async def stream_task_logs_ws(
+    websocket: WebSocket,
+    task_id: int,
+    token: str = Query(...),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Görev loglarını WebSocket üzerinden {"offset", "line"} mesajları olarak akıtır.
+    Tarayıcı WebSocket'leri header gönderemediği için token query parametresiyle alınır.
+    """
+    payload = decode_access_token(token)
+    async with AsyncSessionLocal() as db:
+        task = await _get_owned_task(db, task_id, payload.get("sub") if payload else None)
+    if not task:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    try:
+        async for entry in log_entries(task_id, offset, follow=is_task_live(task_id)):
+            if entry is None:
+                await websocket.send_json({"event": "ping"})
+                continue
+            entry_offset, line = entry
+            await websocket.send_json({"offset": entry_offset, "line": line})
+        await websocket.send_json({"event": "end"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
 
 
 # ——— CLEAR HISTORY ———
@@ -5,14 +5,14 @@ from fastapi import APIRouter, Request, Depends, Form, status
 from fastapi.responses import RedirectResponse, JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
-from typing import Generator, Optional
-from app.database import SessionLocal
-from app import crud, schemas
+from typing import Optional
+from app.database import get_db
+from app import crud, models, schemas
 from app.core.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
     decode_access_token
 )
@@ -23,13 +23,20 @@ templates.env.globals["now"] = datetime.utcnow
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-# ——— DB SESSION DEPENDENCY ———
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async def _authenticate(db: AsyncSession, email: str, password: str) -> Optional[models.User]:
+    """
+    E-posta / parola doğrular; bcrypt işi ayrı thread havuzunda çalışır.
+    Hash eski bir maliyet faktörüyle üretilmişse şeffafça yeniden hash'lenir.
+    """
+    user = await crud.get_user_by_email(db, email)
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        await crud.update_user_password(db, user, new_hash)
+    return user
 
 
 # ——— WEB (TEMPLATE) ROUTES ———
@@ -45,19 +52,19 @@ async def register(
     username: str = Form(...),
     email: EmailStr = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # e‑posta kontrolü
-    if crud.get_user_by_email(db, email):
+    if await crud.get_user_by_email(db, email):
         return templates.TemplateResponse(
             "register.html",
             {"request": request, "error": "Bu e‑posta zaten kayıtlı."}
         )
 
     # kullanıcıyı oluştur
-    hashed_pw = hash_password(password)
+    hashed_pw = await hash_password_async(password)
     user_in = schemas.UserCreate(username=username, email=email, password=hashed_pw)
-    user = crud.create_user(db, user_in)
+    user = await crud.create_user(db, user_in)
     if not user:
         return templates.TemplateResponse(
             "register.html",
@@ -77,10 +84,10 @@ async def login_form(request: Request):
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await _authenticate(db, form_data.username, form_data.password)
+    if not user:
         return templates.TemplateResponse(
             "login.html",
             {"request": request, "error": "Geçersiz kullanıcı adı veya şifre."}
@@ -93,7 +100,7 @@ async def login(
     return response
 
 
-def get_current_user(request: Request, db: Session) -> Optional[schemas.UserResponse]:
+async def get_current_user(request: Request, db: AsyncSession) -> Optional[schemas.UserResponse]:
     """
     Çerezdeki access_token'ı alıp decode eder.
     """
@@ -105,12 +112,12 @@ def get_current_user(request: Request, db: Session) -> Optional[schemas.UserResp
     if not payload:
         return None
     email = payload.get("sub")
-    return crud.get_user_by_email(db, email)
+    return await crud.get_user_principal(db, email)
 
 
 @router.get("/profile")
-async def profile(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request, db)
+async def profile(request: Request, db: AsyncSession = Depends(get_db)):
+    user = await get_current_user(request, db)
     if not user:
         return RedirectResponse("/login")
     # profile.html içinde user bilgilerini gösterebilirsin
@@ -123,32 +130,32 @@ async def profile(request: Request, db: Session = Depends(get_db)):
 # ——— JSON API ROUTES ———
 
 @router.post("/api/register", response_model=schemas.UserResponse)
-def api_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    if crud.get_user_by_email(db, user.email):
+async def api_register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    if await crud.get_user_by_email(db, user.email):
         raise JSONResponse(status_code=400, content={"detail": "Email already in use"})
-    user.password = hash_password(user.password)
-    created = crud.create_user(db, user)
+    user.password = await hash_password_async(user.password)
+    created = await crud.create_user(db, user)
     if not created:
         raise JSONResponse(status_code=500, content={"detail": "User creation failed"})
     return created
 
 
 @router.post("/api/login")
-def api_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def api_login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await _authenticate(db, form_data.username, form_data.password)
+    if not user:
         raise JSONResponse(status_code=401, content={"detail": "Invalid credentials"})
     token = create_access_token({"sub": user.email})
     return {"access_token": token, "token_type": "bearer"}
 
 
 @router.get("/api/me", response_model=schemas.UserResponse)
-def api_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def api_me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     payload = decode_access_token(token)
     if not payload:
         raise JSONResponse(status_code=401, content={"detail": "Invalid token"})
     email = payload.get("sub")
-    user = crud.get_user_by_email(db, email)
+    user = await crud.get_user_principal(db, email)
     if not user:
         raise JSONResponse(status_code=404, content={"detail": "User not found"})
     return user
@@ -1,45 +1,88 @@
 import sys
 import asyncio
 from datetime import datetime
+from typing import Optional
 # Windows’ta subprocess desteği için ProactorEventLoop politikası
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-import threading
-from fastapi import APIRouter, Request, Depends, Form, status, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi import APIRouter, Request, Depends, Form, Query, status, HTTPException
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.routes.user_routes import get_db, get_current_user
-from app.services.agent_runner import run_agent
+from app.services.agent_runner import run_agent, cancel_task, is_task_live, delete_task_history
+from app.services.log_stream import sse_events, resume_offset
+from app.services.scheduler import scheduler, QueueFullError, SchedulerClosedError
+from app.services.task_registry import task_registry
 from app import crud, schemas
+from app.core.config import get_settings
+from app.models import TaskStatus as ModelTaskStatus
 from app.state import task_log, add_log
 
 router = APIRouter()
+settings = get_settings()
 templates = Jinja2Templates(directory="app/templates")
 templates.env.globals["now"] = datetime.utcnow
 
+def _rejected_response(error: Exception) -> JSONResponse:
+    """Kuyruk doluysa 429 + kuyruk uzunluğu, kapanıştaysa 503 döner."""
+    if isinstance(error, QueueFullError):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": str(error), "queue_length": error.queue_length},
+            headers={"Retry-After": "30"},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(error)},
+    )
+
+
 @router.get("/tasks")
-async def tasks_page(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(request, db)
+async def tasks_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    status_filter: Optional[schemas.TaskStatus] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_db),
+):
+    user = await get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=status.HTTP_303_SEE_OTHER)
-    tasks = crud.get_tasks_by_user(db, user.id)
-    logs = task_log.copy()
+    try:
+        tasks, next_cursor = await crud.get_tasks_page(
+            db,
+            user.id,
+            limit=settings.tasks_page_size,
+            cursor=cursor,
+            status=ModelTaskStatus(status_filter.value) if status_filter else None,
+        )
+    except ValueError:
+        # Bozuk/eskimiş cursor: ilk sayfaya dön
+        return RedirectResponse("/tasks", status_code=status.HTTP_303_SEE_OTHER)
+    logs = list(task_log)
     return templates.TemplateResponse(
         "tasks.html",
-        {"request": request, "user": user, "tasks": tasks, "logs": logs},
+        {
+            "request": request,
+            "user": user,
+            "tasks": tasks,
+            "logs": logs,
+            "next_cursor": next_cursor,
+            "status_filter": status_filter.value if status_filter else "",
+            "statuses": [s.value for s in schemas.TaskStatus],
+        },
     )
 
 
 @router.post("/run_task")
 async def run_task(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Hem HTML form hem JSON API ile yeni görev başlatır."""
-    user = get_current_user(request, db)
+    user = await get_current_user(request, db)
     if not user:
         if request.headers.get("accept", "").startswith("application/json"):
             return JSONResponse(status_code=401, content={"detail": "Authentication required"})
@@ -59,18 +102,35 @@ async def run_task(
             raise HTTPException(status_code=400, detail="task_text is required")
         return RedirectResponse("/tasks", status_code=303)
 
-    # DB kaydı oluştur ve görevi başlat
-    task = crud.create_task(db, schemas.TaskCreate(title=task_text), user.id)
-    add_log(f"Görev oluşturuldu: {task_text} (ID: {task.id})")
+    # Kuyrukta yer yoksa DB kaydı oluşturmadan geri çevir
+    try:
+        scheduler.ensure_capacity()
+    except (QueueFullError, SchedulerClosedError) as e:
+        add_log(f"Görev reddedildi: {e}")
+        if ct.startswith("application/json"):
+            return _rejected_response(e)
+        return RedirectResponse("/tasks", status_code=303)
 
-    # Thread içinde async agent'i çalıştır
-    threading.Thread(
-        target=lambda: asyncio.run(run_agent(task.id, task_text)),
-        daemon=True
-    ).start()
+    # DB kaydı oluştur ve görevi kuyruğa al
+    task = await crud.create_task(db, schemas.TaskCreate(title=task_text), user.id)
+    task_id = task.id
+    try:
+        position = scheduler.submit(task_id, lambda: run_agent(task_id, task_text))
+    except (QueueFullError, SchedulerClosedError) as e:
+        # create_task beklenirken kuyruk dolmuş veya kapanış başlamış olabilir;
+        # hiç çalışmayacak kaydı geride bırakma
+        await crud.delete_task(db, task_id, user.id)
+        add_log(f"Görev reddedildi: {e}")
+        if ct.startswith("application/json"):
+            return _rejected_response(e)
+        return RedirectResponse("/tasks", status_code=303)
+    add_log(f"Görev oluşturuldu: {task_text} (ID: {task_id}, sıra: {position})")
 
     if ct.startswith("application/json"):
-        return {"message": "Task started", "task_id": task.id}
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Task queued", "task_id": task_id, "queue_position": position},
+        )
     return RedirectResponse("/tasks", status_code=303)
 
 
@@ -78,16 +138,17 @@ async def run_task(
 async def delete_task_web(
     request: Request,
     task_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = get_current_user(request, db)
+    user = await get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
 
-    success = crud.delete_task(db, task_id, user.id)
+    success = await crud.delete_task(db, task_id, user.id)
     if not success:
         add_log(f"Silme hatası: Yetkisiz veya bulunamadı (task_id={task_id})")
     else:
+        await delete_task_history(task_id)
         add_log(f"Görev silindi (task_id={task_id})")
 
     return RedirectResponse("/tasks", status_code=303)
@@ -97,26 +158,77 @@ async def delete_task_web(
 async def rerun_task(
     request: Request,
     task_id: int = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = get_current_user(request, db)
+    user = await get_current_user(request, db)
     if not user:
         return RedirectResponse("/login", status_code=303)
 
-    task = crud.get_task_by_id(db, task_id)
+    task = await crud.get_task_by_id(db, task_id)
     if not task or task.user_id != user.id:
         add_log(f"Yeniden başlatma hatası: Yetkisiz veya bulunamadı (task_id={task_id})")
         return RedirectResponse("/tasks", status_code=303)
 
-    threading.Thread(
-        target=lambda: asyncio.run(run_agent(task.id, task.title)),
-        daemon=True
-    ).start()
+    task_id, task_text = task.id, task.title
+    if scheduler.is_queued(task_id) or task_registry.is_running(task_id):
+        add_log(f"Yeniden başlatma reddedildi: görev zaten kuyrukta veya çalışıyor (task_id={task_id})")
+        return RedirectResponse("/tasks", status_code=303)
+
+    try:
+        position = scheduler.submit(task_id, lambda: run_agent(task_id, task_text))
+    except (QueueFullError, SchedulerClosedError) as e:
+        add_log(f"Yeniden başlatma reddedildi (task_id={task_id}): {e}")
+        return RedirectResponse("/tasks", status_code=303)
 
-    add_log(f"Görev yeniden başlatıldı: {task.title} (ID: {task.id})")
+    add_log(f"Görev yeniden kuyruğa alındı: {task_text} (ID: {task_id}, sıra: {position})")
     return RedirectResponse("/tasks", status_code=303)
 
 
+@router.post("/stop_task")
+async def stop_task_web(
+    request: Request,
+    task_id: int = Form(...),
+    db: AsyncSession = Depends(get_db),
+):
+    user = await get_current_user(request, db)
+    if not user:
+        return RedirectResponse("/login", status_code=303)
+
+    task = await crud.get_task_by_id(db, task_id)
+    if not task or task.user_id != user.id:
+        add_log(f"Durdurma hatası: Yetkisiz veya bulunamadı (task_id={task_id})")
+        return RedirectResponse("/tasks", status_code=303)
+
+    if await cancel_task(db, task_id):
+        add_log(f"Görev durduruldu (task_id={task_id})")
+    else:
+        add_log(f"Durdurma hatası: Görev çalışmıyor (task_id={task_id})")
+    return RedirectResponse("/tasks", status_code=303)
+
+
+@router.get("/tasks/{task_id}/logs/stream")
+async def stream_task_logs(
+    request: Request,
+    task_id: int,
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Görev sayfasındaki EventSource için çerezle doğrulanan SSE log akışı."""
+    user = await get_current_user(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    task = await crud.get_task_by_id(db, task_id)
+    if not task or task.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    start = resume_offset(offset, request.headers.get("last-event-id"))
+    return StreamingResponse(
+        sse_events(task_id, start, follow=is_task_live(task_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/clear_history")
 async def clear_history(request: Request):
     task_log.clear()
@@ -74,4 +74,11 @@ class TaskLogResponse(TaskLogBase):
   
 
 
+class TaskPage(BaseModel):
+    items : List[TaskResponse]
+    next_cursor : Optional[str] = None
 
+
+class TaskLogPage(BaseModel):
+    items : List[TaskLogResponse]
+    next_cursor : Optional[str] = None
@@ -1,13 +1,20 @@
+import os
 import sys
 import asyncio
 import logging
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import SessionLocal
-from app.state import add_log, browser_ctx, running
+from app.database import AsyncSessionLocal
+from app.state import add_log
 from app.crud import start_task, finish_task
 from app.core.config import get_settings
-from app.services.utils import get_llm, get_browser_instance
+from app.services.utils import get_llm
+from app.services.browser_pool import browser_pool
+from app.services.log_stream import log_broker
+from app.services.task_logs import open_task_log
+from app.services.scheduler import scheduler
+from app.services.task_registry import task_registry
 from browser_use import Agent
 
 logger = logging.getLogger("agent_runner")
@@ -17,21 +24,40 @@ logger.setLevel(logging.INFO)
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+def task_history_path(task_id: int) -> Optional[str]:
+    """agent_history_dir ayarlıysa görevin adım geçmişinin (JSONL) yolu."""
+    history_dir = get_settings().agent_history_dir
+    return os.path.join(history_dir, f"{task_id}.jsonl") if history_dir else None
+
+
+async def delete_task_history(task_id: int) -> None:
+    """Silinen görevin geçmiş dosyasını kaldırır; dosya yoksa bir şey yapmaz."""
+    path = task_history_path(task_id)
+    if not path:
+        return
+    try:
+        await asyncio.to_thread(os.remove, path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to delete history of task {task_id}: {e}")
+
+
 async def run_agent(task_id: int, task_text: str):
     """
     1) Task kaydını başlatır ve log’u açar.
     2) Chain‑of‑thought + text‑based click talimatı içeren prompt’u hazırlar.
-    3) ResilientBrowser ile Agent’i çalıştırır.
+    3) Havuzdan kiralanan, önceden ısıtılmış BrowserContext ile Agent’i çalıştırır.
     4) Zaman aşımı koruması ve hata yönetimi sağlar.
-    5) Sonucu DB’ye kaydeder.
+    5) task_registry'ye kaydolur; stop_task ile iptal edilebilir.
+    6) Sonucu DB’ye kaydeder.
     """
     settings = get_settings()
-    db: Session = SessionLocal()
+    db: AsyncSession = AsyncSessionLocal()
+    handle = task_registry.register(task_id)
 
-    def log(msg: str):
-        full = f"[Task {task_id}] {msg}"
-        add_log(full)
-        logger.info(full)
+    def log(msg: str, log_type: str = "info"):
+        add_log(f"[Task {task_id}] {msg}", task_id=task_id, log_type=log_type)
 
     # Prompt şablonu
     system_prompt = """
@@ -51,45 +77,83 @@ At the end, generate a JSON summary of your actions and any fallback steps.
 
     try:
         # Başlatma
-        start_task(db, task_id)
-        running["state"] = True
+        await open_task_log(db, task_id)
+        await start_task(db, task_id)
         log("status → running")
 
-        # LLM ve browser örneğini al
+        # LLM örneğini al, havuzdan context kirala
         llm = get_llm()
-        browser = get_browser_instance()
-        browser_ctx["browser"] = browser
-        log("ResilientBrowser initialized")
-
-        # Agent konfigürasyonu
-        agent = Agent(
-            task=full_task,
-            llm=llm,
-            browser=browser,
-            max_actions_per_step=settings.agent_max_actions,
-        )
-
-        # Çalıştırma (zaman aşımı)
-        log(f"Running agent (timeout={timeout}s)")
-        await asyncio.wait_for(
-            agent.run(max_steps=settings.agent_max_steps),
-            timeout=timeout
-        )
+        async with browser_pool.lease() as browser_context:
+            log("Browser context leased from pool")
+
+            # Agent konfigürasyonu
+            agent = Agent(
+                task=full_task,
+                llm=llm,
+                browser_context=browser_context,
+                max_actions_per_step=settings.agent_max_actions,
+                screenshot_store_dir=settings.agent_screenshot_dir,
+                history_path=task_history_path(task_id),
+            )
+            task_registry.attach_agent(task_id, agent)
+
+            # Çalıştırma (zaman aşımı)
+            log(f"Running agent (timeout={timeout}s)")
+            await asyncio.wait_for(
+                agent.run(max_steps=settings.agent_max_steps),
+                timeout=timeout
+            )
 
         # Başarı
-        finish_task(db, task_id, True)
+        await finish_task(db, task_id, True)
         log("status → done")
 
     except asyncio.TimeoutError:
-        finish_task(db, task_id, False)
-        log(f"status → failed (timeout after {timeout}s)")
+        await finish_task(db, task_id, False)
+        log(f"status → failed (timeout after {timeout}s)", "error")
+
+    except asyncio.CancelledError:
+        await finish_task(db, task_id, False)
+        if not handle.stop_requested:
+            # Uygulama kapanışı: iptali yukarı ilet
+            log("status → failed (cancelled on shutdown)", "error")
+            raise
+        log("status → failed (stopped by user)", "warning")
 
     except Exception as e:
-        finish_task(db, task_id, False)
-        log(f"status → failed ({e})")
+        await finish_task(db, task_id, False)
+        log(f"status → failed ({e})", "error")
 
     finally:
         # Kaynak temizliği
-        db.close()
-        running["state"] = False
+        await db.close()
+        task_registry.unregister(task_id)
         log("DB session closed; agent state reset")
+        log_broker.close(task_id)
+
+
+async def cancel_task(db: AsyncSession, task_id: int) -> bool:
+    """
+    Görevi durdurur:
+    - Kuyrukta bekliyorsa kuyruktan çeker ve 'failed' olarak işaretler.
+    - Çalışıyorsa Agent'i durdurur, iptal eder ve browser kirasının
+      bırakılmasını task_stop_timeout kadar bekler.
+    Görev kuyrukta da çalışır durumda da değilse False döner.
+    """
+    settings = get_settings()
+    if scheduler.withdraw(task_id):
+        await finish_task(db, task_id, False)
+        await open_task_log(db, task_id)
+        add_log(f"[Task {task_id}] status → failed (withdrawn from queue)", task_id=task_id)
+        log_broker.close(task_id)
+        return True
+    return await task_registry.stop(task_id, timeout=settings.task_stop_timeout)
+
+
+def is_task_live(task_id: int) -> bool:
+    """Görev kuyrukta bekliyor veya çalışıyorsa log akışı açık tutulur."""
+    return (
+        scheduler.is_queued(task_id)
+        or task_registry.is_running(task_id)
+        or log_broker.is_open(task_id)
+    )
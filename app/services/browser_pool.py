@@ -0,0 +1,211 @@
+# app/services/browser_pool.py
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Set
+
+from browser_use.browser.context import BrowserContext
+
+from app.core.config import get_settings
+from app.services.browser_shards import BrowserShardManager
+
+logger = logging.getLogger("browser_pool")
+
+settings = get_settings()
+
+
+class PoolTimeoutError(Exception):
+    """acquire_timeout içinde boş context bulunamadığında fırlatılır."""
+
+
+@dataclass
+class _PooledContext:
+    context: BrowserContext
+    uses: int = 0
+
+
+class BrowserContextPool:
+    """
+    Önceden ısıtılmış, birbirinden izole BrowserContext havuzu.
+
+    - start() ile N context açılır ve ilk sayfaları hazırlanır; context'ler
+      BrowserShardManager üzerinden en az yüklü browser sürecine yerleştirilir.
+    - lease() her görev için bir context kiralar; dönüşte context sıfırlanır
+      (sekmeler, çerezler, storage) ve tekrar havuza konur.
+    - Kiralamadan önce sağlık kontrolü yapılır; bozuk veya max_uses'a ulaşmış
+      context'ler kapatılıp yenisiyle değiştirilir.
+    """
+
+    def __init__(self, size: int, max_uses: int, acquire_timeout: float):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self._shards: Optional[BrowserShardManager] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._total = 0
+        self._create_lock = asyncio.Lock()
+        self._background: Set[asyncio.Task] = set()
+        self._closed = False
+
+    # ——— YAŞAM DÖNGÜSÜ ———
+
+    async def start(self, shards: BrowserShardManager) -> None:
+        """Havuzu verilen shard yöneticisi üzerinde başlatır ve context'leri ısıtır."""
+        self._shards = shards
+        self._idle = asyncio.Queue()
+        self._closed = False
+
+        results = await asyncio.gather(
+            *(self._create() for _ in range(self.size)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Warm-up context could not be created: {result}")
+            else:
+                self._idle.put_nowait(result)
+        logger.info(f"Browser pool ready ({self._idle.qsize()}/{self.size} warm contexts)")
+
+    async def close(self) -> None:
+        """Tüm context'leri kapatır; bekleyen sıfırlama işlerini tamamlar."""
+        self._closed = True
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+        pooled: List[_PooledContext] = []
+        while self._idle is not None and not self._idle.empty():
+            pooled.append(self._idle.get_nowait())
+        await asyncio.gather(*(self._discard(p) for p in pooled), return_exceptions=True)
+
+    # ——— KİRALAMA ———
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserContext]:
+        """
+        Kullanım:
+            async with browser_pool.lease() as browser_context:
+                agent = Agent(..., browser_context=browser_context)
+        """
+        started = time.perf_counter()
+        pooled = await self._acquire()
+        logger.debug(f"Context leased in {(time.perf_counter() - started) * 1000:.1f} ms")
+        try:
+            yield pooled.context
+        finally:
+            pooled.uses += 1
+            # Sıfırlama görevin bitişini geciktirmesin diye arka planda yapılır
+            task = asyncio.create_task(self._release(pooled))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _acquire(self) -> _PooledContext:
+        if self._idle is None or self._closed:
+            raise RuntimeError("Browser pool başlatılmamış veya kapatılmış.")
+
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            if self._idle.empty() and self._total < self.size:
+                # Havuz eksik kalmışsa (ör. warm-up hatası) yeni context üret
+                async with self._create_lock:
+                    if self._total < self.size:
+                        return await self._create()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PoolTimeoutError(f"{self.acquire_timeout}s içinde boş browser context bulunamadı.")
+            try:
+                pooled = await asyncio.wait_for(self._idle.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise PoolTimeoutError(f"{self.acquire_timeout}s içinde boş browser context bulunamadı.")
+
+            if await self._is_healthy(pooled):
+                return pooled
+            logger.info("Unhealthy context dropped from pool")
+            await self._discard(pooled)
+
+    async def _release(self, pooled: _PooledContext) -> None:
+        if (
+            self._closed
+            or (self.max_uses and pooled.uses >= self.max_uses)
+            or self._shards.is_retiring(pooled.context)
+        ):
+            await self._discard(pooled)
+            return
+        try:
+            await self._reset(pooled.context)
+        except Exception as e:
+            logger.warning(f"Context reset failed, recycling: {e}")
+            await self._discard(pooled)
+            return
+        self._idle.put_nowait(pooled)
+
+    # ——— CONTEXT İŞLEMLERİ ———
+
+    async def _create(self) -> _PooledContext:
+        self._total += 1
+        try:
+            context = await self._shards.new_context()
+        except Exception:
+            self._total -= 1
+            raise
+        return _PooledContext(context=context)
+
+    async def _discard(self, pooled: _PooledContext) -> None:
+        self._total -= 1
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Failed to close pooled context: {e}")
+        await self._shards.release_context(pooled.context)
+
+    async def _is_healthy(self, pooled: _PooledContext) -> bool:
+        context = pooled.context
+        if context.session is None or self._shards.is_retiring(context):
+            return False
+        playwright_browser = context.browser.playwright_browser
+        if playwright_browser is None or not playwright_browser.is_connected():
+            return False
+        try:
+            page = await context.get_current_page()
+            await asyncio.wait_for(page.evaluate("1"), timeout=5)
+            return True
+        except Exception:
+            return False
+
+    async def _reset(self, context: BrowserContext) -> None:
+        """
+        Bir sonraki görev öncekinden hiçbir iz görmesin:
+        sekmeler kapatılır, çerezler/izinler ve origin storage'ları temizlenir;
+        reset_context() son ekran görüntüsünü, element önbelleklerini ve
+        engelleme istatistiklerini de sıfırlar.
+        """
+        session = await context.get_session()
+        storage = await session.context.storage_state()
+
+        await context.reset_context()
+        await session.context.clear_cookies()
+        await session.context.clear_permissions()
+        if hasattr(context, "current_state"):
+            del context.current_state
+
+        # Yeni (boş) sayfa aç; bir sonraki görev hazır sayfa bulsun
+        page = await context.get_current_page()
+        origins = [o["origin"] for o in storage.get("origins", [])]
+        if origins:
+            cdp = await session.context.new_cdp_session(page)
+            try:
+                for origin in origins:
+                    await cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            finally:
+                await cdp.detach()
+
+
+# Uygulama genelinde tek havuz
+browser_pool = BrowserContextPool(
+    size=settings.browser_pool_size,
+    max_uses=settings.browser_pool_max_uses,
+    acquire_timeout=settings.browser_pool_acquire_timeout,
+)
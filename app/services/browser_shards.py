@@ -0,0 +1,206 @@
+# app/services/browser_shards.py
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("browser_shards")
+
+settings = get_settings()
+
+
+@dataclass
+class BrowserShard:
+    """Tek bir Chromium süreci ve üzerine yerleştirilmiş context sayısı."""
+
+    index: int
+    browser: Browser
+    contexts: int = 0
+    retiring: bool = False
+
+    @property
+    def launched(self) -> bool:
+        return self.browser.playwright_browser is not None
+
+    @property
+    def crashed(self) -> bool:
+        pw_browser = self.browser.playwright_browser
+        return pw_browser is not None and not pw_browser.is_connected()
+
+
+def _process_rss_mb(pids: Iterable[int]) -> Optional[float]:
+    """
+    Verilen PID'lerin toplam RSS'ini (MB) /proc üzerinden okur.
+    /proc olmayan platformlarda None döner (bellek kontrolü atlanır).
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class BrowserShardManager:
+    """
+    K adet bağımsız browser süreci (shard) yönetir; K varsayılan olarak CPU çekirdek sayısıdır.
+
+    - new_context() context'i en az yüklü shard'a yerleştirir; shard'lar ilk
+      kullanımda başlatılır, yani havuzdan fazla shard boşuna açılmaz.
+    - Arka plandaki izleyici çöken shard'ı hemen yeniden başlatır; bellek sınırını
+      aşan shard'ı "retiring" işaretler, yeni context almaz, boşalınca yeniden başlatılır.
+    """
+
+    def __init__(self, shard_count: int, max_rss_mb: int, check_interval: float, headless: bool):
+        self.shard_count = shard_count if shard_count > 0 else (os.cpu_count() or 1)
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.headless = headless
+        self.shards: List[BrowserShard] = []
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _new_browser(self) -> Browser:
+        config = BrowserConfig(
+            headless=self.headless,
+            new_context_config=BrowserContextConfig(
+                viewport_expansion=0,
+                incremental_dom=settings.browser_incremental_dom,
+                interception_profile=settings.browser_interception_profile,
+                adaptive_timing=settings.browser_adaptive_timing,
+                timing_profile_path=settings.browser_timing_profile_path,
+                screenshot_format=settings.browser_screenshot_format,
+                screenshot_quality=settings.browser_screenshot_quality,
+                screenshot_max_dimension=settings.browser_screenshot_max_dimension,
+            ),
+        )
+        return Browser(config=config)
+
+    # ——— YAŞAM DÖNGÜSÜ ———
+
+    async def start(self) -> None:
+        self.shards = [BrowserShard(index=i, browser=self._new_browser()) for i in range(self.shard_count)]
+        self._monitor_task = asyncio.create_task(self._monitor(), name="browser-shard-monitor")
+        logger.info(f"Browser shard manager started with {self.shard_count} shards")
+
+    async def close(self) -> None:
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        await asyncio.gather(*(shard.browser.close() for shard in self.shards), return_exceptions=True)
+        self.shards = []
+
+    # ——— YERLEŞTİRME ———
+
+    async def new_context(self) -> BrowserContext:
+        """En az yüklü (retiring olmayan) shard üzerinde yeni, oturumu açılmış bir context üretir."""
+        async with self._lock:
+            candidates = [s for s in self.shards if not s.retiring and not s.crashed]
+            if not candidates:
+                raise RuntimeError("Kullanılabilir browser shard yok.")
+            shard = min(candidates, key=lambda s: (s.contexts, not s.launched, s.index))
+            shard.contexts += 1
+
+        try:
+            context = await shard.browser.new_context(shard.browser.config.new_context_config)
+            await context._initialize_session()
+        except Exception:
+            shard.contexts -= 1
+            raise
+        logger.debug(f"Context placed on shard {shard.index} ({shard.contexts} contexts)")
+        return context
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """Context kapatıldıktan sonra çağrılır; retiring shard boşaldıysa yeniden başlatılır."""
+        shard = self.shard_of(context)
+        if shard is None:
+            return
+        shard.contexts = max(0, shard.contexts - 1)
+        if shard.retiring and shard.contexts == 0:
+            await self._restart(shard)
+
+    def shard_of(self, context: BrowserContext) -> Optional[BrowserShard]:
+        for shard in self.shards:
+            if shard.browser is context.browser:
+                return shard
+        return None
+
+    def is_retiring(self, context: BrowserContext) -> bool:
+        shard = self.shard_of(context)
+        return shard is None or shard.retiring or shard.crashed
+
+    # ——— SAĞLIK / BELLEK İZLEME ———
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            for shard in list(self.shards):
+                try:
+                    await self._check(shard)
+                except Exception as e:
+                    logger.debug(f"Shard {shard.index} check failed: {e}")
+
+    async def _check(self, shard: BrowserShard) -> None:
+        if not shard.launched:
+            return
+
+        if shard.crashed:
+            # Üzerindeki context'ler zaten ölü; havuz sağlık kontrolünde onları düşürür
+            logger.warning(f"Shard {shard.index} crashed, restarting")
+            await self._restart(shard)
+            return
+
+        if not self.max_rss_mb or shard.retiring:
+            return
+
+        rss = await self._shard_rss_mb(shard)
+        if rss is not None and rss > self.max_rss_mb:
+            logger.warning(f"Shard {shard.index} uses {rss:.0f} MB (> {self.max_rss_mb} MB), retiring")
+            shard.retiring = True
+            if shard.contexts == 0:
+                await self._restart(shard)
+
+    async def _shard_rss_mb(self, shard: BrowserShard) -> Optional[float]:
+        cdp = await shard.browser.playwright_browser.new_browser_cdp_session()
+        try:
+            info = await cdp.send("SystemInfo.getProcessInfo")
+        finally:
+            await cdp.detach()
+        pids = [p["id"] for p in info.get("processInfo", [])]
+        return _process_rss_mb(pids)
+
+    async def _restart(self, shard: BrowserShard) -> None:
+        async with self._lock:
+            old_browser = shard.browser
+            shard.browser = self._new_browser()
+            shard.contexts = 0
+            shard.retiring = False
+        try:
+            await old_browser.close()
+        except Exception as e:
+            logger.debug(f"Failed to close shard {shard.index} browser: {e}")
+        logger.info(f"Shard {shard.index} restarted")
+
+
+# Uygulama genelinde tek shard yöneticisi
+browser_shards = BrowserShardManager(
+    shard_count=settings.browser_shards,
+    max_rss_mb=settings.browser_shard_max_rss_mb,
+    check_interval=settings.browser_shard_check_interval,
+    headless=settings.browser_headless,
+)
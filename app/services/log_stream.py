@@ -0,0 +1,196 @@
+# app/services/log_stream.py
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("log_stream")
+
+settings = get_settings()
+
+# (offset, satır) çifti; offset görev bazında 0'dan başlayıp monoton artar
+LogEntry = Tuple[int, str]
+
+
+@dataclass
+class _TaskChannel:
+    """Tek bir görevin sınırlı log tamponu ve abonelere haber veren event'i."""
+
+    buffer: Deque[LogEntry]
+    next_offset: int = 0
+    closed: bool = False
+    # Her publish'te set edilip yenisiyle değiştirilir; bekleyen tüm aboneler uyanır
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def first_offset(self) -> int:
+        return self.buffer[0][0] if self.buffer else self.next_offset
+
+    def notify(self) -> None:
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+
+class LogBroker:
+    """
+    Görev bazında (task_id) async pub/sub log dağıtıcısı.
+
+    - Her görevin son buffer_size satırı bir ring buffer'da tutulur.
+    - subscribe() verilen offset'ten itibaren tampondaki satırları, ardından
+      yeni gelenleri yield eder; tampondan düşmüş offset'ler atlanır.
+    - Kanal sayısı max_channels ile sınırlıdır; önce kapanmış en eski kanallar silinir.
+    """
+
+    def __init__(self, buffer_size: int, max_channels: int):
+        self.buffer_size = max(1, buffer_size)
+        self.max_channels = max(1, max_channels)
+        self._channels: "OrderedDict[int, _TaskChannel]" = OrderedDict()
+
+    def _channel(self, task_id: int) -> _TaskChannel:
+        channel = self._channels.get(task_id)
+        if channel is None:
+            channel = _TaskChannel(buffer=deque(maxlen=self.buffer_size))
+            self._channels[task_id] = channel
+            self._evict()
+        return channel
+
+    def _evict(self) -> None:
+        while len(self._channels) > self.max_channels:
+            victim = next((tid for tid, ch in self._channels.items() if ch.closed), None)
+            if victim is None:
+                victim = next(iter(self._channels))
+            channel = self._channels.pop(victim)
+            channel.closed = True
+            channel.notify()
+
+    # ——— YAYIN ———
+
+    def open(self, task_id: int, base_offset: int = 0) -> None:
+        """
+        Görev (yeniden) başlarken kanalı açık duruma getirir.
+        base_offset: görevin kalıcı olarak saklanmış satır sayısı; yeni satırlar oradan numaralanır.
+        """
+        channel = self._channel(task_id)
+        channel.closed = False
+        channel.next_offset = max(channel.next_offset, base_offset)
+        self._channels.move_to_end(task_id)
+
+    def publish(self, task_id: int, line: str) -> int:
+        """Satırı görevin tamponuna ekler, aboneleri uyandırır ve offset'ini döner."""
+        channel = self._channel(task_id)
+        offset = channel.next_offset
+        channel.buffer.append((offset, line))
+        channel.next_offset += 1
+        channel.notify()
+        return offset
+
+    def close(self, task_id: int) -> None:
+        """Görev bittiğinde çağrılır; aboneler kalan satırları alıp sonlanır."""
+        channel = self._channels.get(task_id)
+        if channel is not None:
+            channel.closed = True
+            channel.notify()
+
+    # ——— OKUMA ———
+
+    def snapshot(self, task_id: int, offset: int = 0) -> List[LogEntry]:
+        channel = self._channels.get(task_id)
+        if channel is None:
+            return []
+        return [entry for entry in channel.buffer if entry[0] >= offset]
+
+    def has_full_history(self, task_id: int) -> bool:
+        """Görevin ilk satırı (offset 0) hâlâ tampondaysa tüm geçmiş bellektedir."""
+        channel = self._channels.get(task_id)
+        return channel is not None and bool(channel.buffer) and channel.buffer[0][0] == 0
+
+    def is_open(self, task_id: int) -> bool:
+        channel = self._channels.get(task_id)
+        return channel is not None and not channel.closed
+
+    async def subscribe(
+        self,
+        task_id: int,
+        offset: int = 0,
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[Optional[LogEntry]]:
+        """
+        offset'ten itibaren satırları yield eder; kanal kapanınca biter.
+        heartbeat verilirse bu süre boyunca yeni satır gelmezse None yield edilir
+        (SSE/WebSocket bağlantısını canlı tutmak için).
+        """
+        channel = self._channel(task_id)
+        cursor = max(offset, 0)
+        while True:
+            if cursor < channel.first_offset:
+                # İstemci tampondan düşmüş satırları istiyor; ulaşılabilen ilk satıra atla
+                cursor = channel.first_offset
+            pending = [entry for entry in channel.buffer if entry[0] >= cursor]
+            for entry in pending:
+                yield entry
+            if pending:
+                cursor = pending[-1][0] + 1
+
+            if channel.closed and cursor >= channel.next_offset:
+                return
+
+            waiter = channel.changed
+            if cursor < channel.next_offset:
+                # yield sırasında yeni satır gelmiş
+                continue
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+
+# Uygulama genelinde tek log dağıtıcısı
+log_broker = LogBroker(
+    buffer_size=settings.log_buffer_size,
+    max_channels=settings.log_max_channels,
+)
+
+
+def log_entries(task_id: int, offset: int, follow: bool) -> AsyncIterator[Optional[LogEntry]]:
+    """
+    follow=True ise canlı aboneliği (heartbeat'li) döner;
+    aksi halde yalnızca tampondaki satırları yield edip biter.
+    """
+    if follow:
+        return log_broker.subscribe(task_id, offset, heartbeat=settings.log_stream_heartbeat)
+    return _iterate(log_broker.snapshot(task_id, offset))
+
+
+async def _iterate(entries: List[LogEntry]) -> AsyncIterator[LogEntry]:
+    for entry in entries:
+        yield entry
+
+
+async def sse_events(task_id: int, offset: int, follow: bool) -> AsyncIterator[str]:
+    """
+    Görev loglarını Server-Sent Events formatında üretir.
+    Her satırın id'si offset'idir; tarayıcı yeniden bağlanırken Last-Event-ID ile
+    kaldığı yerden devam eder.
+    """
+    async for entry in log_entries(task_id, offset, follow):
+        if entry is None:
+            yield ": keep-alive\n\n"
+            continue
+        entry_offset, line = entry
+        data = "\n".join(f"data: {part}" for part in line.splitlines() or [""])
+        yield f"id: {entry_offset}\n{data}\n\n"
+    yield "event: end\ndata: \n\n"
+
+
+def resume_offset(offset: Optional[int], last_event_id: Optional[str]) -> int:
+    """Last-Event-ID (son alınan satır) varsa bir sonrakinden, yoksa offset'ten başlar."""
+    if last_event_id:
+        try:
+            return int(last_event_id) + 1
+        except ValueError:
+            pass
+    return offset or 0
@@ -0,0 +1,193 @@
+# app/services/scheduler.py
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("scheduler")
+
+settings = get_settings()
+
+# Öncelik değerleri: küçük sayı önce çalışır
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class QueueFullError(Exception):
+    """Kuyruk dolu olduğunda fırlatılır; istemciye 429 dönmek için kullanılır."""
+
+    def __init__(self, queue_length: int):
+        super().__init__(f"Görev kuyruğu dolu ({queue_length} görev bekliyor).")
+        self.queue_length = queue_length
+
+
+class SchedulerClosedError(Exception):
+    """Kapanış (drain) sürecinde yeni görev kabul edilmez."""
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    task_id: int = field(compare=False)
+    factory: Callable[[], Awaitable[None]] = field(compare=False)
+
+
+class TaskScheduler:
+    """
+    FastAPI event loop'u üzerinde çalışan, sınırlı öncelik kuyruklu görev zamanlayıcı.
+
+    - Sabit sayıda async worker kuyruktan görev çeker; eşzamanlılık worker sayısıyla sınırlıdır.
+    - Kuyruk dolduğunda submit() QueueFullError fırlatır (HTTP 429 için).
+    - shutdown() yeni görevleri reddeder, kuyruktakileri bitirmek için drain_timeout kadar bekler.
+    """
+
+    def __init__(self, workers: int, max_queue_size: int):
+        self.workers = max(1, workers)
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._queued_ids: Dict[int, _Job] = {}
+        self._active_ids: set = set()
+        self._closing = False
+
+    # ——— YAŞAM DÖNGÜSÜ ———
+
+    async def start(self) -> None:
+        """Worker'ları mevcut event loop üzerinde başlatır."""
+        if self._worker_tasks:
+            return
+        # Kuyruk sınırsızdır: geri çekilen görevler worker onları atlayana kadar
+        # kuyrukta kalır, kapasite _queued_ids üzerinden sayılır
+        self._queue = asyncio.PriorityQueue()
+        self._closing = False
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"task-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Scheduler started ({self.workers} workers, queue={self.max_queue_size})")
+
+    async def shutdown(self, drain_timeout: float) -> None:
+        """
+        1) Yeni görev kabulünü durdurur.
+        2) Kuyruk ve çalışan görevler için drain_timeout kadar bekler.
+        3) Süre dolarsa kalan worker'ları iptal eder.
+        """
+        if not self._worker_tasks:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            logger.info("Scheduler drained")
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Scheduler drain timed out after {drain_timeout}s "
+                f"({len(self._queued_ids)} queued, {len(self._active_ids)} running)"
+            )
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    # ——— GÖREV KABULÜ ———
+
+    def ensure_capacity(self) -> None:
+        """
+        Kuyrukta yer yoksa QueueFullError fırlatır.
+        DB kaydı oluşturmadan önce çağrılan ön kontroldür; kayıt oluşturulurken
+        (await) başka istekler kuyruğu doldurabilir, bu yüzden submit() hatası
+        da ayrıca ele alınmalıdır.
+        """
+        if self._queue is None or self._closing:
+            raise SchedulerClosedError("Zamanlayıcı görev kabul etmiyor.")
+        if self._is_full():
+            raise QueueFullError(self.queue_length)
+
+    def submit(
+        self,
+        task_id: int,
+        factory: Callable[[], Awaitable[None]],
+        priority: int = PRIORITY_NORMAL,
+    ) -> int:
+        """
+        Görevi kuyruğa ekler ve 1 tabanlı kuyruk pozisyonunu döner.
+        Kuyruk doluysa QueueFullError, kapanıştaysa SchedulerClosedError fırlatır.
+        """
+        if self._queue is None or self._closing:
+            raise SchedulerClosedError("Zamanlayıcı görev kabul etmiyor.")
+
+        if self._is_full():
+            raise QueueFullError(self.queue_length)
+
+        job = _Job(priority=priority, seq=next(self._seq), task_id=task_id, factory=factory)
+        self._queue.put_nowait(job)
+        self._queued_ids[task_id] = job
+        return self.queue_position(task_id)
+
+    def _is_full(self) -> bool:
+        # 0 veya negatif boyut asyncio.Queue'daki gibi sınırsız demektir
+        return 0 < self.max_queue_size <= len(self._queued_ids)
+
+    def withdraw(self, task_id: int) -> bool:
+        """Henüz başlamamış görevi kuyruktan geri çeker; worker onu atlar."""
+        return self._queued_ids.pop(task_id, None) is not None
+
+    def queue_position(self, task_id: int) -> Optional[int]:
+        """Kuyruktaki görevin 1 tabanlı sırasını döner; kuyrukta değilse None."""
+        job = self._queued_ids.get(task_id)
+        if job is None:
+            return None
+        return 1 + sum(1 for other in self._queued_ids.values() if other < job)
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._queued_ids)
+
+    def is_queued(self, task_id: int) -> bool:
+        return task_id in self._queued_ids
+
+    def is_active(self, task_id: int) -> bool:
+        return task_id in self._active_ids
+
+    # ——— WORKER ———
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job: _Job = await self._queue.get()
+            try:
+                if self._queued_ids.get(job.task_id) is not job:
+                    # Görev kuyruktayken geri çekilmiş
+                    continue
+                del self._queued_ids[job.task_id]
+                self._active_ids.add(job.task_id)
+
+                # Her görev kendi asyncio görevinde çalışır; görevin iptali
+                # (stop_task) worker'ı öldürmez.
+                job_task = asyncio.create_task(job.factory(), name=f"task-{job.task_id}")
+                try:
+                    await asyncio.wait({job_task})
+                except asyncio.CancelledError:
+                    job_task.cancel()
+                    await asyncio.wait({job_task})
+                    raise
+
+                if not job_task.cancelled() and job_task.exception() is not None:
+                    exc = job_task.exception()
+                    logger.error(f"[worker-{index}] Task {job.task_id} crashed: {exc}", exc_info=exc)
+            finally:
+                self._active_ids.discard(job.task_id)
+                self._queue.task_done()
+
+
+# Uygulama genelinde tek zamanlayıcı
+scheduler = TaskScheduler(
+    workers=settings.scheduler_workers,
+    max_queue_size=settings.scheduler_queue_size,
+)
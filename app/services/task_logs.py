@@ -0,0 +1,131 @@
+# app/services/task_logs.py
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services.log_stream import log_broker
+
+logger = logging.getLogger("task_logs")
+
+settings = get_settings()
+
+
+class TaskLogWriter:
+    """
+    Görev log satırlarını task_logs tablosuna toplu (executemany) yazan arka plan yazıcısı.
+
+    - enqueue() yalnızca bellekteki kuyruğa ekler; istek/agent akışını DB'ye bekletmez.
+    - Kuyruk flush_interval_ms'de bir ya da batch_size satıra ulaşınca boşaltılır.
+    - Kuyruk max_pending ile sınırlıdır; DB uzun süre yazılamazsa en eski satırlar düşer.
+    """
+
+    def __init__(self, flush_interval_ms: int, batch_size: int, max_pending: int):
+        self.flush_interval = max(flush_interval_ms, 10) / 1000
+        self.batch_size = max(1, batch_size)
+        self._pending: Deque[dict] = deque(maxlen=max(max_pending, self.batch_size))
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.dropped = 0
+
+    # ——— YAŞAM DÖNGÜSÜ ———
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="task-log-writer")
+
+    async def close(self) -> None:
+        """
+        Döngüye durmasını söyler ve son flush'ını bekler.
+        Görev iptal edilmez: yazılmakta olan bir batch yarıda kalıp kaybolmaz.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    # ——— YAZMA ———
+
+    def enqueue(self, task_id: int, log_type: str, message: str, timestamp: datetime) -> None:
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(
+            {"task_id": task_id, "log_type": log_type, "message": message, "timestamp": timestamp}
+        )
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Bekleyen satırları tek bir executemany ile yazar."""
+        async with self._flush_lock:
+            while self._pending:
+                rows = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await crud.add_task_logs_bulk(db, rows)
+                except Exception as e:
+                    logger.error(f"Failed to persist {len(rows)} task log rows: {e}")
+                    # Bir sonraki flush'ta yeniden denenmek üzere kuyruğun başına geri koy
+                    self._pending.extendleft(reversed(rows))
+                    return
+            if self.dropped:
+                logger.warning(f"{self.dropped} task log rows dropped (pending queue full)")
+                self.dropped = 0
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+def format_log_line(timestamp: datetime, message: str) -> str:
+    """add_log ile aynı '[YYYY-mm-dd HH:MM:SS] mesaj' biçimi (UTC → yerel saat)."""
+    local = timestamp.replace(tzinfo=timezone.utc).astimezone()
+    return f"[{local.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+
+
+async def open_task_log(db: AsyncSession, task_id: int) -> None:
+    """
+    Görev (yeniden) başlarken canlı log kanalını açar. Offset'ler DB'deki satır
+    sırasıyla örtüşsün diye kanal, görevin kalıcı log sayısından devam eder.
+    """
+    await log_writer.flush()
+    base = await crud.count_logs_by_task(db, task_id)
+    log_broker.open(task_id, base_offset=base)
+
+
+async def get_task_logs(db: AsyncSession, task_id: int) -> List[str]:
+    """
+    Görevin tüm loglarını döner: geçmişin tamamı bellekteki tampondaysa (sıcak)
+    oradan, değilse (soğuk: tampondan taşmış veya yeniden başlatma öncesi) DB'den.
+    """
+    if log_broker.has_full_history(task_id):
+        return [line for _, line in log_broker.snapshot(task_id)]
+
+    await log_writer.flush()
+    rows = await crud.get_logs_by_task(db, task_id)
+    return [format_log_line(row.timestamp, row.message) for row in rows]
+
+
+# Uygulama genelinde tek log yazıcısı
+log_writer = TaskLogWriter(
+    flush_interval_ms=settings.log_flush_interval_ms,
+    batch_size=settings.log_flush_batch_size,
+    max_pending=settings.log_pending_max,
+)
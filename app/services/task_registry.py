@@ -0,0 +1,80 @@
+# app/services/task_registry.py
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("task_registry")
+
+
+@dataclass
+class TaskHandle:
+    """Çalışan bir görevin kontrol tutamağı."""
+
+    task_id: int
+    runner: asyncio.Task
+    agent: Optional[Any] = None  # browser_use.Agent; context kiralanana kadar None
+    stop_requested: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class TaskRegistry:
+    """
+    task_id → TaskHandle eşlemesi.
+
+    run_agent başlarken kendini kaydeder, Agent oluşunca ona bağlanır ve bitince
+    kaydı siler. stop() ajanı durdurur, bekleyen LLM / Playwright await'lerini
+    iptal eder ve görevin (ve browser kirasının) bırakılmasını sınırlı süre bekler.
+    """
+
+    def __init__(self):
+        self._handles: Dict[int, TaskHandle] = {}
+
+    def register(self, task_id: int) -> TaskHandle:
+        """Çağıran asyncio görevini task_id için kaydeder."""
+        handle = TaskHandle(task_id=task_id, runner=asyncio.current_task())
+        self._handles[task_id] = handle
+        return handle
+
+    def attach_agent(self, task_id: int, agent: Any) -> None:
+        handle = self._handles.get(task_id)
+        if handle is not None:
+            handle.agent = agent
+
+    def unregister(self, task_id: int) -> None:
+        handle = self._handles.pop(task_id, None)
+        if handle is not None:
+            handle.done.set()
+
+    def get(self, task_id: int) -> Optional[TaskHandle]:
+        return self._handles.get(task_id)
+
+    def is_running(self, task_id: int) -> bool:
+        return task_id in self._handles
+
+    async def stop(self, task_id: int, timeout: float) -> bool:
+        """
+        1) Agent.stop() ile adım döngüsünü keser.
+        2) Görevi iptal ederek devam eden LLM / tarayıcı çağrılarını yarıda bırakır.
+        3) Görevin temizlenmesini (lease iadesi dahil) en fazla timeout saniye bekler.
+        Görev bulunamazsa False döner.
+        """
+        handle = self._handles.get(task_id)
+        if handle is None:
+            return False
+
+        handle.stop_requested = True
+        if handle.agent is not None:
+            handle.agent.stop()
+        handle.runner.cancel()
+
+        try:
+            await asyncio.wait_for(handle.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Task {task_id} did not stop within {timeout}s")
+        return True
+
+
+# Uygulama genelinde tek kayıt defteri
+task_registry = TaskRegistry()
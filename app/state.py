@@ -1,25 +1,33 @@
 # app/state.py
 
+import logging
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Deque, Optional
 
-# — Global log listesi —
-task_log: List[str] = []
+from app.core.config import get_settings
+from app.services.log_stream import log_broker
+from app.services.task_logs import format_log_line, log_writer
 
-# — Agent’in çalışıp çalışmadığını izleyen flag —
-running: Dict[str, bool] = {"state": False}
+logger = logging.getLogger("app")
 
-# — Tarayıcı context ve browser nesnesini saklamak için —
-#   'ctx' içine BrowserContext, 'browser' içine Browser objesi gelecek
-browser_ctx: Dict[str, Any] = {"ctx": None, "browser": None}
+# — Global log listesi (son global_log_size satır; eskiler düşer) —
+task_log: Deque[str] = deque(maxlen=get_settings().global_log_size)
 
+# Çalışan görevler app.services.task_registry içinde task_id bazında tutulur.
 
-def add_log(message: str) -> None:
+
+def add_log(message: str, task_id: Optional[int] = None, log_type: str = "info") -> None:
     """
     Gelen mesajı timestamp ile birlikte task_log'a ekler
-    ve konsola basar.
+    ve loglar. task_id verilirse satır o görevin canlı log
+    akışına (SSE / WebSocket) yayınlanır ve task_logs
+    tablosuna yazılmak üzere kuyruğa alınır.
     """
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    entry = f"[{ts}] {message}"
+    now = datetime.utcnow()
+    entry = format_log_line(now, message)
     task_log.append(entry)
-    print(entry)
+    if task_id is not None:
+        log_broker.publish(task_id, entry)
+        log_writer.enqueue(task_id, log_type, message, now)
+    logger.info(entry)
@@ -5,13 +5,16 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 # --- Buraya ekle ---
-from app.services.utils import launch_global_browser, shutdown_global_browser
+from app.services.scheduler import scheduler
+from app.services.browser_shards import browser_shards
+from app.services.browser_pool import browser_pool
+from app.services.task_logs import log_writer
 
 # Ayarları çek
 from app.core.config import get_settings
 
 # Veritabanı altyapısı
-from app.database import Base, engine
+from app.database import Base, engine, async_engine
 import app.models  # modellerin metadata’sını Base’e kaydetmek için
 
 # Router’lar
@@ -19,8 +22,12 @@ from app.routes.user_routes import router as user_router
 from app.routes.api import router as api_router
 from app.routes.web import router as web_router
 
-# İlk çalıştırmada tabloları oluştur
+# İlk çalıştırmada tabloları oluştur (sync engine yalnızca burada kullanılır)
 Base.metadata.create_all(bind=engine)
+# Sonradan eklenen (ör. sayfalama) indeksleri mevcut tablolarda da oluştur
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 # FastAPI uygulaması
 app = FastAPI(title="Agentic FastAPI App")
@@ -28,13 +35,26 @@ app = FastAPI(title="Agentic FastAPI App")
 # --- Startup / Shutdown eventleri burada ---
 @app.on_event("startup")
 async def on_startup():
-    # Uygulama ayağa kalkarken sadece bir kez Chromium'u başlat
-    await launch_global_browser(headless=False)
+    # Görev loglarını task_logs tablosuna toplu yazan arka plan yazıcısı
+    await log_writer.start()
+    # Chromium süreçlerini (shard) hazırla; her biri ilk context'te başlatılır
+    await browser_shards.start()
+    # Görevlerin kiralayacağı context'leri en az yüklü shard'lara yerleştirip ısıt
+    await browser_pool.start(browser_shards)
+    # Görev worker'larını FastAPI event loop'u üzerinde başlat
+    await scheduler.start()
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    # Uygulama kapanırken browser'ı kapat
-    await shutdown_global_browser()
+    # Önce kuyruktaki/çalışan görevlerin bitmesini bekle (graceful drain)
+    await scheduler.shutdown(drain_timeout=get_settings().scheduler_drain_timeout)
+    # Uygulama kapanırken context havuzunu ve browser süreçlerini kapat
+    await browser_pool.close()
+    await browser_shards.close()
+    # Kuyrukta kalan log satırlarını DB'ye yaz
+    await log_writer.close()
+    # Async bağlantı havuzunu kapat
+    await async_engine.dispose()
 
 # Statik dosyalar (CSS, JS, vb.)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -0,0 +1,5 @@
+import os
+
+# Zorunlu ayarlar; testler .env dosyası olmadan da çalışsın
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
@@ -0,0 +1,31 @@
+# app paketi browser_use'u app/browser_use'tan yükler; bu yüzden önce import edilir
+from app.core.config import get_settings
+from app.services.browser_shards import BrowserShardManager
+
+import browser_use
+from browser_use.browser.context import BrowserContext
+
+
+def test_vendored_browser_use_is_loaded():
+    assert browser_use.__file__.endswith("app/browser_use/__init__.py")
+    assert browser_use.Agent.__module__ == "browser_use.agent.service"
+
+
+def test_new_browser_passes_app_settings_to_context_config():
+    settings = get_settings()
+    manager = BrowserShardManager(shard_count=1, max_rss_mb=0, check_interval=30, headless=True)
+
+    browser = manager._new_browser()
+    config = browser.config.new_context_config
+
+    assert config.incremental_dom == settings.browser_incremental_dom
+    assert config.interception_profile == settings.browser_interception_profile
+    assert config.adaptive_timing == settings.browser_adaptive_timing
+    assert config.timing_profile_path == settings.browser_timing_profile_path
+    assert config.screenshot_format == settings.browser_screenshot_format
+    assert config.screenshot_quality == settings.browser_screenshot_quality
+    assert config.screenshot_max_dimension == settings.browser_screenshot_max_dimension
+
+    # Context kurulumu (encoder, interceptor, timing) tarayıcı başlatmadan da yapılabilmeli
+    context = BrowserContext(browser=browser, config=config)
+    assert context.screenshot_mime_type == "image/jpeg"